@@ -0,0 +1,520 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Sandia National Laboratories
+October 16, 2026
+
+Benchmark code for the sudoku package.
+    - time the logical operators and board manipulation over the puzzle catalog
+    - report throughput so that changes to the board representation can be compared
+"""
+
+import board
+import board_update_descriptions
+import exact_cover
+import game
+import operators
+import puzzles
+import solvers
+import sudoku_logger
+import translate
+
+import argparse
+import time
+import tracemalloc
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+def load_boards(names):
+    """ Return the simplified initial boards for the named puzzles (all puzzles if names is empty). """
+    if not names:
+        names = puzzles.puzzles.keys()
+    return [translate.get_initial_board({"name": name}) for name in names]
+
+
+def report(title, rows):
+    """ Print a table of (name, calls, seconds) rows with per-call cost and throughput. """
+    print(f"\n{title}")
+    print(f"{'name':<20} {'calls':>8} {'total s':>10} {'us/call':>10} {'calls/s':>10}")
+    for (name, calls, seconds) in rows:
+        per_call = seconds / calls * 1e6 if calls else 0.0
+        rate = calls / seconds if seconds else 0.0
+        print(f"{name:<20} {calls:>8} {seconds:>10.3f} {per_call:>10.1f} {rate:>10.1f}")
+
+
+def benchmark_operators(boards, ops, repeat):
+    """ Time each logical operator applied once to a fresh copy of each board. """
+    rows = []
+    for op in ops:
+        function = solvers.get_operator(op)
+        calls = 0
+        elapsed = 0.0
+        for _ in range(repeat):
+            for sboard in boards:
+                work = board.Board(sboard)
+                start = time.perf_counter()
+                function(work)
+                elapsed += time.perf_counter() - start
+                calls += 1
+        rows.append((op, calls, elapsed))
+    report("Logical operator throughput (one application per board)", rows)
+    return rows
+
+
+def benchmark_cloning(boards, repeat):
+    """ Time copying boards, and expanding (pivoting) the first accessible cell of each board. """
+    rows = []
+    calls = 0
+    elapsed = 0.0
+    for _ in range(repeat):
+        for sboard in boards:
+            start = time.perf_counter()
+            board.Board(sboard)
+            elapsed += time.perf_counter() - start
+            calls += 1
+    rows.append(("Board(Board)", calls, elapsed))
+
+    calls = 0
+    elapsed = 0.0
+    for _ in range(repeat):
+        for sboard in boards:
+            start = time.perf_counter()
+            sboard.config.copy()
+            elapsed += time.perf_counter() - start
+            calls += 1
+    rows.append(("config.copy()", calls, elapsed))
+
+    calls = 0
+    elapsed = 0.0
+    for _ in range(repeat):
+        for sboard in boards:
+            accessible = sboard.computeAccessibleCells()
+            if not accessible or sboard.invalidCells():
+                continue
+            work = board.Board(sboard)
+            start = time.perf_counter()
+            solvers.expand_cell(work, accessible[0])
+            elapsed += time.perf_counter() - start
+            calls += 1
+    rows.append(("expand_cell", calls, elapsed))
+    report("Board copying and expansion", rows)
+    return rows
+
+
+def benchmark_solver_loop(boards, repeat, calls_per_board=1000):
+    """ Time the board-status queries the solver loop makes, and a solver loop that changes nothing
+        (the free operators applied to boards that are already simplified). """
+    rows = []
+    for (name, query) in [("countUncertainValues", lambda sboard: sboard.countUncertainValues()),
+                          ("isSolved", lambda sboard: sboard.isSolved()),
+                          ("invalidCells", lambda sboard: sboard.invalidCells())]:
+        calls = 0
+        elapsed = 0.0
+        for _ in range(repeat):
+            for sboard in boards:
+                start = time.perf_counter()
+                for _ in range(calls_per_board):
+                    query(sboard)
+                elapsed += time.perf_counter() - start
+                calls += calls_per_board
+        rows.append((name, calls, elapsed))
+
+    calls = 0
+    elapsed = 0.0
+    for _ in range(repeat):
+        for sboard in boards:
+            work = board.Board(sboard)
+            start = time.perf_counter()
+            solvers.apply_free_operators(work, True)
+            elapsed += time.perf_counter() - start
+            calls += 1
+    rows.append(("free op loop", calls, elapsed))
+    report("Solver loop overhead", rows)
+    return rows
+
+
+def benchmark_initial_simplification(names, repeat):
+    """ Time simplifying each named puzzle's initial board (as translate.get_initial_board does):
+        the free operators applied to a fixed point, and logical_exclusion applied once.
+    """
+    if not names:
+        names = puzzles.puzzles.keys()
+    raw_boards = [board.Board(puzzles.puzzles[name], 3, name) for name in names]
+    rows = []
+    for (name, simplify) in [("free op loop", lambda sboard: solvers.apply_free_operators(sboard, True)),
+                             ("logical_exclusion", operators.logical_exclusion)]:
+        calls = 0
+        elapsed = 0.0
+        for _ in range(repeat):
+            for sboard in raw_boards:
+                work = board.Board(sboard)
+                start = time.perf_counter()
+                simplify(work)
+                elapsed += time.perf_counter() - start
+                calls += 1
+        rows.append((name, calls, elapsed))
+    report("Initial board simplification (per board)", rows)
+    return rows
+
+
+def benchmark_logical_solve(boards, repeat):
+    """ Time solving each board with every logical operator, cheapest first, as the solver loop applies them,
+        both searching for the fixed point and replaying it from solvers.logical_solve_cache.
+    """
+    ops = solvers.select_all_logical_operators_ordered()
+    cache = solvers.logical_solve_cache
+    calls = 0
+    elapsed = 0.0
+    replayed = 0.0
+    for _ in range(repeat):
+        for sboard in boards:
+            cache.clear()
+            work = board.Board(sboard)
+            start = time.perf_counter()
+            solvers.logical_solve(work, ops)
+            elapsed += time.perf_counter() - start
+            work = board.Board(sboard)
+            start = time.perf_counter()
+            solvers.logical_solve(work, ops)
+            replayed += time.perf_counter() - start
+            calls += 1
+    report("Logical solve with all operators", [("logical_solve", calls, elapsed),
+                                                ("replayed", calls, replayed)])
+    print(f"cache {cache.getStatistics()}")
+    return (calls, elapsed)
+
+
+def benchmark_operator_scheduling(boards):
+    """ Count, for each puzzle, the operator applications that solving it (and then each board of a pivot
+        on its first accessible cell) requests, and the full-board searches the operator scheduling saves
+        (see solvers.operator_invocations).
+    """
+    ops = solvers.select_all_logical_operators_ordered()
+    counts = solvers.operator_invocations
+    print("\nOperator applications requested by logical_solve, and full-board searches saved")
+    print(f"{'name':<20} {'requested':>10} {'skipped':>8} {'resumed':>8} {'saved':>7} {'searched':>9}")
+    totals = {"invocations": 0, "skipped": 0, "resumed": 0}
+    for sboard in boards:
+        counts.clear()
+        solvers.logical_solve_cache.clear()
+        work = solvers.logical_solve(board.Board(sboard), ops)
+        cells = work.computeAccessibleCells()
+        if cells and work.getCell(cells[0]).getValueSet():
+            for child in solvers.take_action(work, "pivot", cells[0]):
+                solvers.logical_solve(child, ops)
+        saved = counts["skipped"] + counts["resumed"]
+        print(f"{sboard.getPuzzleName()[:20]:<20} {counts['invocations']:>10} {counts['skipped']:>8} "
+              f"{counts['resumed']:>8} {saved:>7} {counts['invocations'] - saved:>9}")
+        for key in totals:
+            totals[key] += counts[key]
+    saved = totals["skipped"] + totals["resumed"]
+    print(f"{'total':<20} {totals['invocations']:>10} {totals['skipped']:>8} "
+          f"{totals['resumed']:>8} {saved:>7} {totals['invocations'] - saved:>9}")
+    return totals
+
+
+def benchmark_exact_cover(boards, repeat, max_solutions=1000):
+    """ Time the complete solver (exact_cover) on each board: finding its first solution, proving it
+        unique (counting to two), and enumerating its solutions (at most max_solutions of them).
+    """
+    searches = [("first solution", 1), ("count to 2", 2), ("all solutions", max_solutions)]
+    print("\nSolutions found by exact_cover")
+    print(f"{'name':<20} {'solutions':>10} {'first ms':>9}")
+    for sboard in boards:
+        start = time.perf_counter()
+        exact_cover.find_first_solution(sboard)
+        first = time.perf_counter() - start
+        print(f"{sboard.getPuzzleName()[:20]:<20} {exact_cover.count_solutions(sboard, max_solutions):>10} "
+              f"{first * 1e3:>9.2f}")
+    rows = []
+    for (name, limit) in searches:
+        calls = 0
+        elapsed = 0.0
+        for _ in range(repeat):
+            for sboard in boards:
+                start = time.perf_counter()
+                exact_cover.count_solutions(sboard, limit)
+                elapsed += time.perf_counter() - start
+                calls += 1
+        rows.append((name, calls, elapsed))
+    report("Exact cover solver (per board)", rows)
+    return rows
+
+
+def benchmark_goal_feasibility(repeat):
+    """ Time the goal cell oracle (exact_cover.feasible_values) on the boards evaluate_cell_action would return
+        for the games' puzzles with a goal cell: each puzzle, and the boards of a pivot on its first accessible cell.
+        Each board is timed uncached, and then found in exact_cover.feasibility_cache.
+    """
+    names = sorted({name for game in puzzles.games.values() for name in game["puzzles"] if "goal=" in name})
+    boards = []
+    for name in names:
+        sboard = translate.get_initial_board({"name": name})
+        boards.append(sboard)
+        cells = sboard.computeAccessibleCells()
+        if cells and not sboard.getCell(cells[0]).isCertain():
+            boards.extend(solvers.take_action(sboard, "pivot", cells[0]))
+    cache = exact_cover.feasibility_cache
+    calls = 0
+    elapsed = 0.0
+    cached = 0.0
+    for _ in range(repeat):
+        for sboard in boards:
+            cache.clear()
+            start = time.perf_counter()
+            sboard.getGoalFeasibleValues()
+            elapsed += time.perf_counter() - start
+            start = time.perf_counter()
+            sboard.getGoalFeasibleValues()
+            cached += time.perf_counter() - start
+            calls += 1
+    report(f"Goal cell oracle ({len(names)} game puzzles and their pivots)",
+           [("uncached", calls, elapsed), ("cached", calls, cached)])
+    return (calls, elapsed)
+
+
+def build_pivot_tree(sboard, depth, max_nodes):
+    """ Pivot on the first accessible cell of every frontier board, simplifying each child,
+        breadth first to depth levels or until max_nodes boards exist.  Returns all boards. """
+    nodes = [sboard]
+    frontier = [sboard]
+    for _ in range(depth):
+        next_frontier = []
+        for parent in frontier:
+            accessible = parent.computeAccessibleCells()
+            if not accessible or parent.invalidCells():
+                continue
+            children = solvers.take_action(parent, 'pivot', accessible[0])
+            nodes.extend(children)
+            next_frontier.extend(children)
+            if len(nodes) >= max_nodes:
+                return nodes
+        frontier = next_frontier
+    return nodes
+
+
+def benchmark_pivot_tree(boards, repeat, depth=3, max_nodes=200):
+    """ Time building pivot-heavy game trees, and measure the memory the trees retain. """
+    calls = 0
+    elapsed = 0.0
+    for _ in range(repeat):
+        for sboard in boards:
+            start = time.perf_counter()
+            nodes = build_pivot_tree(board.Board(sboard), depth, max_nodes)
+            elapsed += time.perf_counter() - start
+            calls += len(nodes)
+    report("Pivot tree expansion (per board in the tree)", [("pivot tree", calls, elapsed)])
+
+    total_nodes = 0
+    retained = 0
+    peak = 0
+    for sboard in boards:
+        tracemalloc.start()
+        nodes = build_pivot_tree(board.Board(sboard), depth, max_nodes)
+        (current, tree_peak) = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        total_nodes += len(nodes)
+        retained += current
+        peak = max(peak, tree_peak)
+        del nodes
+    print(f"{'boards':>8} {'KB retained':>12} {'bytes/board':>12} {'peak KB':>10}")
+    print(f"{total_nodes:>8} {retained / 1024:>12.1f} {retained / max(total_nodes, 1):>12.1f} {peak / 1024:>10.1f}")
+    return (calls, elapsed, total_nodes, retained, peak)
+
+
+def benchmark_board_selection(boards, repeat, max_nodes=4000):
+    """ Time selecting the next active node to play, from thousands of active nodes that pivot-heavy play
+        left on the boards, with the active nodes in a plain list (scanned on every decision) and in a
+        solvers.BoardFrontier.  Play starts with half the nodes active, and every decision adds two more.
+    """
+    trees = []
+    for sboard in boards:
+        trees.extend(build_pivot_tree(board.Board(sboard), 8, max_nodes - len(trees)))
+        if len(trees) >= max_nodes:
+            break
+    state = game.ActiveGameTreeState()
+    ops = solvers.select_all_logical_operators_ordered()
+    nodes = [game.GameTreeNode(sboard, logical_ops=ops, game_state=state) for sboard in trees]
+    selectors = [("min values", solvers.select_random_board_with_fewest_uncertain_values),
+                 ("max cells", solvers.select_random_board_with_most_uncertain_cells)]
+    rows = []
+    for (label, selector) in selectors:
+        for (name, make_frontier) in [("list", list), ("frontier", solvers.BoardFrontier)]:
+            calls = 0
+            elapsed = 0.0
+            for _ in range(repeat):
+                active = make_frontier(nodes[:len(nodes) // 2])
+                waiting = nodes[len(nodes) // 2:]
+                start = time.perf_counter()
+                while active:
+                    selector(active)
+                    calls += 1
+                    if waiting:
+                        active.extend(waiting[-2:])
+                        del waiting[-2:]
+                elapsed += time.perf_counter() - start
+            rows.append((f"{name} {label}", calls, elapsed))
+    report(f"Board selection among {len(nodes) // 2} to {len(nodes) * 3 // 4} active nodes (per decision)", rows)
+    return rows
+
+
+def choose_dfs_cell(sboard):
+    """ Return the position of the first uncertain cell with the fewest candidates. """
+    best = None
+    best_count = None
+    for idx in range(len(sboard.getCells())):
+        count = sboard.getMask(idx).bit_count()
+        if count > 1 and (best_count is None or count < best_count):
+            best = idx
+            best_count = count
+    return best
+
+
+def dfs_copying(sboard, stats):
+    """ Search depth first for a solution below sboard, copying the board for every branch.
+        Gives up once stats["limit"] nodes have been searched.  Returns the solved board, or None. """
+    if stats["nodes"] >= stats["limit"]:
+        return None
+    stats["nodes"] += 1
+    sboard = solvers.logical_solve(sboard, ["inclusion"])
+    if sboard.hasInvalidCells():
+        return None
+    idx = choose_dfs_cell(sboard)
+    if idx is None:
+        return sboard
+    for value in sboard.getCellAt(idx).getValues():
+        child = board.Board(sboard)
+        child.getCellAt(idx).assign(value)
+        solution = dfs_copying(child, stats)
+        if solution:
+            return solution
+    return None
+
+
+def dfs_trailing(sboard, stats):
+    """ Search depth first for a solution below sboard, changing sboard in place and rolling back
+        every failed branch.  Gives up once stats["limit"] nodes have been searched.
+        Returns the solved board, or None. """
+    if stats["nodes"] >= stats["limit"]:
+        return None
+    stats["nodes"] += 1
+    sboard = solvers.logical_solve(sboard, ["inclusion"])
+    if sboard.hasInvalidCells():
+        return None
+    idx = choose_dfs_cell(sboard)
+    if idx is None:
+        return sboard
+    for value in sboard.getCellAt(idx).getValues():
+        checkpoint = sboard.checkpoint()
+        config = sboard.config.copy()
+        sboard.getCellAt(idx).assign(value)
+        if dfs_trailing(sboard, stats):
+            return sboard
+        sboard.rollback(checkpoint)
+        sboard.config = config
+    return None
+
+
+def benchmark_dfs(boards, repeat, max_nodes=2000):
+    """ Time a depth-first search for a solution to each board (of at most max_nodes nodes),
+        copying boards versus rolling back one board, and measure the memory each search holds. """
+    searches = [("dfs copying", dfs_copying), ("dfs trailing", dfs_trailing)]
+    rows = []
+    for (name, search) in searches:
+        nodes = 0
+        elapsed = 0.0
+        for _ in range(repeat):
+            for sboard in boards:
+                stats = {"nodes": 0, "limit": max_nodes}
+                work = board.Board(sboard)
+                start = time.perf_counter()
+                solution = search(work, stats)
+                elapsed += time.perf_counter() - start
+                nodes += stats["nodes"]
+                logger.info("%s searched %s nodes of %s: %s", name, stats["nodes"], sboard.getPuzzleName(),
+                            solution.getStateStr() if solution else None)
+        rows.append((name, nodes, elapsed))
+    report("Depth-first search (per search node)", rows)
+
+    print(f"{'name':<20} {'nodes':>8} {'peak KB':>10} {'mean peak KB':>13}")
+    for (name, search) in searches:
+        nodes = 0
+        peaks = []
+        for sboard in boards:
+            stats = {"nodes": 0, "limit": max_nodes}
+            work = board.Board(sboard)
+            tracemalloc.start()
+            search(work, stats)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            nodes += stats["nodes"]
+        print(f"{name:<20} {nodes:>8} {max(peaks) / 1024:>10.1f} {sum(peaks) / len(peaks) / 1024:>13.1f}")
+    return rows
+
+
+def main(args):
+    logging.disable(logging.CRITICAL if not args.verbosity else logging.NOTSET)
+    if args.snapshots:
+        sudoku_logger.set_default_snapshot_level(args.snapshots, args.snapshotrate)
+    boards = load_boards(args.puzzles)
+    ops = args.operators if args.operators else list(
+        board_update_descriptions.operators_description.keys())
+    print(f"Benchmarking {len(boards)} puzzles, repeat {args.repeat}.")
+    if "operators" in args.benchmarks:
+        benchmark_operators(boards, ops, args.repeat)
+    if "cloning" in args.benchmarks:
+        benchmark_cloning(boards, args.repeat)
+    if "solverloop" in args.benchmarks:
+        benchmark_solver_loop(boards, args.repeat)
+    if "pivot" in args.benchmarks:
+        benchmark_pivot_tree(boards, args.repeat)
+    if "simplify" in args.benchmarks:
+        benchmark_initial_simplification(args.puzzles, args.repeat)
+    if "solve" in args.benchmarks:
+        benchmark_logical_solve(boards, args.repeat)
+    if "scheduling" in args.benchmarks:
+        benchmark_operator_scheduling(boards)
+    if "dfs" in args.benchmarks:
+        # Without named puzzles, search only the hard and fiendish ones
+        benchmark_dfs(boards if args.puzzles else
+                      [sboard for sboard in boards
+                       if sboard.getPuzzleName().startswith(("hard", "fiendish"))],
+                      args.repeat)
+    if "exactcover" in args.benchmarks:
+        benchmark_exact_cover(boards, args.repeat)
+    if "feasibility" in args.benchmarks:
+        benchmark_goal_feasibility(args.repeat)
+    if "selection" in args.benchmarks:
+        # Without named puzzles, play only the hard and fiendish ones, which leave the most active nodes
+        benchmark_board_selection(boards if args.puzzles else
+                                  [sboard for sboard in boards
+                                   if sboard.getPuzzleName().startswith(("hard", "fiendish"))],
+                                  args.repeat)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the sudoku solver over the puzzle catalog")
+    parser.add_argument("--puzzles", metavar="NAME", type=str, nargs="*",
+                        help="puzzles to benchmark; do not use argument to benchmark all puzzles.")
+    parser.add_argument("--operators", metavar="OPERATOR", type=str, nargs="*",
+                        choices=board_update_descriptions.operators_description.keys(),
+                        help="operators to benchmark; do not use argument to benchmark all operators.")
+    parser.add_argument("--benchmarks", metavar="BENCHMARK", type=str, nargs="*",
+                        choices=["operators", "cloning", "solverloop", "pivot", "solve", "scheduling", "dfs", "exactcover", "feasibility", "selection", "simplify"],
+                        default=["operators"],
+                        help="benchmarks to run")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="number of times to repeat each measurement")
+    parser.add_argument("--verbosity", "-v", action="count", default=0)
+    parser.add_argument("--snapshots", nargs="?",
+                        choices=sudoku_logger.SNAPSHOT_LEVELS,
+                        help="how much board state to log with each operator (default full)")
+    parser.add_argument("--snapshotrate", type=int,
+                        help="log a full snapshot every SNAPSHOTRATE updates when snapshots are sampled")
+
+    args = parser.parse_args()
+    main(args)
@@ -11,7 +11,11 @@ Sudoku Board and Cell data structures.
 # import json
 import uuid
 import config_data
+import exact_cover
+import solution_index
 import copy
+import random
+from array import array
 
 import logging
 logger = logging.getLogger(__name__)
@@ -21,58 +25,63 @@ class Cell():
     A single cell on a Sudoku board.
     Each cell tracks and provides manipulation for the set of
     candidate values that the Cell may take.
+
+    Candidates are stored as an integer bitmask, where bit v is set
+    iff value v is still possible in the cell.  The list / set getters
+    are kept for callers that want containers, but the hot paths
+    (operators, validity checks, json rendering) should prefer
+    getValueMask() and the mask helpers below.
+
+    A Cell does not own its candidates: it is a view onto one integer
+    position of its Board's candidate storage, and every change goes
+    through the Board.  Boards hand out one Cell per position, so Cells
+    from the same Board can still be compared by identity.
     """
 
     # An ordered list of
     display_list = ['1', '2', '3', '4', '5', '6', '7',
                     '8', '9', 'A', 'B', 'C', 'D', 'E', 'F', 'G']
 
-    def __init__(self, identifier, value='.', degree=3):
-        """ Initializes a Cell with an identifier and valueset or another cell.
+    # Cache from a candidate bitmask to the ordered tuple of values it encodes
+    _mask_values = {}
+
+    def __init__(self, sboard, index):
+        """ Initializes a Cell viewing position index of sboard.
 
         Args:
-            identifier   : a string identifier within a board (value expected),
-                            or a cell to copy
-            value        : the collection of potential values, or '.' for complete value set
-            degree (int) : the number of blocks on a side (determines values)
+            sboard (Board) : the board owning the candidate storage
+            index (int)    : the integer position of the cell in sboard (row-major)
         Returns:
-            Cell   : a new cell.
+            Cell   : a new cell view.
 
         Fields:
             propagated (boolean) : True if the cell assignment has been propagated to
                 sister cells (i.e., removing values from that cell)
+        """
+        self._board = sboard
+        self._idx = index
+        self._degree = sboard.getDegree()
+        self._id = Board.getCellIdAt(index, self._degree)
 
-        Identifier parameter must be either a string or a Cell.
-        NOTE: the value set is copied via set.copy(), which is fine for
-              ints and strs, but won't work if the values become some other
-              complex object type.
-        """
-        if isinstance(identifier, Cell):
-            #  If identifier is a Cell, make a copy
-            self._id = identifier._id
-            assert isinstance(self._id, str), "Cell's id should be a string"
-            self._propagated = identifier._propagated
-            assert isinstance(self._propagated, bool), \
-                "Cell's _propagated should be a boolean"
-            self._values = sorted(list(identifier._values))
-            self._degree = identifier._degree
-        else:
-            # If identifier is a unique ID (str or int)
-            self._id = identifier
-            self._propagated = False
-            self._degree = degree
-            if (value == '0' or value == '.'):
-                # Get all possible values
-                self._values = sorted(Cell.getPossibleValuesByDegree(degree))
-            elif isinstance(value, str):
-                self._values = [self.getValueDisplays(
-                    self._degree).index(value)]
-            elif isinstance(value, list):
-                self._values = sorted((value))
-            elif isinstance(value, int):
-                self._values = [value]
-
-        assert isinstance(self._values, list), "Cell's values should be a list"
+    @ classmethod
+    def maskFromState(cls, value, degree=3):
+        """ Returns the candidate bitmask described by a cell state.
+
+        Args:
+            value        : the collection of potential values, a display string,
+                            a single int value, or '.' for complete value set
+            degree (int) : the number of blocks on a side (determines values)
+        """
+        if (value == '0' or value == '.'):
+            # Get all possible values
+            return cls.getFullMaskByDegree(degree)
+        elif isinstance(value, str):
+            return 1 << cls.getValueDisplays(degree).index(value)
+        elif isinstance(value, list):
+            return cls.maskFromValues(value)
+        elif isinstance(value, int):
+            return 1 << value
+        raise TypeError(f'Can\'t initialize Cell values from {value} of type {type(value)}.')
 
     @ classmethod
     def getPossibleValuesByDegree(cls, degree=3):
@@ -85,6 +94,28 @@ class Cell():
         except TypeError:
             assert False, "Cell's degree must be square-able (**2)"
 
+    @ classmethod
+    def getFullMaskByDegree(cls, degree=3):
+        """ Returns the bitmask with every possible value for puzzle of degree set. """
+        return (1 << (degree ** 2)) - 1
+
+    @ classmethod
+    def maskFromValues(cls, values):
+        """ Returns the bitmask encoding the collection of values. """
+        mask = 0
+        for val in values:
+            mask |= 1 << val
+        return mask
+
+    @ classmethod
+    def valuesFromMask(cls, mask):
+        """ Returns the ordered tuple of values encoded in mask. """
+        values = cls._mask_values.get(mask)
+        if values is None:
+            values = tuple(val for val in range(mask.bit_length()) if mask >> val & 1)
+            cls._mask_values[mask] = values
+        return values
+
     @ classmethod
     def getValueDisplays(cls, degree=3):
         """ Returns sorted list of all display values for puzzle of degree.
@@ -99,6 +130,12 @@ class Cell():
         """
         return sorted([cls.display_list[idx] for idx in values])
 
+    @ classmethod
+    def displayMask(cls, mask):
+        """ Returns list of displays of the values encoded in mask.
+        """
+        return [cls.display_list[idx] for idx in cls.valuesFromMask(mask)]
+
     @ classmethod
     def displayValue(cls, val):
         """ Returns displays of the value val.
@@ -107,7 +144,7 @@ class Cell():
 
     def __str__(self):
         return 'Cell(ID=' + str(self._id) + \
-               ', Propagated=' + str(self._propagated) + \
+               ', Propagated=' + str(self.isPropagated()) + \
                ', ValueSet={' + self.getStateStr(True) + '})'
 
     def assign(self, value):
@@ -122,11 +159,13 @@ class Cell():
         Raises:
             AssertionError  : if value was not a valid possibility
         """
-        assert value in self._values, \
+        bit = 1 << value
+        mask = self._board._values[self._idx]
+        assert mask & bit, \
             "Cannot assign %s to Cell %s" % (
                 str(value), str(self.getIdentifier()))
-        if len(self._values) > 1:
-            self._values = [value]
+        if mask != bit:
+            self._board._setMask(self._idx, bit)
             return True
         return False
 
@@ -135,19 +174,32 @@ class Cell():
         Remove value from self's set of candidate values.
         Return True if the value was present, False otherwise.
         """
-        try:
-            self._values.remove(value)
+        mask = self._board._values[self._idx]
+        bit = 1 << value
+        if mask & bit:
+            self._board._setMask(self._idx, mask ^ bit)
             return True
-        except ValueError:
-            return False
+        return False
+
+    def excludeMask(self, mask):
+        """
+        Remove every value in mask from self's set of candidate values.
+        Return the mask of values that were actually removed.
+        """
+        current = self._board._values[self._idx]
+        removed = current & mask
+        if removed:
+            self._board._setMask(self._idx, current ^ removed)
+        return removed
 
     def getCertainValue(self):
         """
         If cell has only one candidate value, return it
         Otherwise return None
         """
-        if(len(self._values) == 1):
-            return self._values[0]
+        mask = self._board._values[self._idx]
+        if mask and not mask & (mask - 1):
+            return mask.bit_length() - 1
         return None
 
     def getIdentifier(self):
@@ -163,7 +215,7 @@ class Cell():
         displays = Cell.getValueDisplays(self._degree)
         width = sum([len(x) for x in displays]) + 1
         if(uncertain):
-            s = [displays[val] for val in self.getValues()]
+            s = [displays[val] for val in Cell.valuesFromMask(self.getValueMask())]
             if not s:
                 # Underconstrained: highlight a conflict
                 return str.center('X', width)
@@ -180,31 +232,193 @@ class Cell():
         else:
             return '. '
 
+    def getIndex(self):
+        """ Return the integer position of self on its board. """
+        return self._idx
+
+    def getValueMask(self):
+        """ Return the bitmask of current possible values. """
+        return self._board._values[self._idx]
+
     def getValues(self):
         """ Return ordered list of current possible values. """
-        return sorted(self._values)
+        return list(Cell.valuesFromMask(self._board._values[self._idx]))
 
     def getValueSet(self):
         """ Return set of current possible values. """
-        return set(self._values)
+        return set(Cell.valuesFromMask(self._board._values[self._idx]))
+
+    def countValues(self):
+        """ Return the number of current possible values. """
+        return self._board._values[self._idx].bit_count()
 
     def hasValue(self, value):
         """ Return True iff value is possible in this Cell. """
-        return value in self._values
+        return self._board._values[self._idx] >> value & 1 == 1
 
     def isCertain(self):
         """ Return True iff this Cell has only one possible value. """
-        return len(self._values) == 1
+        mask = self._board._values[self._idx]
+        return mask != 0 and not mask & (mask - 1)
 
     def isOverConstrained(self):
         """ Return True iff this Cell has no possible values remaining. """
-        return len(self._values) == 0
+        return self._board._values[self._idx] == 0
 
     def isPropagated(self):
-        return self._propagated
+        return self._board._propagated >> self._idx & 1 == 1
 
     def setPropagated(self):
-        self._propagated = True
+        self._board._setPropagated(self._idx)
+
+# -----------------------------------------------------
+
+
+class Topology():
+    """
+    The fixed geometry of a puzzle of one degree: which cells make up
+    each unit, which units each cell is in, the peers of every cell,
+    and where boxes cross rows and columns.
+
+    A Topology is built once per degree by Board.initialize and never
+    modified afterwards, so all of its tables are tuples (or dicts of
+    tuples) that may be shared freely.  Each relation is available both
+    by name (for the string-based Board classmethods) and by row-major
+    cell index / bitset over cell indices (for the operators' hot loops).
+
+    Public attributes:
+        degree (int), width (int), size (int): the puzzle dimensions
+        cell_names (tuple[str]): cell names in row-major index order
+        cell_index (dict): cell name -> row-major index
+        units (tuple[str]): unit names, in unit definition order
+        all_cells (tuple[str]): cell names, in unit map order
+        sorted_rows (tuple[str]): row unit names, sorted
+        unit_cells (dict): unit name -> tuple of cell names
+        unit_indices (dict): unit name -> tuple of cell indices
+        unit_masks (dict): unit name -> bitset of cell indices
+        cell_units (dict): cell name -> tuple of unit names
+        peers (dict): cell name -> tuple of peer cell names
+        peer_indices (tuple[tuple[int]]): cell index -> tuple of peer cell indices
+        peer_masks (tuple[int]): cell index -> bitset of peer cell indices
+        cell_unit_bits (tuple[int]): cell index -> bitset over positions in units;
+            two cells share a unit iff their bitsets intersect
+        cell_unit_positions (tuple[tuple[int]]): cell index -> positions in units of its units
+        cell_unit_slots (tuple[tuple[(int, int)]]): cell index -> (position in units of the unit,
+            position of the cell within the unit) for each of its units
+        unit_positions (dict): unit name -> position in units
+        intersections (tuple): (box, line, tuple of cell indices) for every
+            box and row / column that share cells
+        intersection_positions (tuple[(int, int)]): for each of intersections, the bitmasks of the
+            positions of its cells within the box and within the line (as Board.getValuePositions)
+        unit_intersections (dict): unit name -> positions in intersections of the unit's intersections
+        cell_intersections (tuple[tuple[int]]): cell index -> positions in intersections of the
+            intersections holding the cell
+        zobrist_keys (tuple[int]): a random 64-bit key for every (cell index, value), at
+            cell index * (width + 1) + value; a board's state hash is the XOR of the keys of
+            its candidates (see Board.stateHash)
+    """
+
+    def __init__(self, degree, unit_defns, unit_map, cell_names):
+        """ Build the tables from the unit definitions and unit map of Board.initialize. """
+        self.degree = degree
+        self.width = degree ** 2
+        self.size = self.width ** 2
+        self.cell_names = tuple(cell_names)
+        self.cell_index = {name: idx for (idx, name) in enumerate(self.cell_names)}
+
+        self.units = tuple(unit_defns.keys())
+        self.all_cells = tuple(unit_map.keys())
+        self.sorted_rows = tuple(sorted(unit for unit in self.units if unit[0] == 'r'))
+        self.unit_cells = {unit: tuple(cells) for (unit, cells) in unit_defns.items()}
+        self.unit_indices = {unit: tuple(self.cell_index[cell] for cell in cells)
+                             for (unit, cells) in unit_defns.items()}
+        self.unit_masks = {unit: sum(1 << idx for idx in indices)
+                           for (unit, indices) in self.unit_indices.items()}
+        self.cell_units = {cell: tuple(units) for (cell, units) in unit_map.items()}
+        unit_bit = {unit: 1 << pos for (pos, unit) in enumerate(self.units)}
+        self.cell_unit_bits = tuple(sum(unit_bit[unit] for unit in self.cell_units[name])
+                                    for name in self.cell_names)
+        self.unit_positions = {unit: pos for (pos, unit) in enumerate(self.units)}
+        self.cell_unit_positions = tuple(tuple(self.unit_positions[unit] for unit in self.cell_units[name])
+                                         for name in self.cell_names)
+        self.cell_unit_slots = tuple(tuple((self.unit_positions[unit], self.unit_indices[unit].index(idx))
+                                           for unit in self.cell_units[name])
+                                     for (idx, name) in enumerate(self.cell_names))
+
+        # Peers keep the order of the units of the cell, then of the cells in each unit
+        peers = {}
+        for cell, units in self.cell_units.items():
+            seen = {cell}
+            cell_peers = []
+            for unit in units:
+                for other in self.unit_cells[unit]:
+                    if other not in seen:
+                        seen.add(other)
+                        cell_peers.append(other)
+            peers[cell] = tuple(cell_peers)
+        self.peers = peers
+        self.peer_indices = tuple(tuple(self.cell_index[other] for other in peers[name])
+                                  for name in self.cell_names)
+        self.peer_masks = tuple(sum(1 << idx for idx in indices) for indices in self.peer_indices)
+
+        intersections = []
+        for box in (unit for unit in self.units if unit[0] == 'b'):
+            for line in (unit for unit in self.units if unit[0] != 'b'):
+                common = self.unit_masks[box] & self.unit_masks[line]
+                if common:
+                    intersections.append((box, line, self.indicesFromMask(common)))
+        self.intersections = tuple(intersections)
+        self.intersection_positions = tuple(
+            (sum(1 << self.unit_indices[box].index(idx) for idx in indices),
+             sum(1 << self.unit_indices[line].index(idx) for idx in indices))
+            for (box, line, indices) in self.intersections)
+        self.unit_intersections = {unit: tuple(pos for (pos, (box, line, _)) in enumerate(self.intersections)
+                                               if unit in (box, line))
+                                   for unit in self.units}
+        self.cell_intersections = tuple(tuple(pos for (pos, (_, _, indices)) in enumerate(self.intersections)
+                                              if idx in indices)
+                                        for idx in range(self.size))
+
+        # Seeded by degree so that state hashes agree across processes and runs
+        keys = random.Random(degree)
+        self.zobrist_keys = tuple(keys.getrandbits(64) for _ in range(self.size * (self.width + 1)))
+
+    @ staticmethod
+    def indicesFromMask(mask):
+        """ Return the tuple of cell indices set in the bitset mask, in increasing order. """
+        indices = []
+        while mask:
+            low = mask & -mask
+            indices.append(low.bit_length() - 1)
+            mask ^= low
+        return tuple(indices)
+
+    def namesFromMask(self, mask):
+        """ Return the list of cell names set in the bitset mask, in row-major order. """
+        return [self.cell_names[idx] for idx in self.indicesFromMask(mask)]
+
+    def cellMask(self, cell_ids):
+        """ Return the bitset of the given cell names. """
+        mask = 0
+        for cell_id in cell_ids:
+            mask |= 1 << self.cell_index[cell_id]
+        return mask
+
+    def commonPeerMask(self, cell_ids):
+        """ Return the bitset of cells that are peers of every cell in cell_ids. """
+        mask = (1 << self.size) - 1
+        for cell_id in cell_ids:
+            mask &= self.peer_masks[self.cell_index[cell_id]]
+        return mask
+
+    def commonUnits(self, cell_ids):
+        """ Return the units that contain every cell in cell_ids, in unit definition order. """
+        bits = -1
+        for cell_id in cell_ids:
+            bits &= self.cell_unit_bits[self.cell_index[cell_id]]
+        if bits == -1:
+            return list(self.units)
+        return [self.units[pos] for pos in self.indicesFromMask(bits)]
 
 # -----------------------------------------------------
 
@@ -216,10 +430,31 @@ class Board():
     (e.g. A1, D3, etc.)
     Boards merely maintain state and answer questions about the state,
     see Unit and Solver for manipulation methods.
+
+    Internally, the candidate state of the whole board is one contiguous
+    array of bitmasks indexed by the row-major cell position 0..N^2-1;
+    string identifiers are translated at the edges via cell_names / cell_index.
     """
 
     unit_defns = {}
     unit_map = {}
+    # Map from degree to the list of cell names in row-major index order
+    cell_names = {}
+    # Map from degree to the mapping of cell names to their row-major index
+    cell_index = {}
+    # Map from degree to the mapping of unit names to the indices of their cells
+    unit_indices = {}
+    # Map from degree to the immutable Topology of that degree
+    topologies = {}
+
+    @ classmethod
+    def getTopology(cls, degree=3):
+        """ Return the Topology (precomputed unit and peer tables) for a puzzle of degree. """
+        try:
+            return cls.topologies[degree]
+        except KeyError:
+            cls.initialize(degree)
+            return cls.topologies[degree]
 
     @ classmethod
     def getCellUnits(cls, cell_id, degree=3):
@@ -229,28 +464,27 @@ class Board():
         """
         if not isinstance(cell_id, str):
             cell_id = cell_id.getIdentifier()
-        return cls.unit_map[degree][cell_id]
+        return cls.topologies[degree].cell_units[cell_id]
 
     @ classmethod
     def getUnitCells(cls, unit_id, degree=3):
         """ Return cells associated with unit_id in a puzzle of degree. """
-        return cls.unit_defns[degree][unit_id]
+        return cls.topologies[degree].unit_cells[unit_id]
 
     @ classmethod
     def getAllCells(cls, degree=3):
         """ Get all cell names in a puzzle of degree. """
-        return cls.unit_map[degree].keys()
+        return cls.topologies[degree].all_cells
 
     @ classmethod
     def getAllUnits(cls, degree=3):
         """ Get all unit names in a puzzle of degree. """
-        return cls.unit_defns[degree].keys()
+        return cls.topologies[degree].units
 
     @ classmethod
     def getSortedRows(cls, degree=3):
-        """ Get all unit names in a puzzle of degree. """
-        return sorted([name for name in filter(lambda x: cls.getUnitType(x) == 'row',
-                                               cls.unit_defns[degree].keys())])
+        """ Get all row names in a puzzle of degree, sorted. """
+        return list(cls.topologies[degree].sorted_rows)
 
     @ classmethod
     def getUnitType(cls, unit):
@@ -270,61 +504,60 @@ class Board():
             return 'Invalid Input'
 
     @ classmethod
-    def getAssociatedCellIds(cls, cell_id):
+    def getAssociatedCellIds(cls, cell_id, degree=3):
         """
         Get all cell IDs in units associated with
         target cell, without repeats.
-        Return empty list if no cell_id is given
-        """
-        associated_cells = []
-        if cell_id:
-            associated_units = cls.getCellUnits(cell_id)
-            for unit_id in associated_units:
-                unit_cells = cls.getUnitCells(unit_id)
-                for unit_cell in unit_cells:
-                    if unit_cell not in associated_cells and unit_cell != cell_id:
-                        associated_cells.append(unit_cell)
-        return associated_cells
+        Return empty tuple if no cell_id is given
+
+        cell_id may be a string or a Cell.
+        """
+        if not cell_id:
+            return ()
+        if not isinstance(cell_id, str):
+            cell_id = cell_id.getIdentifier()
+        return cls.topologies[degree].peers[cell_id]
 
     @ classmethod
-    def getCommonCells(cls, cell_id_list):
+    def getCommonCells(cls, cell_id_list, degree=3):
         """
         Get list of all cells jointly associated
-        to all cells in the list
+        to all cells in the list, in row-major order
         """
-        common_cell_set = set(cls.getAssociatedCellIds(cell_id_list[0]))
-
-        for cell_id in cell_id_list:
-            common_cell_set = common_cell_set & set(
-                cls.getAssociatedCellIds(cell_id))
-
-        return list(common_cell_set)
+        topology = cls.topologies[degree]
+        return topology.namesFromMask(topology.commonPeerMask(
+            [cell_id if isinstance(cell_id, str) else cell_id.getIdentifier()
+             for cell_id in cell_id_list]))
 
     @ classmethod
-    def getCommonUnits(cls, cell_id_list):
+    def getCommonUnits(cls, cell_id_list, degree=3):
         """
         Get list of all units jointly associated
         to all cells in the list
         """
-        common_unit_set = set(cls.getCellUnits(cell_id_list[0]))
-
-        for cell_id in cell_id_list:
-            common_unit_set = common_unit_set & set(cls.getCellUnits(cell_id))
-
-        return list(common_unit_set)
+        return cls.topologies[degree].commonUnits(cell_id_list)
 
     @ classmethod
-    def getUnionUnitSet(cls, cell_id_list):
+    def getUnionUnitSet(cls, cell_id_list, degree=3):
         """
         Get union set of units for the given cells
         """
-        union_unit_set = set(cls.getCellUnits(cell_id_list[0]))
-
+        cell_units = cls.topologies[degree].cell_units
+        union_unit_set = set()
         for cell_id in cell_id_list:
-            union_unit_set = union_unit_set | set(cls.getCellUnits(cell_id))
-
+            union_unit_set.update(cell_units[cell_id])
         return union_unit_set
 
+    @ classmethod
+    def getCellIdAt(cls, index, degree=3):
+        """ Returns the cell identifier at the integer position index in a puzzle of degree. """
+        return cls.cell_names[degree][index]
+
+    @ classmethod
+    def getCellIndex(cls, cell_id, degree=3):
+        """ Returns the integer position of cell_id in a puzzle of degree. """
+        return cls.cell_index[degree][cell_id]
+
     @ classmethod
     def getCellID(cls, row, col):
         """ Returns cell identifier given row and column identifier strings. """
@@ -413,13 +646,48 @@ class Board():
                     else:
                         cls.unit_map[degree][cell] = [unit]
 
+            # Precompute the immutable unit / peer tables for this degree,
+            # and expose the row-major index maps directly for the hot paths
+            topology = Topology(degree, cls.unit_defns[degree], cls.unit_map[degree],
+                                [cls.getCellIDFromArrayIndex(row, col)
+                                 for row in range(width) for col in range(width)])
+            cls.topologies[degree] = topology
+            cls.cell_names[degree] = topology.cell_names
+            cls.cell_index[degree] = topology.cell_index
+            cls.unit_indices[degree] = topology.unit_indices
+
     def __init__(self, state=['.' for i in range(0, 81)], degree=3, name=None):
         """
         Initialize a board for a puzzle of degree with the given state.
         State parameter can be a string, a json, or a Board to copy.
 
         Locals:
-            _state (dict {str -> Cell}): a mapping from every cell identifier to the Cell encapsulating that Cell's state
+            _values (array of unsigned short): the candidate bitmask of every cell, indexed by row-major position
+            _values_shared (bool): True if _values may be shared with another Board and must be copied before writing
+            _uncertain_values (int): the total number of candidates over all cells that are not certain
+            _certain_cells (int): the number of cells with exactly one candidate
+            _overconstrained_cells (int): the number of cells with no candidates
+            _certain_value_counts (array of unsigned char): for each (unit position, value), the number of certain cells
+                in the unit with that value, at unit position * (width + 1) + value
+            _counts_shared (bool): True if _certain_value_counts may be shared with another Board
+            _conflicts (int): the number of (unit, value) pairs with more than one certain cell
+            _hash (int): the Zobrist hash of the candidates; see stateHash
+            _value_positions (array of unsigned short): for each (unit position, value), the bitmask of
+                positions within the unit of the cells that can still hold the value (same layout
+                as _certain_value_counts); see getValuePositions
+            _positions_shared (bool): True if _value_positions may be shared with another Board
+            _propagated (int): bitmask over cell positions of the cells whose assignment has been propagated
+            _journal (array of unsigned short): the positions of the cells changed on this board, in order; see checkpoint
+            _journal_masks (array of unsigned short): the candidate bitmask each journaled cell had before its change,
+                so that the changes can be undone (see rollback)
+            _propagation_trail (list[tuple]): (checkpoint, _propagated) before the first propagation at each checkpoint
+            _journal_base (int): the checkpoint at which this board's journal starts (its source's checkpoint when copied)
+            _settled_operators (dict): operator name to the checkpoint at which the board was last at the
+                operator's fixed point (the operator would not change it); see setOperatorSettled
+            _settled_trail (list[tuple]): (checkpoint, operator name, its previous fixed point) for each fixed point
+                that replaced an earlier one, so that rollback can restore it
+            _cells (list[Cell]): lazily created Cell views, indexed by row-major position
+            _topology (Topology): the shared unit and peer tables for this board's degree
             _id (int): a unique identifier
             _parent_id (int): identifier of this board's parent
             goal_cell (str): the name/id of the goal cell to answer the question about
@@ -435,10 +703,16 @@ class Board():
         self._id = uuid.uuid1().int >> 64
         self._is_background = False
         self._action = {}
-        self._state = dict()
         assert isinstance(degree, int), "Degree must be an int."
         assert 2 <= degree <= 4, "Degree must be between 2 and 4 for now."
         self._degree = degree
+        self._propagated = 0
+        self._journal = array('H')
+        self._journal_masks = array('H')
+        self._journal_base = 0
+        self._propagation_trail = []
+        self._settled_operators = {}
+        self._settled_trail = []
         self._parent_id = None
         assert name is None or isinstance(name, str), f"Name must be a str, not {name} of type {type(name)}."
         self.accessible_cells = None
@@ -446,10 +720,31 @@ class Board():
         if isinstance(state, Board):
             # State is a Board; copy it, but keep the new identifier
             logger.info("Initializing Board for Board %s (from %s).", str(state.getIdentifier()), str(state.getPuzzleName()))
-            logger.debug("Incoming Board is %s.", str(state))
-            for cell in state.getCells():
-                self._state[cell.getIdentifier()] = Cell(cell)
+            logger.debug("Incoming Board is %s.", state)
             self._degree = state.getDegree()
+            # Share the candidate storage with the source until either board
+            # writes to it (see _setMask); pivots that discard a child never copy
+            self._values = state._values
+            self._values_shared = True
+            state._values_shared = True
+            self._uncertain_values = state._uncertain_values
+            self._certain_cells = state._certain_cells
+            self._overconstrained_cells = state._overconstrained_cells
+            self._certain_value_counts = state._certain_value_counts
+            self._counts_shared = True
+            state._counts_shared = True
+            self._conflicts = state._conflicts
+            self._hash = state._hash
+            self._value_positions = state._value_positions
+            self._positions_shared = True
+            state._positions_shared = True
+            self._propagated = state._propagated
+            # Checkpoints taken on the source stay meaningful here; changes the
+            # source made before the copy are not journaled again (see getDirtyUnitMask)
+            self._journal_base = state.checkpoint()
+            self._settled_operators = dict(state._settled_operators)
+            self._cells = [None] * len(self._values)
+            self._topology = Board.topologies[self._degree]
             self._parent_id = state._id
             self.accessible_cells = state.accessible_cells
             self.config = state.config.copy()
@@ -467,19 +762,23 @@ class Board():
             assignments = [item
                            for row in state['assignments'] for item in row]
             options = [item for row in state['availableMoves'] for item in row]
-            # Initialize cell state
-            i = 0
-            for identifier in sorted(Board.getAllCells(degree)):
-                cell_state = assignments[i] if assignments[i] is not None else options[i]
-                self._state[identifier] = Cell(identifier, cell_state)
-                i += 1
             del params['assignments']
             del params['availableMoves']
 
             if 'degree' in state:
                 self._degree = state['degree']
+                if self._degree not in Board.cell_names:
+                    Board.initialize(self._degree)
             else:
                 logger.warn("'degree' not specified in state: board initialization or use may fail unexpectedly.")
+            # Initialize cell state (both lists are flattened in row-major order)
+            self._values = array('H', [
+                Cell.maskFromState(assignments[i] if assignments[i] is not None else options[i], self._degree)
+                for i in range(len(assignments))])
+            self._values_shared = False
+            self._recount()
+            self._cells = [None] * len(self._values)
+            self._topology = Board.topologies[self._degree]
             if 'parentSerialNumber' in state:
                 self._parent_id = state['parentSerialNumber']
                 del params['parentSerialNumber']
@@ -509,11 +808,13 @@ class Board():
                 False, False, ''), name, params)
         elif isinstance(state, str):
             logger.info("Initializing Board for string %s, name %s.", str(state), str(name))
-            i = 0
-            for identifier in sorted(Board.getAllCells(degree)):
-                self._state[identifier] = Cell(identifier, state[i])
-                i += 1
+            self._values = array('H', [Cell.maskFromState(state[i], degree)
+                                       for i in range(len(Board.cell_names[degree]))])
+            self._values_shared = False
+            self._recount()
             self._degree = degree
+            self._cells = [None] * len(self._values)
+            self._topology = Board.topologies[self._degree]
 
             self.config = config_data.ConfigurationData(self.getStateStr(
                 False, False, ''), name)
@@ -521,7 +822,7 @@ class Board():
             self.computeAccessibleCells()
             logger.debug("Calculated accessible cells as %s.", str(self.accessible_cells))
         else:
-            raise TypeError('Can\'t initialize Board from input type ' + type(state)
+            raise TypeError('Can\'t initialize Board from input type ' + str(type(state))
                             + '. (Must be Board, dict, or str.)')
 
     def __str__(self):
@@ -530,8 +831,8 @@ class Board():
         output += self.getStateStr(True)
 
         output += '\nCells:\n'
-        for key in self._state:
-            output += str(self._state[key]) + '\n'
+        for cell in self.getCells():
+            output += str(cell) + '\n'
 
         return output
 
@@ -545,9 +846,9 @@ class Board():
         """ If we have a goal cell, compute accessible cells and store them in self.accessible_cells.
             If we don't have a goal cell, return all remaining uncertain cells. """
         goal_cell = self.getGoalCell()
-        offlimits = self.getAssociatedCellIds(goal_cell)
+        offlimits = set(self.getAssociatedCellIds(goal_cell, self.getDegree()))
         if goal_cell:
-            offlimits.append(goal_cell)
+            offlimits.add(goal_cell)
 
         def inlimits(cell):
             if cell == goal_cell:
@@ -621,9 +922,23 @@ class Board():
     def countUncertainValues(self):
         """ Counts the number of uncertain values summed across all uncertain cells.
         """
-        uncertain_cells = filter(lambda c: not c.isCertain(), self.getCells())
-        n = sum([len(cell.getValues()) for cell in uncertain_cells])
-        return n
+        return self._uncertain_values
+
+    def countCertainCells(self):
+        """ Counts the number of cells with exactly one candidate value. """
+        return self._certain_cells
+
+    def countUncertainCells(self):
+        """ Counts the number of cells without exactly one candidate value (including over-constrained cells). """
+        return len(self._values) - self._certain_cells
+
+    def countOverConstrainedCells(self):
+        """ Counts the number of cells with no candidate values left. """
+        return self._overconstrained_cells
+
+    def hasInvalidCells(self):
+        """ Returns True iff invalidCells() would be non-empty, without building the list. """
+        return self._overconstrained_cells > 0 or self._conflicts > 0
 
     def countAssociatedUncertainValuesGivenUncertainCell(self, cell):
         """ Counts the number of uncertain values summed across all uncertain cells associated with cell,
@@ -632,38 +947,393 @@ class Board():
         """
         if cell.isCertain():
             return 0
-        associations = [self.getCell(c) for c in self.getAssociatedCellIds(cell)]
-        uncertain_cells = [c for c in filter(lambda c: not c.isCertain(), associations)]
-        n = sum([len(cell.getValues()) for cell in uncertain_cells])
+        # The cell itself is counted along with its peers
+        values = self._values
+        n = values[cell.getIndex()].bit_count()
+        for idx in self._topology.peer_indices[cell.getIndex()]:
+            count = values[idx].bit_count()
+            if count != 1:
+                n += count
         return n
 
+    def getValuePositions(self, unit_name, value):
+        """ Returns the bitmask of the positions within unit_name (bit i for the i-th cell of
+            getUnitCells(unit_name)) of the cells that can still hold value.
+        """
+        return self._value_positions[self._topology.unit_positions[unit_name] * (self._degree ** 2 + 1) + value]
+
     def getValueCountAndCells(self, unit_name, value):
         """ Counts number of times a value is present in a unit.
         """
-        value_count = 0
-        cells_with_value = []
-        for cell_name in self.getUnitCells(unit_name):
-            cell = self.getCell(cell_name)
-            if value in cell.getValues():
-                value_count += 1
-                cells_with_value.append(cell_name)
-        return value_count, cells_with_value
+        positions = self.getValuePositions(unit_name, value)
+        unit_cells = self._topology.unit_cells[unit_name]
+        cells_with_value = [unit_cells[pos] for pos in Topology.indicesFromMask(positions)]
+        return len(cells_with_value), cells_with_value
+
+    def _setMask(self, index, mask):
+        """ Replace the candidate bitmask of the cell at index, journaling the change.
+
+        All candidate changes funnel through here (see Cell.assign / Cell.exclude),
+        so this is where a board copied from another takes its own copy of the
+        candidate storage.
+        """
+        old_mask = self._values[index]
+        if old_mask != mask:
+            self._journal.append(index)
+            self._journal_masks.append(old_mask)
+        self._writeMask(index, mask)
+
+    def _writeMask(self, index, mask):
+        """ Replace the candidate bitmask of the cell at index without journaling it (see rollback). """
+        if self._values_shared:
+            self._values = self._values[:]
+            self._values_shared = False
+        # Keep the uncertainty counters current (see _recount)
+        old_mask = self._values[index]
+        old_count = old_mask.bit_count()
+        new_count = mask.bit_count()
+        if old_count == 1:
+            self._certain_cells -= 1
+            self._countCertainValue(index, old_mask, -1)
+        else:
+            self._uncertain_values -= old_count
+            if old_count == 0:
+                self._overconstrained_cells -= 1
+        if new_count == 1:
+            self._certain_cells += 1
+            self._countCertainValue(index, mask, 1)
+        else:
+            self._uncertain_values += new_count
+            if new_count == 0:
+                self._overconstrained_cells += 1
+        # Keep the value-position index current
+        changed = old_mask ^ mask
+        if changed:
+            if self._positions_shared:
+                self._value_positions = self._value_positions[:]
+                self._positions_shared = False
+            positions = self._value_positions
+            stride = self._degree ** 2 + 1
+            changed_values = Cell.valuesFromMask(changed)
+            for (unit_pos, cell_pos) in self._topology.cell_unit_slots[index]:
+                base = unit_pos * stride
+                bit = 1 << cell_pos
+                for value in changed_values:
+                    positions[base + value] ^= bit
+            # Keep the state hash current
+            keys = self._topology.zobrist_keys
+            base = index * stride
+            state_hash = self._hash
+            for value in changed_values:
+                state_hash ^= keys[base + value]
+            self._hash = state_hash
+        self._values[index] = mask
+
+    def _countCertainValue(self, index, mask, delta):
+        """ Add delta to the certain counts of the single value in mask in each unit of the cell at index,
+            keeping _conflicts current. """
+        if self._counts_shared:
+            self._certain_value_counts = self._certain_value_counts[:]
+            self._counts_shared = False
+        counts = self._certain_value_counts
+        stride = self._degree ** 2 + 1
+        value = mask.bit_length() - 1
+        for pos in self._topology.cell_unit_positions[index]:
+            slot = pos * stride + value
+            count = counts[slot]
+            if delta > 0 and count == 1:
+                self._conflicts += 1
+            elif delta < 0 and count == 2:
+                self._conflicts -= 1
+            counts[slot] = count + delta
+
+    def _recount(self):
+        """ Recompute the uncertainty and conflict counters and the value-position index from scratch;
+            _setMask maintains them afterwards. """
+        topology = Board.getTopology(self._degree)
+        stride = self._degree ** 2 + 1
+        self._uncertain_values = 0
+        self._certain_cells = 0
+        self._overconstrained_cells = 0
+        self._certain_value_counts = array('B', bytes(len(topology.units) * stride))
+        self._counts_shared = False
+        self._conflicts = 0
+        self._value_positions = array('H', bytes(2 * len(topology.units) * stride))
+        self._positions_shared = False
+        self._hash = 0
+        for (idx, mask) in enumerate(self._values):
+            for value in Cell.valuesFromMask(mask):
+                self._hash ^= topology.zobrist_keys[idx * stride + value]
+            for (unit_pos, cell_pos) in topology.cell_unit_slots[idx]:
+                for value in Cell.valuesFromMask(mask):
+                    self._value_positions[unit_pos * stride + value] |= 1 << cell_pos
+            count = mask.bit_count()
+            if count == 1:
+                self._certain_cells += 1
+                for pos in topology.cell_unit_positions[idx]:
+                    slot = pos * stride + mask.bit_length() - 1
+                    if self._certain_value_counts[slot] == 1:
+                        self._conflicts += 1
+                    self._certain_value_counts[slot] += 1
+            else:
+                self._uncertain_values += count
+                if count == 0:
+                    self._overconstrained_cells += 1
+
+    def getSnapshot(self):
+        """ Return this board's candidate storage as an immutable snapshot.
+
+        The storage is shared rather than copied (this board copies it before
+        its next change, see _setMask), so taking a snapshot is O(1).
+        Use fromSnapshot to read it back.
+        """
+        self._values_shared = True
+        return self._values
+
+    def hasSnapshot(self, values):
+        """ Return True iff this board's candidates are those in values (see getSnapshot).
+
+        Unlike comparing against getSnapshot(), this leaves the storage unshared,
+        so the board's next change does not copy it.
+        """
+        return self._values == values
+
+    @ classmethod
+    def fromSnapshot(cls, values, degree=3):
+        """ Return a minimal read-only Board over snapshot values (see getSnapshot), for rendering.
+
+        The Board has no configuration, identifier, or goal.
+        """
+        sboard = cls.__new__(cls)
+        sboard._degree = degree
+        sboard._values = values
+        sboard._values_shared = True
+        sboard._propagated = 0
+        sboard._journal = array('H')
+        sboard._journal_masks = array('H')
+        sboard._journal_base = 0
+        sboard._propagation_trail = []
+        sboard._settled_operators = {}
+        sboard._settled_trail = []
+        sboard._recount()
+        sboard._cells = [None] * len(values)
+        sboard._topology = cls.getTopology(degree)
+        sboard._parent_id = None
+        sboard.accessible_cells = None
+        sboard.config = None
+        return sboard
+
+    def stateHash(self):
+        """ Return a 64-bit hash of the candidates of every cell.
+
+        Boards of the same degree with the same candidates hash alike, whatever
+        the order of the changes that led to them, in any process; nothing else
+        (goal, configuration, propagation) is hashed.  The hash is kept current on
+        every change, so this is O(1).
+        """
+        return self._hash
+
+    def checkpoint(self):
+        """ Return a marker for the board's current state, for rollback, getDirtyUnitMask,
+            getDirtyCells and hasChangedSince.
+
+        Every candidate change advances it and rollback moves it back; checkpoints
+        taken on a board remain valid on the boards copied from it.
+        """
+        return self._journal_base + len(self._journal)
+
+    def hasChangedSince(self, checkpoint):
+        """ Return True iff any candidate on the board has changed since checkpoint. """
+        return self._journal_base + len(self._journal) != checkpoint
+
+    def getDirtyUnitMask(self, checkpoint):
+        """ Return the bitset (over unit positions, see Topology.cell_unit_bits) of the units
+            containing a cell changed since checkpoint.
+
+        Every unit is dirty if checkpoint is None or predates this board's own journal.
+        """
+        topology = self._topology
+        if checkpoint is None or checkpoint < self._journal_base:
+            return (1 << len(topology.units)) - 1
+        unit_bits = topology.cell_unit_bits
+        dirty = 0
+        for idx in self._journal[checkpoint - self._journal_base:]:
+            dirty |= unit_bits[idx]
+        return dirty
+
+    def getDirtyCells(self, checkpoint):
+        """ Yield, in getAllCells order, the names of the cells that share a unit with a cell
+            changed since checkpoint (every cell if checkpoint is None).
+
+        The journal is consulted as the iteration proceeds, so changes the caller
+        makes while iterating also mark the cells not yet yielded.  An operator
+        whose search at a cell reads and writes only the cell's own units can
+        restrict each pass to getDirtyCells(start of the previous pass) and reach
+        the same fixed point, in the same order, as rescanning every cell.
+        """
+        topology = self._topology
+        if checkpoint is None:
+            yield from topology.all_cells
+            return
+        unit_bits = topology.cell_unit_bits
+        cell_index = topology.cell_index
+        seen = checkpoint
+        dirty = 0
+        for cell_id in topology.all_cells:
+            current = self._journal_base + len(self._journal)
+            if current != seen:
+                dirty |= self.getDirtyUnitMask(seen)
+                seen = current
+            if unit_bits[cell_index[cell_id]] & dirty:
+                yield cell_id
+
+    def getDirtyUnits(self, checkpoint):
+        """ Yield, in getAllUnits order, the units containing a cell changed since checkpoint
+            (every unit if checkpoint is None).
+
+        Like getDirtyCells, the journal is consulted as the iteration proceeds.
+        """
+        units = self._topology.units
+        if checkpoint is None:
+            yield from units
+            return
+        seen = checkpoint
+        dirty = 0
+        for (pos, unit) in enumerate(units):
+            current = self._journal_base + len(self._journal)
+            if current != seen:
+                dirty |= self.getDirtyUnitMask(seen)
+                seen = current
+            if dirty >> pos & 1:
+                yield unit
+
+    def rollback(self, checkpoint):
+        """ Undo every candidate change made since checkpoint (see checkpoint), in reverse order.
+
+        Cell propagation marks set since checkpoint are cleared as well, so that
+        exclusion propagates those cells again, and each operator's fixed point
+        goes back to the one it had at checkpoint.  The configuration and log are not
+        rolled back; callers that need them restored keep a config.copy().
+        A board cannot roll back past the point at which it was copied from another.
+        """
+        assert self._journal_base <= checkpoint <= self.checkpoint(), \
+            f'Cannot roll back to checkpoint {checkpoint} outside [{self._journal_base}, {self.checkpoint()}]'
+        start = checkpoint - self._journal_base
+        journal = self._journal
+        masks = self._journal_masks
+        for pos in range(len(journal) - 1, start - 1, -1):
+            self._writeMask(journal[pos], masks[pos])
+        del journal[start:]
+        del masks[start:]
+        trail = self._propagation_trail
+        while trail and trail[-1][0] >= checkpoint:
+            self._propagated = trail.pop()[1]
+        settled_trail = self._settled_trail
+        while settled_trail and settled_trail[-1][0] > checkpoint:
+            (_, op, previous) = settled_trail.pop()
+            self._settled_operators[op] = previous
+        self._settled_operators = {op: settled for (op, settled) in self._settled_operators.items()
+                                   if settled <= checkpoint}
+
+    def _setPropagated(self, index):
+        """ Mark the cell at index as propagated, remembering the marks to restore on rollback. """
+        bit = 1 << index
+        if self._propagated & bit:
+            return
+        checkpoint = self.checkpoint()
+        if not self._propagation_trail or self._propagation_trail[-1][0] != checkpoint:
+            self._propagation_trail.append((checkpoint, self._propagated))
+        self._propagated |= bit
+
+    def getPropagatedMask(self):
+        """ Return the bitmask over cell positions of the cells whose assignment has been propagated. """
+        return self._propagated
+
+    def adoptSnapshot(self, values, propagated=0):
+        """ Change every cell to its candidates in values (a snapshot of a board of the same degree),
+            and mark propagated the cells set in the propagated bitmask.
+
+        Only the cells that differ are changed, each through the journal,
+        so the board can still be rolled back past the adoption.
+        """
+        assert len(values) == len(self._values), 'Cannot adopt a snapshot of a board of another degree'
+        current = self._values
+        for idx in range(len(values)):
+            if current[idx] != values[idx]:
+                self._setMask(idx, values[idx])
+                current = self._values
+        missing = propagated & ~self._propagated
+        while missing:
+            bit = missing & -missing
+            self._setPropagated(bit.bit_length() - 1)
+            missing ^= bit
+
+    def setOperatorSettled(self, op):
+        """ Record that the board is at op's fixed point: op has just run on it to a fixed point,
+            or without changing it.
+        """
+        checkpoint = self.checkpoint()
+        previous = self._settled_operators.get(op)
+        if previous == checkpoint:
+            return
+        if previous is not None:
+            self._settled_trail.append((checkpoint, op, previous))
+        self._settled_operators[op] = checkpoint
+
+    def isOperatorSettled(self, op):
+        """ Return True iff the board is at op's fixed point and nothing has changed since. """
+        return self._settled_operators.get(op) == self.checkpoint()
+
+    def getSettledOperators(self):
+        """ Return the names, sorted, of the operators the board is at the fixed point of (see isOperatorSettled). """
+        checkpoint = self.checkpoint()
+        return tuple(sorted(op for (op, settled) in self._settled_operators.items() if settled == checkpoint))
+
+    def getOperatorFixedPoint(self, op):
+        """ Return the checkpoint at which the board was last at op's fixed point, or None.
+
+        Only the cells changed since then (see getDirtyCells and getDirtyUnits) can
+        give op anything new to find.
+        """
+        return self._settled_operators.get(op)
+
+    def getMask(self, index):
+        """ Returns the candidate bitmask of the cell at the integer position index. """
+        return self._values[index]
+
+    def getCellAt(self, index):
+        """ Returns the cell at the integer position index. """
+        cell = self._cells[index]
+        if cell is None:
+            cell = Cell(self, index)
+            self._cells[index] = cell
+        return cell
 
     def getCell(self, cell_id):
         """
         Returns the identified cell
         """
-        return self._state[cell_id]
+        return self.getCellAt(Board.cell_index[self._degree][cell_id])
 
     def getCells(self):
-        """ Returns all of the cells in the board. """
-        return self._state.values()
+        """ Returns all of the cells in the board, in row-major order. """
+        return [self.getCellAt(idx) for idx in range(len(self._values))]
 
     def getCertainCells(self):
         """
         Return the list of cells that have only one candidate value
         """
-        return [cell for cell in self.getCells() if cell.isCertain()]
+        return [self.getCellAt(idx) for (idx, mask) in enumerate(self._values)
+                if mask and not mask & (mask - 1)]
+
+    def getUnpropagatedCertainIndices(self):
+        """
+        Return the positions, in row-major order, of the cells that have only one candidate value
+        whose assignment has not been propagated yet
+        """
+        propagated = self._propagated
+        return [idx for (idx, mask) in enumerate(self._values)
+                if mask and not mask & (mask - 1) and not propagated >> idx & 1]
 
     def getStateStr(self, uncertain=False, human_readable=True, sep='|'):
         """
@@ -671,11 +1341,12 @@ class Board():
         sep separates the cells in a non human-readable printing
         """
         degree = self.getDegree()
+        width = degree ** 2
         output = ''
 
-        for identifier in sorted(Board.getAllCells(degree)):
+        for idx in range(len(self._values)):
             if human_readable:
-                (row, col) = Board.getLocations(identifier, degree)
+                (row, col) = divmod(idx, width)
                 # Tricky formatting: first check if we should end a row
                 if 0 == col:
                     # Have to have this as a separate check so our elif down below triggers properly
@@ -700,32 +1371,39 @@ class Board():
                         output += '+-'.join(['--' * degree] * degree) + '\n'
 
                 # Finally print the state string
-                output += self.getCell(identifier).getStateStr(uncertain, self.getGoalCell())
+                output += self.getCellAt(idx).getStateStr(uncertain, self.getGoalCell())
             else:
-                output += (self.getCell(identifier).getStateStr(uncertain, None).strip() + sep)
+                output += (self.getCellAt(idx).getStateStr(uncertain, None).strip() + sep)
 
         return output
 
     def getSimpleJson(self):
         """ Return simple json-compatible dictionary listing possible values across the board. """
-        def sorted_row_cells(row):
-            return sorted(Board.getUnitCells(row, self.getDegree()))
+        width = self.getDegree() ** 2
+        assignments = []
+        available_moves = []
+        for row in range(width):
+            row_assignments = []
+            row_moves = []
+            for mask in self._values[row * width:(row + 1) * width]:
+                if mask and not mask & (mask - 1):
+                    # A certain cell has an assignment and no remaining moves
+                    row_assignments.append(mask.bit_length() - 1)
+                    row_moves.append([])
+                else:
+                    row_assignments.append(None)
+                    row_moves.append(list(Cell.valuesFromMask(mask)))
+            assignments.append(row_assignments)
+            available_moves.append(row_moves)
         brd = {
             'degree': self.getDegree(),
             'serialNumber': self.getIdentifier(),
-            'assignments': [[self.getCell(identifier).getCertainValue()
-                             for identifier in sorted_row_cells(row)]
-                            for row in Board.getSortedRows(self.getDegree())],
-            'availableMoves': [[sorted(filter(lambda x: x != self.getCell(identifier).getCertainValue(),
-                                              self.getCell(identifier).getValues()))
-                                for identifier in sorted_row_cells(row)]  # for each cell id in the row,
-                               # print all the values for that cell that aren't the certain value
-                               # (this gives us an empty list when the cell is certain)
-                               for row in Board.getSortedRows(self.getDegree())],
+            'assignments': assignments,
+            'availableMoves': available_moves,
         }
         if self._parent_id:
             brd['parentSerialNumber'] = self._parent_id
-        if self.isSolved():
+        if self.isPuzzleSolved():
             brd['solved'] = True
         invalid_cells = self.invalidCells()
         if invalid_cells:
@@ -740,6 +1418,8 @@ class Board():
         logger.debug(f"Goal cell, accessible_cells: {self.getGoalCell()} and {self.accessible_cells}.")
         if self.getGoalCell():
             brd['goalCell'] = list(type(self).getLocations(self.getGoalCell(), self.getDegree()))
+            if self.config.report_goal_values:
+                brd['goalFeasibleValues'] = self.getGoalFeasibleValues()
         self.computeAccessibleCells()
         if self.accessible_cells:
             accessible_locs = [list(type(self).getLocations(
@@ -754,7 +1434,8 @@ class Board():
         """
         Return the list of cells that have multiple candidate values.
         """
-        return [cell for cell in self.getCells() if not cell.isCertain()]
+        return [self.getCellAt(idx) for (idx, mask) in enumerate(self._values)
+                if not mask or mask & (mask - 1)]
 
     def invalidCells(self):
         """
@@ -764,59 +1445,121 @@ class Board():
         and those cells that are assigned but that conflict with each other.
         """
 
+        if not self.hasInvalidCells():
+            return []
+
         # Collect all cells that indicate that this board is in an invalid state
         problem_cell_ids = set()
 
+        values = self._values
+        names = Board.cell_names[self.getDegree()]
+
         # For each unit of the Board, get the cells associated with the unit
-        for unit in Board.getAllUnits(self.getDegree()):
-            unit_cells = Board.getUnitCells(unit, self.getDegree())
-            # Map values seen to the cells in that unit to find conflicts and identify the conflicting cells.
-            values = dict()
-
-            for cell_id in unit_cells:
-                cell = self.getCell(cell_id)
-                if cell.isOverConstrained():
+        for unit_cells in Board.unit_indices[self.getDegree()].values():
+            # Accumulate the assigned values seen so far in the unit as a bitmask;
+            #   only fall back to identifying the conflicting cells if a value repeats.
+            seen = 0
+            conflicts = 0
+
+            for idx in unit_cells:
+                mask = values[idx]
+                if not mask:
                     # Some cell has no possible values left; note that and go on to the next cell
-                    problem_cell_ids.add(cell_id)
-                    # Note: The checks below will not trigger, but this may make the code flow clearer
+                    problem_cell_ids.add(names[idx])
                     continue
 
-                cell_val = cell.getCertainValue()
-                if cell_val is not None:
+                if not mask & (mask - 1):
                     # This cell has been assigned a single value; check for overlap within the unit
-                    if cell_val not in values:
-                        # We haven't seen this value before; no problems yet
-                        values[cell_val] = set()
-                    else:
-                        # We have seen this value before, so report all cells with that value so far
-                        problem_cell_ids.add(cell_id)
-                        problem_cell_ids.update(values[cell_val])
-                    # Save the current value -> cell id for later overlap detection
-                    values[cell_val].add(cell_id)
+                    if seen & mask:
+                        conflicts |= mask
+                    seen |= mask
+
+            if conflicts:
+                # Report all cells assigned a value that was seen more than once
+                for idx in unit_cells:
+                    mask = values[idx]
+                    if mask & conflicts and not mask & (mask - 1):
+                        problem_cell_ids.add(names[idx])
 
         return list(problem_cell_ids)
 
+    def getCatalogSolution(self):
+        """ Return the cached SolutionRecord (see solution_index) of this board's catalog puzzle,
+            or None if the puzzle is not in the catalog index.
+        """
+        record = solution_index.catalog_index().lookupPuzzle(self.getDisplayName())
+        if record is None or record.degree != self.getDegree():
+            return None
+        return record
+
+    def isPuzzleSolved(self):
+        """
+        Returns True if the board is the solution of its puzzle.
+        A catalog puzzle with a unique cached solution is compared against it;
+        any other board is checked with isSolved.
+        """
+        record = self.getCatalogSolution()
+        if record is not None and record.unique:
+            return self._values == record.solution
+        return self.isSolved()
+
+    def getExpectedAnswer(self):
+        """ Return the answer ('yes' or 'no') to the board's question, whether the goal cell can be one of
+            the canbe values, given by the cached unique solution of its catalog puzzle.
+            Returns None if the board asks no such question or its puzzle has no unique cached solution.
+        """
+        parameters = self.config.parameters if self.config else None
+        if not parameters or 'goal' not in parameters or 'canbe' not in parameters:
+            return None
+        record = self.getCatalogSolution()
+        if record is None or not record.unique:
+            return None
+        idx = self.getCell(parameters['goal']).getIndex()
+        return 'yes' if record.solution[idx] & config_data.parse_value_mask(parameters['canbe']) else 'no'
+
+    def isAnswerCorrect(self, answer):
+        """ Return whether answer ('yes' or 'no', in any case) answers the board's question correctly
+            (see getExpectedAnswer), or None if the correct answer is not known.
+        """
+        expected = self.getExpectedAnswer()
+        if expected is None:
+            return None
+        return str(answer).strip().lower() == expected
+
+    def getGoalFeasibleValues(self):
+        """ Return the list of values the goal cell takes in some solution of this board
+            (see exact_cover.feasible_values), or None if the board has no goal cell.
+        """
+        goal = self.getGoalCell()
+        if not goal:
+            return None
+        return list(Cell.valuesFromMask(exact_cover.feasible_values(self, self.getCell(goal).getIndex())))
+
     def isSolved(self):
         """
         Returns True if the board represents a valid solution.
         """
+        if self._certain_cells != len(self._values):
+            # Some cell is unassigned or over-constrained
+            return False
+
+        full_mask = Cell.getFullMaskByDegree(self.getDegree())
+        board_values = self._values
 
         # For each unit of the Board, get the associated Cells
-        for unit in Board.getAllUnits(self.getDegree()):
-            cells = Board.getUnitCells(unit, self.getDegree())
-            values = set()
+        for cells in Board.unit_indices[self.getDegree()].values():
+            values = 0
 
             # Get the set of values used in the unit
-            for cell_id in cells:
-                cell_val = self.getCell(cell_id).getCertainValue()
-                if cell_val is None:
+            for idx in cells:
+                mask = board_values[idx]
+                if not mask or mask & (mask - 1):
                     # Cell hasn't been assigned yet, or is over-constrained
                     return False
-                else:
-                    values.add(cell_val)
+                values |= mask
 
             # If the set of values for the unit is not the full set of values
-            if(values != set(Cell.getPossibleValuesByDegree(self.getDegree()))):
+            if(values != full_mask):
                 # Assignment doesn't represent all possible values
                 # At least one cell has a conflicting assignment, or is over-constrained
                 #   (at least, you'll find that after applying exclusion if you haven't already)
@@ -37,6 +37,15 @@ actions_description = {
                  'short_description': 'Apply all selected logical operators.',
                  'description': 'Return a single board with the logical operators '
                  + 'and free operators applied.'},
+    # Internal actions are for the server and its tools, and are never offered to players
+    'solve': {'function': 'solve_action',
+              'arguments': ['limit'],
+              'cost': None,
+              'internal': True,
+              'user_name': 'Solve',
+              'short_description': 'Find solutions to the board.',
+              'description': 'Return a solved board for each of the first limit solutions '
+              + 'reachable from the candidate values of the board.'},
 }
 
 operators_description = {
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Sandia National Laboratories
+October 17, 2026
+
+Build the solution index of the puzzle catalog (see solution_index.py).
+    - solves every puzzle in puzzles.puzzles in parallel, with a process pool
+    - reports the puzzles that are not unique or need more than the logical operators
+    - checks the answers recorded for the games' questions against the solutions
+"""
+
+import board_update_descriptions
+import exact_cover
+import puzzles
+import solution_index
+import solvers
+import translate
+
+import argparse
+import concurrent.futures
+import time
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+def solve_puzzle(name):
+    """ Solve the catalog puzzle name completely and logically, and return its index entry
+        (see SolutionIndex.write) followed by the seconds it took.
+    """
+    start = time.perf_counter()
+    sboard = translate.get_initial_board({'name': name})
+    solution = None
+    solution_count = 0
+    for found in exact_cover.iterate_solutions(sboard):
+        if solution is None:
+            solution = [mask.bit_length() - 1 for mask in found]
+        solution_count += 1
+        if solution_count > solution_index.SOLUTION_COUNT_CAP:
+            break
+    count_capped = solution_count > solution_index.SOLUTION_COUNT_CAP
+    solution_count = min(solution_count, solution_index.SOLUTION_COUNT_CAP)
+
+    # The operators that changed the board while solving it logically with every costly operator, cheapest first
+    #   (the free operators are applied after each of them anyway)
+    descriptions = board_update_descriptions.operators_description
+    ops = sorted([op for op in descriptions if op not in sboard.config.free_operations],
+                 key=lambda op: descriptions[op]['cost'])
+    initial_counts = dict(sboard.config.log.operators_use_count)
+    solved = solvers.logical_solve(sboard, ops)
+    final_counts = solved.config.log.operators_use_count
+    used = [op for op in board_update_descriptions.operators_description
+            if final_counts[op] > initial_counts[op]]
+
+    entry = (puzzles.puzzles[name], sboard.getDegree(), solution, solution_count, count_capped,
+             solved.isSolved(), used)
+    return (entry, time.perf_counter() - start)
+
+
+def check_game_answers():
+    """ Return the game puzzle names whose recorded answer disagrees with the solution in the index. """
+    wrong = []
+    for game in puzzles.games.values():
+        for name in game['puzzles']:
+            parameters = name.split('...')
+            answers = [param.split('=')[1] for param in parameters if param.startswith('answer=')]
+            if not answers:
+                continue
+            correct = translate.get_initial_board({'name': name}).isAnswerCorrect(answers[0])
+            if correct is False:
+                wrong.append(name)
+            elif correct is None:
+                logger.info("Cannot check the answer of %s", name)
+    return wrong
+
+
+def main(args):
+    logging.disable(logging.CRITICAL if not args.verbosity else logging.NOTSET)
+    names = args.puzzles if args.puzzles else list(puzzles.puzzles.keys())
+    start = time.perf_counter()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=args.workers) as pool:
+        results = list(pool.map(solve_puzzle, names))
+    elapsed = time.perf_counter() - start
+
+    print(f"{'name':<36} {'solutions':>9} {'logical':>8} {'seconds':>8}  operators")
+    for (name, (entry, seconds)) in zip(names, results):
+        (_, _, _, solution_count, count_capped, solved_logically, used) = entry
+        count = f"{solution_count}+" if count_capped else str(solution_count)
+        print(f"{name[:36]:<36} {count:>9} {'yes' if solved_logically else 'no':>8} {seconds:>8.3f}  {','.join(used)}")
+
+    solution_index.SolutionIndex.write(args.output, list(board_update_descriptions.operators_description),
+                                       [entry for (entry, _) in results])
+    print(f"Indexed {len(results)} puzzles in {elapsed:.2f} s into {args.output}")
+
+    solution_index.load_catalog_index(args.output)
+    for name in check_game_answers():
+        print(f"Recorded answer disagrees with the solution: {name}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Build the solution index of the puzzle catalog")
+    parser.add_argument("--puzzles", metavar="NAME", type=str, nargs="*",
+                        help="puzzles to index; do not use argument to index all puzzles.")
+    parser.add_argument("--output", type=str, default=solution_index.INDEX_FILE,
+                        help="index file to write")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of processes to solve with (default one per CPU)")
+    parser.add_argument("--verbosity", "-v", action="count", default=0)
+
+    args = parser.parse_args()
+    main(args)
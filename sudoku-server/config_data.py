@@ -9,13 +9,25 @@ Scoring and dispatch system configuration data for sudoku game actions.
 """
 
 import sudoku_logger
+import board
 import copy
 import board_update_descriptions
+import weakref
 
 import logging
 logger = logging.getLogger(__name__)
 
 
+def parse_value_mask(values):
+    """ Given a displayed value, or a list of them (as parse_name_config gives for canbe), return their candidate bitmask. """
+    if isinstance(values, str):
+        values = [values]
+    mask = 0
+    for value in values:
+        mask |= 1 << board.Cell.display_list.index(str(value).strip())
+    return mask
+
+
 def parse_name_config(name, initial_config=None):
     """ Given a board name with embedded config information, return a dictionary mapping config variables to values. """
     config_dict = initial_config if initial_config is not None else {}
@@ -49,31 +61,36 @@ def parse_name_config(name, initial_config=None):
     return config_dict
 
 
-class ConfigurationData():
-    """ Collect all the configuration data for a board and its SudokuLogger and the solver.
+class Policy():
+    """ The scoring, control flow and operator settings shared by all boards of a puzzle.
+
+    A Policy is frozen once built: boards never change these settings, so every
+    board of a puzzle (and every copy of those boards) refers to the same Policy,
+    interned by its configured costly operations and settings (see Policy.intern).
+    Use replace() to derive a Policy with different settings.
     """
 
-    def __init__(self, puzzle=None, name=None, initial_config: dict = None):
-        if name:
-            name = name.strip()
-        self.log = sudoku_logger.SudokuLogger(puzzle, name)
+    # Map from (costly operations string, settings) to the shared Policy, for as long as
+    #   some board (or cache entry) still refers to it
+    _interned = weakref.WeakValueDictionary()
 
-        # Keep track of any special rules for the board (see apply_config_from_name below)
+    def __init__(self, costly_operations=None):
+        # Keep track of any special rules for the board (see ConfigurationData.apply_config_from_name)
         self.rules = {}
 
-        # Keep track of parameters associated with the board
-        self.parameters = initial_config if initial_config is not None else {}
-
         # Keep track of available actions and operators and how to cost them
-        self.actions = [
-            k for k in board_update_descriptions.actions_description.keys()]
-        self.free_operations = ['exclusion']
-        self.costly_operations = ['inclusion',
-                                  'pointingpairs', 'nakedpairs', 'ywings']
+        self.actions = tuple(name for (name, description) in board_update_descriptions.actions_description.items()
+                             if not description.get('internal', False))
+        self.free_operations = ('exclusion',)
+        self.costly_operations = ('inclusion',
+                                  'pointingpairs', 'nakedpairs', 'ywings')
         # Limiting costly_operations for the test
         # self.costly_operations = [op for op in
         #                           filter(lambda op: op not in self.free_operations,
         #                                  board_update_descriptions.operators_description.keys())]
+        if costly_operations is not None:
+            self.rules['specializedCostlyOperations'] = True
+            self.costly_operations = tuple(costly_operations)
 
         # Keep track of configuration for control flow
 
@@ -87,6 +104,16 @@ class ConfigurationData():
         self.explore_to_fixed_point = True
         # If True, we restart trying logical operators from the beginning when we find one that works.
         self.restart_op_search_on_match = True
+        # If True, logical_solve replays fixed points already reached from the same board state
+        # with the same operators (see solvers.logical_solve_cache) instead of searching again
+        self.memoize_logical_solve = True
+        # If not None, a (goal cell, value bitmask) pair asking whether the goal cell can take one of
+        # the values: logical_solve stops as soon as the goal cell's candidates settle the question
+        # (see solvers.is_question_answered)
+        self.goal_question = None
+        # If True, boards sent to the client list the values their goal cell takes in some solution
+        # (see exact_cover.feasible_values)
+        self.report_goal_values = False
 
         # Keep track of scoring information
 
@@ -131,8 +158,119 @@ class ConfigurationData():
         # TODO MAL move configuration in here
         # self.verbosity = 0
 
-        self.apply_config_from_name()
         self.verify()
+        self._frozen = True
+
+    def __setattr__(self, key, value):
+        if getattr(self, '_frozen', False):
+            raise AttributeError(f'Policy is frozen; cannot set {key} (use replace).')
+        object.__setattr__(self, key, value)
+
+    def _settings(self):
+        return tuple((key, tuple(sorted(value.items())) if isinstance(value, dict) else value)
+                     for (key, value) in sorted(self.__dict__.items()) if key != '_frozen')
+
+    def __eq__(self, other):
+        # Policies with the same settings are interchangeable (e.g., as part of a cache key)
+        if not isinstance(other, Policy):
+            return NotImplemented
+        return self is other or self._settings() == other._settings()
+
+    def __hash__(self):
+        return hash(self._settings())
+
+    @ classmethod
+    def intern(cls, costly_operations=None, **settings):
+        """ Return the shared Policy for the configured costly operations
+            and any other settings configured (see apply_config_from_name).
+        """
+        if isinstance(costly_operations, str):
+            costly_operations = [costly_operations]
+        config_string = ','.join(costly_operations) if costly_operations is not None else None
+        key = (config_string, tuple(sorted(settings.items())))
+        policy = cls._interned.get(key)
+        if policy is None:
+            policy = cls(costly_operations)
+            if settings:
+                policy = policy.replace(**settings)
+            cls._interned[key] = policy
+        return policy
+
+    def replace(self, **changes):
+        """ Return a new (not interned) Policy with the given settings changed. """
+        policy = copy.copy(self)
+        object.__setattr__(policy, '_frozen', False)
+        for (key, value) in changes.items():
+            assert hasattr(self, key), f'Cannot set non-existant policy setting {key}'
+            if isinstance(value, list):
+                value = tuple(value)
+            setattr(policy, key, value)
+        policy.verify()
+        policy._frozen = True
+        return policy
+
+    def verify(self):
+        """ Perform a series of assertions to ensure that the configurations are self-consistent.
+        """
+        # This assumption is because if you terminate on successful operation, the logical operators
+        #    don't call complete_operation (which would update the board cost when cost_per_matching_set is False)
+        if self.terminate_on_successful_operation:
+            assert self.cost_per_matching_set, \
+                'Cannot terminate on successful operation unless applying cost on every matching set'
+        # This assumption is because the operators.apply_free_operators, which is used to simplify
+        #   the initial board, checks self.simplify before actually executing anything
+        if self.simplify_initial_board:
+            assert self.simplify, 'Must simplify throughout if you simplify initial boards.'
+        if self.explore_to_fixed_point:
+            assert not self.terminate_on_successful_operation, \
+                'Cannot explore an operator to a fixed point if we stop it after one successful match.'
+        shared_actions = set(self.free_operations).intersection(
+            self.costly_operations)
+        assert 0 == len(
+            shared_actions), f'Cannot have {shared_actions} as both free and costed'
+        for act in self.free_operations:
+            assert act in board_update_descriptions.operators_description.keys(), \
+                f'Cannot have non-existant free operation {act}'
+        for act in self.costly_operations:
+            assert act in board_update_descriptions.operators_description.keys(), \
+                f'Cannot have non-existant costly operation {act}'
+        for act in self.actions:
+            assert act in board_update_descriptions.actions_description.keys(), \
+                f'Cannot have non-existant action {act}'
+
+
+class ConfigurationData():
+    """ Collect all the configuration data for a board and its SudokuLogger and the solver.
+
+    The per-board part is small: the parameters (including the board's cost) and the
+    SudokuLogger with its counters.  Everything else is read from the shared, frozen
+    Policy of the puzzle, so e.g. config.simplify is config.policy.simplify.
+    """
+
+    __slots__ = ('policy', 'parameters', 'log')
+
+    def __init__(self, puzzle=None, name=None, initial_config: dict = None):
+        if name:
+            name = name.strip()
+        self.log = sudoku_logger.SudokuLogger(puzzle, name)
+
+        # Keep track of parameters associated with the board
+        self.parameters = initial_config if initial_config is not None else {}
+
+        # Keep track of the settings shared by all boards of this puzzle
+        self.policy = Policy.intern()
+
+        self.apply_config_from_name()
+
+    def __getattr__(self, key):
+        # Only reached for names that are not per-board: read them from the shared policy
+        if key.startswith('__') or key in ConfigurationData.__slots__:
+            raise AttributeError(key)
+        return getattr(self.policy, key)
+
+    def set_policy(self, **changes):
+        """ Replace our policy by one with the given settings changed (e.g., costly_operations). """
+        self.policy = self.policy.replace(**changes)
 
     def setParam(self, key, value):
         """ Add the mapping to our parameters storage. """
@@ -154,29 +292,53 @@ class ConfigurationData():
         if not self.log:
             return
         name = self.log.name
+        costly_operations = None
+        settings = {}
         if name:
             self.parameters = parse_name_config(name, self.parameters)
             if 'costlyops' in self.parameters:
                 # Get the part specifying the costly operations
-                self.rules['specializedCostlyOperations'] = True
-                # The ops themselves are verified later via self.verify
-                self.costly_operations = self.parameters['costlyops']
-        self.verify()
+                # The ops themselves are verified when the policy is built
+                costly_operations = self.parameters['costlyops']
+        # These settings also come back with boards the client sends (see add_config_mappings_to_dict)
+        if 'snapshots' in self.parameters:
+            # How much board state to log with each operator (see sudoku_logger.SNAPSHOT_LEVELS)
+            self.log.setSnapshotLevel(self.parameters['snapshots'],
+                                      self.parameters.get('snapshotrate'))
+        if self.parameters.get('memoize') in ('off', 'false'):
+            # Whether logical solves may be replayed from solvers.logical_solve_cache
+            settings['memoize_logical_solve'] = False
+        if self.parameters.get('goalvalues'):
+            settings['report_goal_values'] = True
+        if self.parameters.get('stopwhenanswered'):
+            # Stop solving once the goal cell settles whether it can be one of the canbe values
+            assert 'goal' in self.parameters and 'canbe' in self.parameters, \
+                'Can only stop when the question is answered given a goal cell and the canbe values asked about'
+            settings['goal_question'] = (self.parameters['goal'], parse_value_mask(self.parameters['canbe']))
+        self.policy = Policy.intern(costly_operations, **settings)
 
     def copy(self):
-        """ Return a deepcopy of myself. """
-        return copy.deepcopy(self)
-        # MAL TODO See if the logger is being deepcopied properly too and not getting all wound up
+        """ Return a copy of myself for a new board.
+
+        The policy is shared; only the parameters (which carry the cost)
+        and the SudokuLogger are copied.
+        """
+        clone = ConfigurationData.__new__(ConfigurationData)
+        clone.policy = self.policy
+        clone.parameters = dict(self.parameters)
+        clone.log = self.log.copy() if self.log else self.log
+        return clone
 
     def add_config_mappings_to_dict(self, json_dict):
         """ Add the config mappings that ought to be shared with the client to the board dictionary
             that will be sent via json. """
-        if self.actions:
-            json_dict['availableActions'] = self.actions
-        if self.rules:
-            json_dict['rules'] = self.rules
-            if 'specializedCostlyOperations' in self.rules:
-                json_dict['costlyOperations'] = self.costly_operations
+        policy = self.policy
+        if policy.actions:
+            json_dict['availableActions'] = list(policy.actions)
+        if policy.rules:
+            json_dict['rules'] = dict(policy.rules)
+            if 'specializedCostlyOperations' in policy.rules:
+                json_dict['costlyOperations'] = list(policy.costly_operations)
         for key in self.parameters.keys():
             json_dict[key] = self.parameters[key]
         return json_dict
@@ -184,40 +346,17 @@ class ConfigurationData():
     def verify(self):
         """ Perform a series of assertions to ensure that the configurations are self-consistent.
         """
-        # This assumption is because if you terminate on successful operation, the logical operators
-        #    don't call complete_operation (which would update the board cost when cost_per_matching_set is False)
-        if self.terminate_on_successful_operation:
-            assert self.cost_per_matching_set, \
-                'Cannot terminate on successful operation unless applying cost on every matching set'
-        # This assumption is because the operators.apply_free_operators, which is used to simplify
-        #   the initial board, checks self.simplify before actually executing anything
-        if self.simplify_initial_board:
-            assert self.simplify, 'Must simplify throughout if you simplify initial boards.'
-        if self.explore_to_fixed_point:
-            assert not self.terminate_on_successful_operation, \
-                'Cannot explore an operator to a fixed point if we stop it after one successful match.'
-        shared_actions = set(self.free_operations).intersection(
-            self.costly_operations)
-        assert 0 == len(
-            shared_actions), f'Cannot have {shared_actions} as both free and costed'
-        for act in self.free_operations:
-            assert act in board_update_descriptions.operators_description.keys(), \
-                f'Cannot have non-existant free operation {act}'
-        for act in self.costly_operations:
-            assert act in board_update_descriptions.operators_description.keys(), \
-                f'Cannot have non-existant costly operation {act}'
-        for act in self.actions:
-            assert act in board_update_descriptions.actions_description.keys(), \
-                f'Cannot have non-existant action {act}'
+        self.policy.verify()
 
     def debug_operation(self, op, msg2, board):
         """ Don't increase our operator cost for this partial operation.
             Returns:
                 False (unneeded, but to indicate that the operator should not terminate).
         """
-        board_string = board.getStateStr(True, False) if board else None
-        logger.debug("Logging: %s %s on %s", str(
-            op), str(msg2), str(board_string))
+        if logger.isEnabledFor(logging.DEBUG):
+            board_string = board.getStateStr(True, False) if board else None
+            logger.debug("Logging: %s %s on %s", str(
+                op), str(msg2), str(board_string))
         return False
 
     def adjust_cost(self, op):
@@ -321,9 +460,10 @@ class ConfigurationData():
     def debug_print(self, msg1, msg2, board):
         """ Over-use a convenient function to do logging.
         """
-        board_string = board.getStateStr(True, False) if board else None
-        logger.debug("Logging: %s %s on %s", str(
-            msg1), str(msg2), str(board_string))
+        if logger.isEnabledFor(logging.DEBUG):
+            board_string = board.getStateStr(True, False) if board else None
+            logger.debug("Logging: %s %s on %s", str(
+                msg1), str(msg2), str(board_string))
 
 
 defaultConfig = ConfigurationData()
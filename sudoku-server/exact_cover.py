@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sandia National Laboratories
+October 17, 2026
+
+Complete solver for Sudoku boards, posed as an exact cover problem.
+    - find the first solution, count solutions up to a limit, or enumerate all of them
+    - starts from a board's candidate state (not just its givens), for degrees 2 to 4
+    - decide which candidates of a cell some solution gives it (for a goal cell's question)
+"""
+
+import collections
+import itertools
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+# The exact cover problem of a board has a row for every (cell, candidate value) and a column
+#   for every cell (which takes exactly one value) and every (unit, value) (which exactly one cell
+#   of the unit takes).  The rows still available are the candidate bitmasks of the cells, so
+#   covering a row (assigning a value to a cell) removes the value from the cell's peers.
+#   This is Algorithm X: a column with no rows left ends the branch, a column with one row is
+#   covered at once (a cell with one candidate, or a value with one cell left in a unit), and
+#   otherwise the search branches on the rows of the cell column with the fewest rows.
+
+
+class ExactCoverTables():
+    """
+    The unit and peer tables the search needs for one degree, as plain tuples.
+
+    Members:
+        width (int): the number of values (and cells per unit)
+        full_mask (int): the candidate bitmask of every value
+        bits (tuple[int]): the candidate bitmask of each value
+        peers (tuple[tuple[int]]): cell index -> indices of the cells sharing a unit with it
+        units (tuple[tuple[int]]): the cell indices of every unit
+    """
+
+    # Map from degree to its tables
+    _by_degree = {}
+
+    def __init__(self, topology):
+        self.width = topology.width
+        self.full_mask = (1 << topology.width) - 1
+        self.bits = tuple(1 << value for value in range(topology.width))
+        self.peers = topology.peer_indices
+        self.units = tuple(topology.unit_indices[unit] for unit in topology.units)
+
+    @ classmethod
+    def forBoard(cls, sboard):
+        """ Return the tables for the degree of sboard. """
+        degree = sboard.getDegree()
+        try:
+            return cls._by_degree[degree]
+        except KeyError:
+            tables = cls(sboard.getTopology(degree))
+            cls._by_degree[degree] = tables
+            return tables
+
+
+def _propagate(masks, queue, tables):
+    """ Cover the rows forced on masks (in place), starting with the newly certain cells in queue.
+
+    Returns:
+        False if some column is left without rows (there is no solution), True otherwise.
+    """
+    peers = tables.peers
+    full_mask = tables.full_mask
+    while True:
+        while queue:
+            idx = queue.pop()
+            bit = masks[idx]
+            for peer in peers[idx]:
+                mask = masks[peer]
+                if mask & bit:
+                    mask ^= bit
+                    if not mask:
+                        return False
+                    masks[peer] = mask
+                    if not mask & (mask - 1):
+                        queue.append(peer)
+        # Look for the values that no cell, or only one cell, of a unit can take
+        for unit in tables.units:
+            once = 0
+            twice = 0
+            for idx in unit:
+                mask = masks[idx]
+                twice |= once & mask
+                once |= mask
+            if once != full_mask:
+                return False
+            singles = once & ~twice
+            while singles:
+                bit = singles & -singles
+                singles ^= bit
+                for idx in unit:
+                    if masks[idx] & bit:
+                        if masks[idx] != bit:
+                            masks[idx] = bit
+                            queue.append(idx)
+                        break
+        if not queue:
+            return True
+
+
+def _search(masks, queue, tables):
+    """ Yield every solution reachable from masks, once the cells in queue are propagated. """
+    if not _propagate(masks, queue, tables):
+        return
+    # Choose the column with the fewest rows: a cell (its candidates) or a value of a unit (the
+    #   cells of the unit that can take it)
+    best = None
+    best_count = tables.width + 1
+    for (idx, mask) in enumerate(masks):
+        if mask & (mask - 1):
+            count = mask.bit_count()
+            if count < best_count:
+                best = (idx,)
+                best_count = count
+                if count == 2:
+                    break
+    if best is None:
+        yield tuple(masks)
+        return
+    if best_count > 2:
+        for unit in tables.units:
+            for bit in tables.bits:
+                # A value covered in the unit, or with a single cell left, was handled by _propagate
+                cells = tuple(idx for idx in unit if masks[idx] & bit)
+                if 1 < len(cells) < best_count:
+                    best = (bit, cells)
+                    best_count = len(cells)
+                    if best_count == 2:
+                        break
+            if best_count == 2:
+                break
+    if len(best) == 1:
+        idx = best[0]
+        remaining = masks[idx]
+        while remaining:
+            bit = remaining & -remaining
+            remaining ^= bit
+            child = list(masks)
+            child[idx] = bit
+            yield from _search(child, [idx], tables)
+    else:
+        (bit, cells) = best
+        for idx in cells:
+            child = list(masks)
+            child[idx] = bit
+            yield from _search(child, [idx], tables)
+
+
+def iterate_solutions(sboard):
+    """ Yield each solution of the candidate state of sboard, as a tuple of the candidate bitmask
+        (with a single value) of every cell in row-major order, which Board.adoptSnapshot accepts.
+
+    The solutions are generated lazily, so the caller decides how many to search for.
+    """
+    tables = ExactCoverTables.forBoard(sboard)
+    masks = [sboard.getMask(idx) for idx in range(len(tables.peers))]
+    if not all(masks):
+        return
+    queue = [idx for (idx, mask) in enumerate(masks) if not mask & (mask - 1)]
+    yield from _search(masks, queue, tables)
+
+
+def find_solutions(sboard, limit=None):
+    """ Return a list of the first limit solutions of sboard (see iterate_solutions), or of all of them if limit is None. """
+    return list(itertools.islice(iterate_solutions(sboard), limit))
+
+
+def find_first_solution(sboard):
+    """ Return the first solution of sboard (see iterate_solutions), or None if it has none. """
+    return next(iterate_solutions(sboard), None)
+
+
+def count_solutions(sboard, limit=None):
+    """ Return the number of solutions of sboard, counting no further than limit (if given). """
+    count = 0
+    for _ in itertools.islice(iterate_solutions(sboard), limit):
+        count += 1
+    return count
+
+
+def _feasible_values(sboard, idx):
+    """ Return the candidate bitmask of the values cell idx takes in some solution of sboard, searching
+        for a solution with each candidate of the cell in turn.
+    """
+    tables = ExactCoverTables.forBoard(sboard)
+    masks = [sboard.getMask(cell) for cell in range(len(tables.peers))]
+    if not all(masks):
+        return 0
+    queue = [cell for (cell, mask) in enumerate(masks) if not mask & (mask - 1)]
+    if not _propagate(masks, queue, tables):
+        return 0
+    feasible = 0
+    remaining = masks[idx]
+    while remaining:
+        bit = remaining & -remaining
+        remaining ^= bit
+        child = list(masks)
+        child[idx] = bit
+        if next(_search(child, [idx], tables), None) is not None:
+            feasible |= bit
+    return feasible
+
+
+class FeasibilityCache():
+    """
+    A bounded, process-wide map from (board state, cell) to the values the cell takes in some solution,
+    so that boards sent again (e.g., the same tree node to many players) are not searched again.
+    The least recently used entries are evicted beyond max_entries.
+
+    Members:
+        max_entries (int): the most entries to keep
+        _entries (OrderedDict): (state hash, degree, cell index) -> (snapshot, feasible values bitmask),
+            least recently used first
+        lookups, hits, stores, evictions (int): statistics
+    """
+
+    def __init__(self, max_entries=4096):
+        assert max_entries > 0, f'A feasibility cache needs room for at least one entry, not {max_entries}'
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()
+        self.lookups = 0
+        self.hits = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def lookup(self, key, snapshot):
+        """ Return the feasible values bitmask stored for key if it was computed from snapshot, or None. """
+        self.lookups += 1
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != snapshot:
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def store(self, key, snapshot, feasible):
+        """ Remember feasible for key (computed from snapshot), evicting the least recently used entry if we are full. """
+        self.stores += 1
+        self._entries[key] = (snapshot, feasible)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """ Forget every entry (but not the statistics). """
+        self._entries.clear()
+
+    def getStatistics(self):
+        """ Return a dictionary of the cache's size and hit statistics. """
+        return {"entries": len(self._entries),
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions}
+
+
+# The cache shared by every feasible_values in this process
+feasibility_cache = FeasibilityCache()
+
+
+def feasible_values(sboard, idx):
+    """ Return the candidate bitmask of the values cell idx of sboard takes in at least one solution of sboard
+        (0 if it has none), remembered in feasibility_cache by the board's state.
+
+    A candidate outside the mask cannot be the cell's value however the board is completed.
+    """
+    key = (sboard.stateHash(), sboard.getDegree(), idx)
+    snapshot = sboard.getSnapshot()
+    feasible = feasibility_cache.lookup(key, snapshot)
+    if feasible is None:
+        feasible = _feasible_values(sboard, idx)
+        feasibility_cache.store(key, snapshot, feasible)
+    return feasible
@@ -19,6 +19,7 @@ import solvers
 import translate
 
 # Imports from Python standard library
+import collections
 import enum
 import json
 import random
@@ -28,21 +29,102 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+class TranspositionEntry():
+    """
+    What is known about exploring one board state.
+
+    Members:
+        state (array): the candidates of the state (see Board.getSnapshot), to rule out hash collisions
+        best_cost (int): the lowest cost at which the state has been reached
+    """
+
+    __slots__ = ('state', 'best_cost')
+
+    def __init__(self, state, best_cost):
+        self.state = state
+        self.best_cost = best_cost
+
+
+class TranspositionTable():
+    """
+    A bounded map from board state (Board.stateHash) to what is known about exploring it,
+    so that a state reached by different pivot or assign orders is explored only once.
+    The least recently used entries are evicted beyond max_entries.
+
+    Members:
+        max_entries (int): the most entries to keep
+        _entries (OrderedDict): state hash -> TranspositionEntry, least recently used first
+        lookups, hits, stores, evictions, collapsed (int): statistics
+    """
+
+    def __init__(self, max_entries=65536):
+        assert max_entries > 0, f'A transposition table needs room for at least one entry, not {max_entries}'
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()
+        self.lookups = 0
+        self.hits = 0
+        self.stores = 0
+        self.evictions = 0
+        self.collapsed = 0
+
+    def lookup(self, sboard):
+        """ Return the TranspositionEntry for the state of sboard, or None. """
+        self.lookups += 1
+        key = sboard.stateHash()
+        entry = self._entries.get(key)
+        if entry is None or not sboard.hasSnapshot(entry.state):
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def store(self, sboard, cost):
+        """ Record that the state of sboard has been reached at cost, and return its TranspositionEntry. """
+        key = sboard.stateHash()
+        entry = self._entries.get(key)
+        if entry is not None and sboard.hasSnapshot(entry.state):
+            entry.best_cost = min(entry.best_cost, cost)
+            self._entries.move_to_end(key)
+            return entry
+        self.stores += 1
+        entry = TranspositionEntry(sboard.getSnapshot(), cost)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return entry
+
+    def getStatistics(self):
+        """ Return a dictionary of the table's size and hit statistics. """
+        return {"entries": len(self._entries),
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "collapsed": self.collapsed}
+
+
 class ActiveGameTreeState():
     """
     A Sudoku game tree's active state.
     There should only be one instance per game.
 
     Members:
-        _active_nodes (GameTreeNode list): a list of non-final nodes that a user can choose to expand upon
+        _active_nodes (solvers.BoardFrontier): the non-final nodes that a user can choose to expand upon
         _success_nodes (GameTreeNode list): a list of all successful boards
         _failure_nodes (GameTreeNode list): a list of all failed boards
+        transpositions (TranspositionTable): the states explored so far, or None to explore every node
+        nodes_played (int): the number of nodes played
     """
 
-    def __init__(self):
-        self._active_nodes = []
+    def __init__(self, transpositions=None):
+        self._active_nodes = solvers.BoardFrontier()
         self._success_nodes = []
         self._failure_nodes = []
+        self.transpositions = transpositions
+        self.nodes_played = 0
 
     def addActiveNodes(self, nodes_list):
         """
@@ -56,7 +138,7 @@ class ActiveGameTreeState():
 
     def getModifiableActiveNodes(self):
         """
-        Return the modifiable list of active nodes (i.e., removing the node from the returned list is reflected here WARNING).
+        Return the modifiable frontier of active nodes (i.e., removing the node from the returned frontier is reflected here WARNING).
         """
         return self._active_nodes
 
@@ -66,6 +148,12 @@ class ActiveGameTreeState():
         """
         self._success_nodes.append(node)
 
+    def getSuccessNodes(self):
+        """
+        Return the list of success nodes.
+        """
+        return self._success_nodes
+
     def printSuccessNodes(self):
         """
         Print all successful game boards discovered.
@@ -88,6 +176,7 @@ class GameTreeNode():
                         indicates mechanism used for expansion of node / children
 
        game_state: MAL TODO doing this incorrectly: a global game state that keeps the list of incomplete boards to explore from
+                   and the transposition table of explored states
     """
 
     NodeType = enum.Enum("NodeType",
@@ -101,7 +190,7 @@ class GameTreeNode():
                                 qualname="GameTreeNode.SelectFrequency")
 
     def __init__(self, board, logical_ops=None, cell_selector=None,
-                 board_selector=None,
+                 board_selector=None, action_selector=None,
                  parent=None, moves=None, success=False,
                  node_type=None, game_state=None):
         self.board = board
@@ -114,21 +203,59 @@ class GameTreeNode():
         self._my_ops = logical_ops if logical_ops else parent._my_ops if parent else solvers.select_all_logical_operators_ordered()
         self._cellselector = cell_selector if cell_selector else parent._cellselector if parent else solvers.select_cell_by_user
         self._boardselector = board_selector if board_selector else parent._boardselector if parent else solvers.select_board_by_user
+        self._actionselector = action_selector if action_selector else parent._actionselector if parent else None
 
-        self.game_state = ActiveGameTreeState() if game_state is None else game_state
+        self.game_state = ActiveGameTreeState(TranspositionTable()) if game_state is None else game_state
         # TODO MAL: add a self.explanation to keep track of what each node was doing (e.g., pivot cell?)
 
         if parent is not None:
             self._depth = parent._depth + 1
 
     def play(self):
+        """
+        Plays this game board, then keeps selecting active nodes (with the board selector) and
+        playing them until none remain.
+
+        Returns a solved board if one was found, otherwise None.
+        """
+        self.step()
+        while (self.game_state.hasActiveNode()):
+            explore = self._boardselector(self.game_state.getModifiableActiveNodes())
+            explore.step()
+
+        self.game_state.printSuccessNodes()
+        successes = self.game_state.getSuccessNodes()
+        return successes[0].board if successes else None
+
+    def step(self):
         """
         Steps this game board, setting up children GameTreeNodes as appropriate.
 
+        Collapses onto an earlier exploration of the same board state if that was reached at no greater cost.
         Checks for a satisfied or unsatisifiable board assignment, terminating if found.
         Attempts to apply rules specified, recursing if progress is made.
-        If no progress is made, selects a new approach, potentially splitting into several children.
+        If no progress is made, selects a new approach, splitting into children that become active nodes.
+        Returns the board if it is solved, otherwise None.
         """
+        self.game_state.nodes_played += 1
+
+        # If this board state has already been reached at no greater cost, don't explore it again
+        transpositions = self.game_state.transpositions
+        if transpositions is not None:
+            # Boards without a puzzle name have accrued no cost
+            cost = self.board.config.parameters.get("cost", 0)
+            entry = transpositions.lookup(self.board)
+            if entry is not None and entry.best_cost <= cost:
+                logger.info("Board state already reached at cost %s (now %s); collapsing onto it.",
+                            str(entry.best_cost), str(cost))
+                transpositions.collapsed += 1
+                condensed_node = GameTreeNode(self.board,
+                                              parent=self,
+                                              node_type=GameTreeNode.NodeType.CONDENSED,
+                                              game_state=self.game_state)
+                self.children.append(condensed_node)
+                return None
+            transpositions.store(self.board, cost)
 
         # If the board is fully constrained and a valid solution
         if self.board.isSolved():
@@ -171,54 +298,49 @@ class GameTreeNode():
                                       node_type=GameTreeNode.NodeType.AUTO_MOVES,
                                       game_state=self.game_state)
             self.children.append(child_node)
-            return child_node.play()
+            return child_node.step()
 
-        # This board needs a decision made to progress it, so it's an active node.
-        self.game_state.addActiveNodes([self])
-
-        # Select an active state and keep exploring.
-        while (self.game_state.hasActiveNode()):
-            # MAL TODO bug in here trying to get back to an older state.
-            explore = self._boardselector(self.game_state.getModifiableActiveNodes())
-            explore = self.selectNextApproach()
-            explore.play()
-
-        self.game_state.printSuccessNodes()
-        return
+        # This board needs a decision made to progress it; its children become active nodes.
+        self.selectNextApproach()
+        return None
 
     def selectNextApproach(self):
         """
         Generator of new GameTreeNodes.
         This is the policy location for how to handle an "unable to progress".
 
-        For now, we manually select a pivot cell and then generate all the children, registering them with the game state.
-        We then have the user select an active state to explore and return that state.
+        For now, we select an action (with the action selector, or else by asking the user) and its cell,
+        and then generate all the children, registering them with the game state as active nodes to select among,
+        and return them.
         In the future, we could select new rules, new solvers, backtrack, etc.
         """
-        print("Your goal is to answer the following question:")
-        print(self.board.getQuestion())
-        print("  HINT: you may not need to solve the whole board to answer this question.")
-        print("The Goal cell, {}, will be *marked* on the board with asterisks '*'.".format(self.board.getGoalCell()))
-        print("\n")
-
-        # MAL TODO Allow for asking questions
-        # print("\nWould you like to answer the question? y/n (", self.board.getQuestion() ,")")
-        # ans = input()
-        # if ans == 'y'or ans == 'yes':
-        #     print(question, "Please answer yes or no")
-        #     inp = input()
-        #     if inp == 'y': #self.board._answer:
-        #         print("Congratulations! You got the question correct")
-        #     else:
-        #         print("I'm sorry. That answer is incorrect")
-
-        while True:
-            # TODO MAL this should use the board's idea of what cell actions it likes
-            print("What action do you want to perform? {}".format(
-                [self.board.config.actions]))
-            action = input()
-            if action in self.board.config.actions:
-                break
+        if self._actionselector:
+            action = self._actionselector(self.board)
+        else:
+            print("Your goal is to answer the following question:")
+            print(self.board.getQuestion())
+            print("  HINT: you may not need to solve the whole board to answer this question.")
+            print("The Goal cell, {}, will be *marked* on the board with asterisks '*'.".format(self.board.getGoalCell()))
+            print("\n")
+
+            # MAL TODO Allow for asking questions
+            # print("\nWould you like to answer the question? y/n (", self.board.getQuestion() ,")")
+            # ans = input()
+            # if ans == 'y'or ans == 'yes':
+            #     print(question, "Please answer yes or no")
+            #     inp = input()
+            #     if inp == 'y': #self.board._answer:
+            #         print("Congratulations! You got the question correct")
+            #     else:
+            #         print("I'm sorry. That answer is incorrect")
+
+            while True:
+                # TODO MAL this should use the board's idea of what cell actions it likes
+                print("What action do you want to perform? {}".format(
+                    [self.board.config.actions]))
+                action = input()
+                if action in self.board.config.actions:
+                    break
 
         while True:
             # Select the arguments for the action somehow
@@ -261,7 +383,7 @@ class GameTreeNode():
             child_nodes.append(child_node)
         self.children.extend(child_nodes)
         self.game_state.addActiveNodes(child_nodes)
-        return child_nodes[0]
+        return child_nodes
 
 # -----------------------------------------------------
 
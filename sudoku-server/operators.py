@@ -12,6 +12,13 @@ import board
 # from board import Cell
 import copy
 
+# The operators whose search starts from the cells changed since the board was last
+#   at their fixed point (see Board.getOperatorFixedPoint) rather than from every cell
+resumable_operators = ('inclusion',
+                       'nakedpairs', 'nakedtriples', 'nakedquads',
+                       'hiddenpairs', 'hiddentriples', 'hiddenquads',
+                       'pointingpairs', 'pointingtriples')
+
 # -----------------------------------------------------------------------------
 # LOGICAL METHODS
 # -----------------------------------------------------------------------------
@@ -26,65 +33,63 @@ def logical_exclusion(sboard):
     Returns:
         board   : sboard, updated to remove values assigned elsewhere in a unit
 
-    Propagates the exclusion constraints from the constraint list.
+    Propagates the exclusion constraints from a worklist of certain cells.
     For each cell whose value set has been reduced to one value v
-        remove v from the value set of all other cells in the same unit.
-    Iterate until there are no new single-value cells.
+        remove v from the value set of all of its peers (the other cells in its units),
+        pushing each peer that becomes certain onto the worklist.
+    Each certain cell is propagated once, so one pass reaches the fixed point.
     See comments below for additional algorithmic details.
     """
     sboard.config.start_operation('exclusion', sboard)
 
-    # get the list of cells with singleton value set
     num_exclusions = 0
     num_exclusion_assignments = 0
-    plist = sboard.getCertainCells()
-    for cell in plist:
-
+    topology = sboard.getTopology(sboard.getDegree())
+    explore_to_fixed_point = sboard.config.explore_to_fixed_point
+    # the certain cells not yet propagated, in row-major order,
+    #   followed by the cells that become certain on the way, in the order they do
+    worklist = sboard.getUnpropagatedCertainIndices()
+    for idx in worklist:
+        cell = sboard.getCellAt(idx)
         # if this cell value has already been propagated, skip it
-        if(cell.isPropagated()):
+        if cell.isPropagated():
             continue
 
-        cell_id = cell.getIdentifier()
-        cell_value = cell.getCertainValue()
-        unit_name_list = sboard.getCellUnits(cell_id)
-
-        # for each of the units associated with cell
-        for unit_name in unit_name_list:
-            cell_name_list = sboard.getUnitCells(unit_name)
-
-            # for each cell in the current unit
-            for c_name in cell_name_list:
-                c = sboard.getCell(c_name)
+        value_mask = sboard.getMask(idx)
+        if not value_mask:
+            # The cell was over-constrained after being collected; nothing to propagate
+            cell.setPropagated()
+            continue
 
-                if(c is cell):
-                    continue
-                # if c is not the cell we are currently propagating
-                # then remove cell_value from c's candidate set
-
-                excluded = c.exclude(cell_value)
-
-                # if c is now certain,
-                # then add it to list of of constraints to propagate
-                # so we can run to a fixed point (no more information)
-                if(excluded):
-                    num_exclusions += 1
-                    if c.isCertain():
-                        # TODO MAL Does exclusion trigger when values are removed as possibilities,
-                        # or only when an assignment is made?
-                        # Here, we assume the latter.
-                        num_exclusion_assignments += 1
-                        terminate = sboard.config.match_set_operation(
-                            'exclusion',
-                            f'Assigned {c_name} = {board.Cell.displayValue(c.getCertainValue())}',
-                            sboard)
-                        if terminate:
-                            # Don't update metadata like cell.setPropagated since the operation
-                            # may not have been completely executed
-                            # Don't need to complete the operation since it's assumed that
-                            # we're counting every matched set
-                            return sboard
-                        if sboard.config.explore_to_fixed_point:
-                            plist.append(c)
+        # for each peer of the cell (in the order of the cell's units, then of the cells in each unit)
+        #   that still has the cell's value
+        for peer in topology.peer_indices[idx]:
+            if not sboard.getMask(peer) & value_mask:
+                continue
+            c = sboard.getCellAt(peer)
+            c.excludeMask(value_mask)
+            num_exclusions += 1
+
+            # if c is now certain,
+            # then add it to the worklist of constraints to propagate
+            # so we can run to a fixed point (no more information)
+            if c.isCertain():
+                # TODO MAL Does exclusion trigger when values are removed as possibilities,
+                # or only when an assignment is made?
+                # Here, we assume the latter.
+                num_exclusion_assignments += 1
+                terminate = sboard.config.match_set_operation(
+                    'exclusion',
+                    f'Assigned {topology.cell_names[peer]} = {board.Cell.displayValue(c.getCertainValue())}',
+                    sboard)
+                if terminate:
+                    # Don't update metadata like cell.setPropagated since the operation
+                    # may not have been completely executed
+                    # Don't need to complete the operation since it's assumed that
+                    # we're counting every matched set
+                    return sboard
+                if explore_to_fixed_point:
+                    worklist.append(peer)
 
         cell.setPropagated()
 
@@ -119,38 +124,44 @@ def logical_inclusion(sboard):
     sboard.config.start_operation('inclusion', sboard)
 
     num_inclusions = 0
-    # for each unit of the board
-    units_to_check = board.Board.getAllUnits(sboard.getDegree())
+    topology = sboard.getTopology(sboard.getDegree())
+    # for each unit of the board changed since the board was last at the inclusion
+    #   fixed point (every unit if it never was)
+    units_to_check = sboard.getDirtyUnits(sboard.getOperatorFixedPoint('inclusion'))
     while units_to_check:
         # Keep track of any units that change as we go through this
         #   to allow for iteration to a fixed point
         units_being_checked = units_to_check
         units_to_check = []
         for unit in units_being_checked:
-            cell_name_list = board.Board.getUnitCells(unit, sboard.getDegree())
-
-            # init dict to track cells for which each value is a candidate
-            value_dict = {}
-            for value in board.Cell.getPossibleValuesByDegree(sboard.getDegree()):
-                value_dict[value] = []
-
-            # for each cell in the unit
-            for cell_name in cell_name_list:
-                cell = sboard.getCell(cell_name)
-                cell_values = cell.getValueSet()
-
-                # fill out the value dict
-                for value in cell_values:
-                    value_dict[value].append(cell)
-
-            # search the value dict for values that have only one cell
-            for value, cell_list in value_dict.items():
+            unit_indices = topology.unit_indices[unit]
+
+            # the values that are candidates of exactly one cell of the unit, and that cell is
+            # uncertain, as they stand before any assignment in this unit
+            masks = [sboard.getMask(idx) for idx in unit_indices]
+            seen_once = 0
+            seen_twice = 0
+            certain = 0
+            for mask in masks:
+                seen_twice |= seen_once & mask
+                seen_once |= mask
+                if not mask & (mask - 1):
+                    certain |= mask
+            singles = seen_once & ~seen_twice & ~certain
+
+            # assign each of those values (lowest first) to its cell
+            while singles:
+                value_mask = singles & -singles
+                singles ^= value_mask
+                position = 0
+                while not masks[position] & value_mask:
+                    position += 1
+                assign_cell = sboard.getCellAt(unit_indices[position])
                 # if only one cell can take value and that cell is uncertain
                 # then assign value to the cell and append to constraint list
-                if(len(cell_list) == 1 and not cell_list[0].isCertain()):
+                if not assign_cell.isCertain():
                     num_inclusions += 1
-                    assign_cell = cell_list[0]
-                    assign_cell.assign(value)
+                    assign_cell.assign(value_mask.bit_length() - 1)
                     terminate = sboard.config.match_set_operation(
                         'inclusion',
                         f'Assigned {assign_cell.getIdentifier()} = {board.Cell.displayValue(assign_cell.getCertainValue())}',
@@ -168,119 +179,145 @@ def logical_inclusion(sboard):
     return sboard
 
 
-def __hidden_set_exclusion(sboard, hidden_set, intersection_unit_list):
+def __hidden_set_exclusion(sboard, hidden_set, hidden_value_mask):
     """
-    After a possible hidden set has been identified, this method
-    verifies whether the candidates are indeed a hidden set and
-    excludes the appropriate values.
+    After a hidden set is identified, this method excludes every value
+    but the set's values (given as a bitmask) from the cells in the set.
     Returns the number of cells that were affected by the hidden set.
     """
-    len_hidden_set = len(hidden_set)
-
     num_operated_cells = 0
-    for unit in intersection_unit_list:
-        unit_cells = sboard.getUnitCells(unit)
+    for cell in hidden_set:
+        cell_name = cell.getIdentifier()
+        value_mask_before_exclusion = cell.getValueMask()
+        excluded = cell.excludeMask(~hidden_value_mask)
 
-        # we search through cells associated to
-        # see if some values are only present in the potential hidden cells
-        remaining_value_set = set({})
+        if excluded:
+            num_operated_cells += 1
+            progress = f'HIDDEN SET {cell_name}: {board.Cell.displayMask(value_mask_before_exclusion)} -> {board.Cell.displayMask(cell.getValueMask())}'
+            sboard.config.debug_operation(
+                f'hiddenset', progress, sboard)
 
-        for cell in hidden_set:
-            remaining_value_set = remaining_value_set | cell.getValueSet()
-        for cell in unit_cells:
-            # print (remaining_value_set)
-            associated_cell = sboard.getCell(cell)
+    return num_operated_cells
 
-            if associated_cell not in hidden_set:
-                associated_value_set = associated_cell.getValueSet()
-                remaining_value_set = remaining_value_set - associated_value_set
 
-        if len(remaining_value_set) != len_hidden_set:
+def __extend_hidden_subset(sboard, unit, candidates, start, set_size, subset, union_positions):
+    """
+    Generates the sets of set_size values that extend subset (whose values are candidates of
+    the cells at the positions in the bitmask union_positions within unit) with the values
+    in candidates[start:], and whose values are candidates of set_size cells in all.
+    Yields (the set's values; the bitmask of the positions of its cells within unit).
+    """
+    # stop where too few candidates are left to complete the set
+    for position in range(start, len(candidates) - (set_size - len(subset)) + 1):
+        value = candidates[position]
+        positions = sboard.getValuePositions(unit, value)
+        extended_positions = union_positions | positions
+        # skip values left with fewer than two cells by an earlier exclusion, and prune as soon as
+        #   the values are candidates of more than set_size cells
+        if positions.bit_count() < 2 or extended_positions.bit_count() > set_size:
             continue
-        # if the the number of remaining values is equal to the number of
-        # cells in the set, then we've found a hidden set!
-
-        for cell in unit_cells:
-            associated_cell = sboard.getCell(cell)
-            associated_value_set = associated_cell.getValueSet()
-
-            if associated_cell in hidden_set:
-                continue
-
-            remaining_value_set -= associated_value_set
-
-            if len(remaining_value_set) != len_hidden_set:
-                continue
-            # we've found a hidden set!
+        if len(subset) + 1 < set_size:
+            yield from __extend_hidden_subset(
+                sboard, unit, candidates, position + 1, set_size, subset + [value], extended_positions)
+        elif extended_positions.bit_count() == set_size:
+            yield (subset + [value], extended_positions)
 
-            for cell in hidden_set:
-                cell_name = cell.getIdentifier()
-                value_set = cell.getValueSet()
-                value_set_before_exclusion = value_set.copy()
-                exclusion_list = list(value_set - remaining_value_set)
 
-                for value in exclusion_list:
-                    cell.exclude(value)
-
-                if len(exclusion_list) > 0:
-                    num_operated_cells += 1
-                    progress = f'HIDDEN SET {cell_name}: {board.Cell.displayValues(value_set_before_exclusion)} -> {board.Cell.displayValues(value_set)}'
-                    sboard.config.debug_operation(
-                        f'hiddenset', progress, sboard)
-
-    return num_operated_cells
+def __hidden_subsets(sboard, unit, set_size):
+    """
+    Generates each possible hidden set of set_size cells of unit: set_size values
+    that are candidates of only set_size uncertain cells of the unit.
+    Yields (the set's values; the bitmask of the positions of the set's cells within unit).
+    Each set is generated once; the values' positions are read as the set is extended,
+    so sets generated after an exclusion reflect it.
+    """
+    unit_indices = sboard.getTopology(sboard.getDegree()).unit_indices[unit]
+    certain_positions = 0
+    for (position, idx) in enumerate(unit_indices):
+        mask = sboard.getMask(idx)
+        if not mask & (mask - 1):
+            certain_positions |= 1 << position
+
+    # the values that can be in a set: those that are candidates of 2 to set_size cells,
+    #   none of them certain (a value with a single cell is a hidden single, left to inclusion)
+    candidates = []
+    for value in board.Cell.getPossibleValuesByDegree(sboard.getDegree()):
+        positions = sboard.getValuePositions(unit, value)
+        if 1 < positions.bit_count() <= set_size and not positions & certain_positions:
+            candidates.append(value)
+    return __extend_hidden_subset(sboard, unit, candidates, 0, set_size, [], 0)
 
 
-def find_hidden_pairs(sboard):
+def __find_hidden_sets(sboard, operator, set_size, set_name):
     """
-    A hidden pair is any group of two cells in the same unit
-    that have 2 values between them that are not found in the
-    rest of the cells in the unit.  Therefore we exclude all
-    other values from the cells in the pair.
+    Search each unit of the board for hidden sets of set_size cells and exclude
+    all other values from the cells of each set.
+    Applies the hidden set operator named operator, whose matched sets are called set_name
+    in the log.
     """
-    sboard.config.start_operation('hiddenpairs', sboard)
+    sboard.config.start_operation(operator, sboard)
+    topology = sboard.getTopology(sboard.getDegree())
+    values = board.Cell.getPossibleValuesByDegree(sboard.getDegree())
 
-    num_hidden_pairs = 0
+    num_hidden_sets = 0
     # repeat until we don't get any new information
     #   (apply the operator as much as possible)
-    num_new_hidden_pairs = 1
-    while num_new_hidden_pairs:
-        num_new_hidden_pairs = 0
-        # iterate through every cell in the board
-        for current_cell_name in sboard.getAllCells():
-            current_cell = sboard.getCell(current_cell_name)
-            # these operators are useful only for cells with more than two values
-            if len(current_cell.getValueSet()) <= 2:
-                continue
-
-            candidate_cells = __find_hidden_candidate_cells(
-                sboard, current_cell)
-            for candidate_cell in candidate_cells:
-                candidate_cell_name = candidate_cell.getIdentifier()
+    num_new_hidden_sets = 1
+    pass_checkpoint = sboard.getOperatorFixedPoint(operator)
+    while num_new_hidden_sets:
+        num_new_hidden_sets = 0
+        # iterate on the first pass through the units changed since the board was
+        #   last at this operator's fixed point (every unit if it never was), and afterwards
+        #   only through the units changed since the previous pass began
+        units_to_check = sboard.getDirtyUnits(pass_checkpoint)
+        pass_checkpoint = sboard.checkpoint()
+        for unit in units_to_check:
+            unit_indices = topology.unit_indices[unit]
+            for (_, set_positions) in __hidden_subsets(sboard, unit, set_size):
+                hidden_set = [sboard.getCellAt(unit_indices[position])
+                              for position in range(len(unit_indices)) if set_positions >> position & 1]
+                # the set must leave other cells in the unit, and its cells must still be uncertain
+                if len(hidden_set) == len(unit_indices) or any(cell.isCertain() for cell in hidden_set):
+                    continue
 
-                # get units that the pair have in common
-                intersection_unit_list = sboard.getCommonUnits([current_cell_name,
-                                                                candidate_cell_name])
+                # the values that are only present in the set's cells; if the number of these values
+                # is equal to the number of cells in the set, then we've found a hidden set!
+                hidden_value_mask = 0
+                for value in values:
+                    positions = sboard.getValuePositions(unit, value)
+                    if positions and not positions & ~set_positions:
+                        hidden_value_mask |= 1 << value
+                if hidden_value_mask.bit_count() != set_size:
+                    continue
 
-                hidden_set = [current_cell, candidate_cell]
                 num_cells_affected = __hidden_set_exclusion(
-                    sboard, hidden_set, intersection_unit_list)
+                    sboard, hidden_set, hidden_value_mask)
                 if num_cells_affected:
-                    num_hidden_pairs += 1
-                    progress = f'HIDDEN PAIR of {sorted([cell.getIdentifier() for cell in hidden_set])} excluded values from {num_cells_affected} cells'
+                    num_hidden_sets += 1
+                    progress = f'HIDDEN {set_name.upper()} of {sorted([cell.getIdentifier() for cell in hidden_set])} excluded values from {num_cells_affected} cells'
                     terminate = sboard.config.match_set_operation(
-                        f'hiddenpairs', progress, sboard)
+                        operator, progress, sboard)
                     if terminate:
                         return sboard
                     if sboard.config.explore_to_fixed_point:
-                        num_new_hidden_pairs += 1
+                        num_new_hidden_sets += 1
 
     sboard.config.complete_operation(
-        'hiddenpairs', f'Found {num_hidden_pairs} hidden pairs that affected board.', sboard,
-        num_hidden_pairs > 0)
+        operator, f'Found {num_hidden_sets} hidden {set_name}s that affected board.', sboard,
+        num_hidden_sets > 0)
     return sboard
 
 
+def find_hidden_pairs(sboard):
+    """
+    A hidden pair is any group of two cells in the same unit
+    that have 2 values between them that are not found in the
+    rest of the cells in the unit.  Therefore we exclude all
+    other values from the cells in the pair.
+    """
+    return __find_hidden_sets(sboard, 'hiddenpairs', 2, 'pair')
+
+
 def find_hidden_triples(sboard):
     """
     A hidden triple is any group of three cells in the same unit
@@ -288,84 +325,7 @@ def find_hidden_triples(sboard):
     rest of the cells in the unit.  Therefore we exclude all
     other values from the cells in the triple.
     """
-    sboard.config.start_operation('hiddentriples', sboard)
-
-    num_hidden_triples = 0
-    # repeat until we don't get any new information
-    #   (apply the operator as much as possible)
-    num_new_hidden_triples = 1
-    while num_new_hidden_triples:
-        num_new_hidden_triples = 0
-        # iterate through every cell in the board
-        for current_cell_name in sboard.getAllCells():
-            current_cell = sboard.getCell(current_cell_name)
-            current_value_set = current_cell.getValueSet()
-
-            # these operators are useful only for cells with more than two values
-            if len(current_value_set) <= 2:
-                continue
-
-            # the list of cells associated with the current cell
-            current_units = sboard.getCellUnits(current_cell_name)
-
-            candidate_cells = __find_hidden_candidate_cells(
-                sboard, current_cell)
-            for first_candidate_cell in candidate_cells:
-                first_candidate_value_set = first_candidate_cell.getValueSet()
-
-                if len(current_value_set & first_candidate_value_set) < 2:
-                    continue
-                # cells have to have at least 2 values in common
-
-                for second_candidate_cell in candidate_cells:
-                    if second_candidate_cell == first_candidate_cell:
-                        continue
-
-                    first_candidate_name = first_candidate_cell.getIdentifier()
-                    first_candidate_units = sboard.getCellUnits(
-                        first_candidate_name)
-
-                    second_candidate_name = second_candidate_cell.getIdentifier()
-                    second_candidate_value_set = second_candidate_cell.getValueSet()
-
-                    candidates_intersection_value_set = (second_candidate_value_set &
-                                                         first_candidate_value_set)
-                    # if the first and second candidates are a pair, also,
-                    # we check if the value set across the three cells is greater than 4, # MAL TODO Why 4 vs 3?
-                    # otherwise we probably have a naked triple
-                    if (len(candidates_intersection_value_set) == 0
-                        or len(current_value_set
-                               | first_candidate_value_set
-                               | second_candidate_value_set) <= 4):
-                        continue
-
-                    second_candidate_units = sboard.getCellUnits(
-                        second_candidate_name)
-
-                    # check to see if all three candidates have at least one common unit
-                    intersection_unit_list = list(set(current_units) &
-                                                  set(first_candidate_units) &
-                                                  set(second_candidate_units))
-
-                    if len(intersection_unit_list) > 0:
-                        hidden_set = [
-                            current_cell, first_candidate_cell, second_candidate_cell]
-                        num_cells_affected = __hidden_set_exclusion(
-                            sboard, hidden_set, intersection_unit_list)
-                        if num_cells_affected:
-                            num_hidden_triples += 1
-                            progress = f'HIDDEN TRIPLE of {sorted([cell.getIdentifier() for cell in hidden_set])} excluded values from {num_cells_affected} cells'
-                            terminate = sboard.config.match_set_operation(
-                                f'hiddentriples', progress, sboard)
-                            if terminate:
-                                return sboard
-                            if sboard.config.explore_to_fixed_point:
-                                num_new_hidden_triples += 1
-
-    sboard.config.complete_operation(
-        'hiddentriples', f'Found {num_hidden_triples} hidden triples that affected board.', sboard,
-        num_hidden_triples > 0)
-    return sboard
+    return __find_hidden_sets(sboard, 'hiddentriples', 3, 'triple')
 
 
 def find_hidden_quads(sboard):
@@ -375,221 +335,165 @@ def find_hidden_quads(sboard):
     rest of the cells in the unit.  Therefore we exclude all
     other values from the cells in the quad.
     """
-    sboard.config.start_operation('hiddenquads', sboard)
-
-    num_hidden_quads = 0
-    # repeat until we don't get any new information
-    #   (apply the operator as much as possible)
-    num_new_hidden_quads = 1
-    while num_new_hidden_quads:
-        num_new_hidden_quads = 0
-        # iterate through every cell in the board
-        for current_cell_name in sboard.getAllCells():
-            current_cell = sboard.getCell(current_cell_name)
-            current_value_set = current_cell.getValueSet()
-
-            # these operators are useful only for cells with more than two values
-            if len(current_value_set) <= 2:
-                continue
-
-            # the list of cells associated with the current cell
-            current_units = sboard.getCellUnits(current_cell_name)
-
-            candidate_cells = __find_hidden_candidate_cells(
-                sboard, current_cell)
-            for first_candidate_cell in candidate_cells:
-                first_candidate_value_set = first_candidate_cell.getValueSet()
-                intersection_value_set = current_value_set & first_candidate_value_set
-
-                # cells have to have at least 2 values in common
-                if len(intersection_value_set) < 2:
-                    continue
-
-                for second_candidate_cell in candidate_cells:
-                    if second_candidate_cell == first_candidate_cell:
-                        continue
-
-                    first_candidate_name = first_candidate_cell.getIdentifier()
-                    first_candidate_units = sboard.getCellUnits(
-                        first_candidate_name)
-
-                    second_candidate_name = second_candidate_cell.getIdentifier()
-                    second_candidate_value_set = second_candidate_cell.getValueSet()
-
-                    intersection_value_set = (first_candidate_value_set &
-                                              second_candidate_value_set)
-                    # if the first and second candidates are a pair, also,
-                    # we check if the value set across the three cells is greater than 4,
-                    # otherwise we probably have a naked quad
-                    # print(intersection_value_set)
-                    if (len(intersection_value_set) == 0
-                        or len(current_value_set
-                               | first_candidate_value_set
-                               | second_candidate_value_set) <= 4):
-                        continue
-
-                    second_candidate_units = sboard.getCellUnits(
-                        second_candidate_name)
-
-                    # check to see if all three candidates have at least one common unit
-                    intersection_unit_set = (set(current_units) &
-                                             set(first_candidate_units) &
-                                             set(second_candidate_units))
-
-                    if len(intersection_unit_set) == 0:
-                        continue
-
-                    candidates = [current_cell, first_candidate_cell,
-                                  second_candidate_cell]
-
-                    for third_candidate_cell in candidate_cells:
-                        if third_candidate_cell in candidates:
-                            continue
-
-                        candidates.append(third_candidate_cell)
-                        third_candidate_value_set = third_candidate_cell.getValueSet()
-                        third_candidate_name = third_candidate_cell.getIdentifier()
-                        third_candidate_units = sboard.getCellUnits(
-                            third_candidate_name)
-                        intersection_unit_set = (intersection_unit_set &
-                                                 set(third_candidate_units))
-
-                        intersection_value_set = (second_candidate_value_set &
-                                                  third_candidate_value_set)
-
-                        if (len(intersection_value_set) > 1 and
-                                len(intersection_unit_set) > 0):
-                            num_cells_affected = __hidden_set_exclusion(
-                                sboard, candidates, list(intersection_unit_set))
-                            if num_cells_affected:
-                                num_hidden_quads += 1
-                                progress = f'HIDDEN QUAD of {sorted([cell.getIdentifier() for cell in candidates])} excluded values from {num_cells_affected} cells'
-                                terminate = sboard.config.match_set_operation(
-                                    f'hiddenquads', progress, sboard)
-                                if terminate:
-                                    return sboard
-                                if sboard.config.explore_to_fixed_point:
-                                    num_new_hidden_quads += 1
-
-    sboard.config.complete_operation(
-        'hiddenquads', f'Found {num_hidden_quads} hidden quads that affected board.', sboard,
-        num_hidden_quads > 0)
-    return sboard
-
-
-def __find_hidden_candidate_cells(sboard, current_cell):
-    """
-    Compares all cells to the current one and makes a list of
-    cells that meet the criterion for hidden candidacy.
-    The criterion is that the length of the union of the candidate's
-    and current cell's value sets must be at least 2.
-    """
-
-    current_cell_name = current_cell.getIdentifier()
-    current_value_set = current_cell.getValueSet()
-    current_associated_cells = sboard.getAssociatedCellIds(current_cell_name)
-    candidate_cells = []
-    # iterate through list of current cells too find possible hidden candidates
-    for candidate_cell_name in current_associated_cells:
-
-        candidate_cell = sboard.getCell(candidate_cell_name)
-        candidate_value_set = candidate_cell.getValueSet()
-        intersection_value_set = current_value_set & candidate_value_set
-        if len(intersection_value_set) >= 2:
-            candidate_cells.append(candidate_cell)
+    return __find_hidden_sets(sboard, 'hiddenquads', 4, 'quad')
 
-    return candidate_cells
 
-
-def __naked_set_exclusion(sboard, naked_set, exclusion_values):
+def __naked_set_exclusion(sboard, naked_set, exclusion_mask):
     """
     After naked set is identified, this function elminates
-    the set's values from all other cells in the set's
+    the set's values (given as a bitmask) from all other cells in the set's
     common units.
     """
     num_operated_cells = 0
 
     # get cells the pair have in common
-    intersection_cell_list = sboard.getCommonCells(naked_set)
+    intersection_cell_list = sboard.getCommonCells(naked_set, sboard.getDegree())
 
     # remove set's values from assciated cells
     for non_pair_cell_name in intersection_cell_list:
         non_pair_cell = sboard.getCell(non_pair_cell_name)
 
-        exclusion_list = []
-        for value in exclusion_values:
-            if non_pair_cell.hasValue(value):
-                non_pair_cell.exclude(value)
-                exclusion_list.append(value)
-                num_operated_cells += 1
+        excluded = non_pair_cell.excludeMask(exclusion_mask)
 
-        if len(exclusion_list) > 0:
-            num_operated_cells += 1
-            progress = f'NAKED SET removes {board.Cell.displayValues(exclusion_list)} from {non_pair_cell_name}'
+        if excluded:
+            num_operated_cells += excluded.bit_count() + 1
+            progress = f'NAKED SET removes {board.Cell.displayMask(excluded)} from {non_pair_cell_name}'
             sboard.config.debug_operation(f'nakedset', progress, sboard)
 
     return num_operated_cells
 
 
-def find_naked_pairs(sboard):
+def __find_naked_candidate_cells(sboard, current_index):
     """
-    A Naked Pair is two cells in the same unit with the same two values remaining.
-
-    Search board for a pair of two cells situated in the
-    same unit with the same value set with only two
-    values remaining. Remove these two values from all
-    cells associated with the pair.
+    Compares all cells to the current one and makes a list of the positions of
+    cells that meet the criteria for naked candidacy.
+    The criteria are that the candidate needs to have between 2 and 4
+    remaining values and the union of the candidate's and current cell's
+    value set must be less than or equal to 4.
     """
-    sboard.config.start_operation('nakedpairs', sboard)
+    current_value_mask = sboard.getMask(current_index)
+    # the positions of the cells associated with the current cell
+    current_associated_indices = sboard.getTopology(
+        sboard.getDegree()).peer_indices[current_index]
 
-    num_naked_pairs = 0
-    # repeat until we don't get any new information
-    #   (apply the operator as much as possible)
-    num_new_naked_pairs = 1
-    while num_new_naked_pairs:
-        num_new_naked_pairs = 0
-        # iterate through every cell in the board
-        for current_cell_name in sboard.getAllCells():
-            current_cell = sboard.getCell(current_cell_name)
-            current_value_set = current_cell.getValueSet()
+    # iterate through list of current's associated cells
+    candidate_indices = []
+    for candidate_index in current_associated_indices:
+        candidate_value_mask = sboard.getMask(candidate_index)
 
-            # looking only for cells with two remaining values
-            if len(current_value_set) != 2:
-                continue
+        # Candidate cell can only have 2 to 4 remaining values
+        if 1 < candidate_value_mask.bit_count() < 5:
+            # The candidate and current cell have to have a total of 4 values or less
+            if (candidate_value_mask | current_value_mask).bit_count() <= 4:
+                candidate_indices.append(candidate_index)
 
-            candidate_cells = __find_naked_candidate_cells(
-                sboard, current_cell)
+    return candidate_indices
 
-            # Now we iterate through the candidates
-            for first_candidate_cell in candidate_cells:
-                first_candidate_value_set = first_candidate_cell.getValueSet()
 
-                # Look for naked pair
-                if current_value_set != first_candidate_value_set:
-                    continue
+def __extend_naked_subset(sboard, candidates, set_size, naked_set, union_values, common_unit_bits):
+    """
+    Generates the naked sets of set_size cells that extend naked_set (the positions of cells
+    with the values in the bitmask union_values) with cells at the positions in candidates.
+    Each cell added after the first must share a unit with all the cells added before it
+    (common_unit_bits are the units those cells share).
+    Yields (the positions of the set's cells, in the order added; the bitmask of the set's values).
+    The cells' candidates are read as the set is extended, so sets generated after an
+    exclusion reflect it.
+    """
+    cell_unit_bits = sboard.getTopology(sboard.getDegree()).cell_unit_bits
+    for idx in candidates:
+        if idx in naked_set or not common_unit_bits & cell_unit_bits[idx]:
+            continue
+        extended_values = union_values | sboard.getMask(idx)
+        # prune as soon as the cells have more than set_size values among them
+        if extended_values.bit_count() > set_size:
+            continue
+        if len(naked_set) + 1 < set_size:
+            yield from __extend_naked_subset(
+                sboard, candidates, set_size, naked_set + [idx], extended_values,
+                common_unit_bits & cell_unit_bits[idx])
+        elif extended_values.bit_count() == set_size:
+            yield (naked_set + [idx], extended_values)
 
-                # We found a naked pair!
-                # print(current_cell, first_candidate_cell)
-                naked_set = [current_cell_name,
-                             first_candidate_cell.getIdentifier()]
+
+def __naked_subsets(sboard, current_index, set_size):
+    """
+    Generates each naked set of set_size cells that starts with the cell at current_index:
+    set_size cells with set_size values remaining among them.
+    The other cells are taken from the current cell's naked candidates
+    (see __find_naked_candidate_cells), listed once as the search starts, in every order;
+    a naked pair's cells have the same two values.
+    Yields (the positions of the set's cells, the current cell first; the bitmask of the set's values).
+    """
+    current_value_mask = sboard.getMask(current_index)
+    # looking only for cells with two to set_size remaining values
+    if not 2 <= current_value_mask.bit_count() <= set_size:
+        return
+    candidates = __find_naked_candidate_cells(sboard, current_index)
+    for (naked_set, union_values) in __extend_naked_subset(
+            sboard, candidates, set_size, [current_index], current_value_mask, -1):
+        # a naked pair's cells have the same two values
+        if set_size == 2 and sboard.getMask(naked_set[1]) != current_value_mask:
+            continue
+        yield (naked_set, union_values)
+
+
+def __find_naked_sets(sboard, operator, set_size, set_name):
+    """
+    Search the board for naked sets of set_size cells and remove the values of each set
+    from all other cells the set's cells have in common.
+    Applies the naked set operator named operator, whose matched sets are called set_name
+    in the log.
+    """
+    sboard.config.start_operation(operator, sboard)
+    topology = sboard.getTopology(sboard.getDegree())
+
+    num_naked_sets = 0
+    # repeat until we don't get any new information
+    #   (apply the operator as much as possible)
+    num_new_naked_sets = 1
+    pass_checkpoint = sboard.getOperatorFixedPoint(operator)
+    while num_new_naked_sets:
+        num_new_naked_sets = 0
+        # iterate on the first pass through the cells whose units changed since the board was
+        #   last at this operator's fixed point (every cell if it never was), and afterwards
+        #   only through the cells whose units changed since the previous pass began
+        cells_to_check = sboard.getDirtyCells(pass_checkpoint)
+        pass_checkpoint = sboard.checkpoint()
+        for current_cell_name in cells_to_check:
+            for (set_indices, union_values) in __naked_subsets(
+                    sboard, topology.cell_index[current_cell_name], set_size):
+                naked_set = [topology.cell_names[idx] for idx in set_indices]
                 num_cells_affected = __naked_set_exclusion(
-                    sboard, naked_set, current_value_set)
+                    sboard, naked_set, union_values)
                 if num_cells_affected:
-                    num_naked_pairs += 1
-                    progress = f'NAKED PAIR of {naked_set} excluded values from {num_cells_affected} cells'
+                    num_naked_sets += 1
+                    progress = f'NAKED {set_name.upper()} of {naked_set} excluded values from {num_cells_affected} cells'
                     terminate = sboard.config.match_set_operation(
-                        f'nakedpairs', progress, sboard)
+                        operator, progress, sboard)
                     if terminate:
                         return sboard
                     if sboard.config.explore_to_fixed_point:
-                        num_new_naked_pairs += 1
+                        num_new_naked_sets += 1
 
     sboard.config.complete_operation(
-        'nakedpairs', f'Found {num_naked_pairs} naked pairs that affected board.', sboard,
-        num_naked_pairs > 0)
+        operator, f'Found {num_naked_sets} naked {set_name}s that affected board.', sboard,
+        num_naked_sets > 0)
     return sboard
 
 
+def find_naked_pairs(sboard):
+    """
+    A Naked Pair is two cells in the same unit with the same two values remaining.
+
+    Search board for a pair of two cells situated in the
+    same unit with the same value set with only two
+    values remaining. Remove these two values from all
+    cells associated with the pair.
+    """
+    return __find_naked_sets(sboard, 'nakedpairs', 2, 'pair')
+
+
 def find_naked_triples(sboard):
     """
     A Naked Triple is any group of three cells in the same unit
@@ -601,71 +505,7 @@ def find_naked_triples(sboard):
         (123) (12) (23) - {3/2/2}
         (12) (23) (13) - {2/2/2}
     """
-    sboard.config.start_operation('nakedtriples', sboard)
-
-    num_naked_triples = 0
-    # repeat until we don't get any new information
-    #   (apply the operator as much as possible)
-    num_new_naked_triples = 1
-    while num_new_naked_triples:
-        num_new_naked_triples = 0
-        # iterate through every cell in the board
-        for current_cell_name in sboard.getAllCells():
-            current_cell = sboard.getCell(current_cell_name)
-            current_value_set = current_cell.getValueSet()
-
-            # looking only for cells with two to three remaining values
-            if len(current_value_set) < 2 or len(current_value_set) > 3:
-                continue
-
-            candidate_cells = __find_naked_candidate_cells(
-                sboard, current_cell)
-
-            for first_candidate_cell in candidate_cells:
-                first_candidate_name = first_candidate_cell.getIdentifier()
-                first_candidate_value_set = first_candidate_cell.getValueSet()
-                first_candidate_unit_set = set(
-                    sboard.getCellUnits(first_candidate_name))
-                # We iterate again to find second candidate
-                for second_candidate_cell in candidate_cells:
-                    second_candidate_name = second_candidate_cell.getIdentifier()
-                    second_candidate_unit_set = set(
-                        sboard.getCellUnits(second_candidate_name))
-
-                    if(second_candidate_cell == first_candidate_cell
-                        or len(first_candidate_unit_set
-                               & second_candidate_unit_set) == 0):
-                        continue
-                    # if the second candidate is not the same as the first and
-                    # they have a common unit
-
-                    second_candidate_value_set = second_candidate_cell.getValueSet()
-
-                    # naked triple forms if the three cells have 3 values left amongst them
-                    union_values = (current_value_set | first_candidate_value_set |
-                                    second_candidate_value_set)
-                    if len(union_values) != 3:
-                        continue
-
-                    # we've found a naked triple!
-                    naked_set = [current_cell_name,
-                                 first_candidate_name, second_candidate_name]
-                    num_cells_affected = __naked_set_exclusion(
-                        sboard, naked_set, union_values)
-                    if num_cells_affected:
-                        num_naked_triples += 1
-                        progress = f'NAKED TRIPLE of {naked_set} excluded values from {num_cells_affected} cells'
-                        terminate = sboard.config.match_set_operation(
-                            f'nakedtriples', progress, sboard)
-                        if terminate:
-                            return sboard
-                        if sboard.config.explore_to_fixed_point:
-                            num_new_naked_triples += 1
-
-    sboard.config.complete_operation(
-        'nakedtriples', f'Found {num_naked_triples} naked triples that affected board.', sboard,
-        num_naked_triples > 0)
-    return sboard
+    return __find_naked_sets(sboard, 'nakedtriples', 3, 'triple')
 
 
 def find_naked_quads(sboard):
@@ -674,213 +514,159 @@ def find_naked_quads(sboard):
     that contain IN TOTAL 4 values.  Therefore we can exclude
     these four values from all other cells in the unit.
     """
-    sboard.config.start_operation('nakedquads', sboard)
+    return __find_naked_sets(sboard, 'nakedquads', 4, 'quad')
 
-    num_naked_quads = 0
-    # repeat until we don't get any new information
-    #   (apply the operator as much as possible)
-    num_new_naked_quads = 1
-    while num_new_naked_quads:
-        num_new_naked_quads = 0
-        # iterate through every cell in the board
-        for current_cell_name in sboard.getAllCells():
-            current_cell = sboard.getCell(current_cell_name)
-            current_value_set = current_cell.getValueSet()
-
-            # looking only for cells with two to four remaining values
-            if len(current_value_set) < 2 or len(current_value_set) > 4:
-                continue
-
-            candidate_cells = __find_naked_candidate_cells(
-                sboard, current_cell)
-
-            for first_candidate_cell in candidate_cells:
-                first_candidate_name = first_candidate_cell.getIdentifier()
-                first_candidate_unit_set = set(
-                    sboard.getCellUnits(first_candidate_name))
-                # We iterate again to find second candidate
-                for second_candidate_cell in candidate_cells:
-                    second_candidate_name = second_candidate_cell.getIdentifier()
-                    second_candidate_unit_set = set(
-                        sboard.getCellUnits(second_candidate_name))
-
-                    # if the second candidate is not the same as the first and
-                    # they have a common unit
-                    if(second_candidate_cell == first_candidate_cell
-                       or len(first_candidate_unit_set & second_candidate_unit_set) == 0):
-                        continue
-
-                    for third_candidate_cell in candidate_cells:
-                        third_candidate_name = third_candidate_cell.getIdentifier()
-                        third_candidate_unit_set = set(
-                            sboard.getCellUnits(third_candidate_name))
-
-                        # if the third candidate is not the same as the first and second
-                        # and all three have acommon unit
-                        if(third_candidate_cell == first_candidate_cell
-                                or third_candidate_cell == second_candidate_cell
-                                or len(first_candidate_unit_set
-                                       & second_candidate_unit_set
-                                       & third_candidate_unit_set) == 0):
-                            continue
-
-                        first_candidate_value_set = first_candidate_cell.getValueSet()
-                        second_candidate_value_set = second_candidate_cell.getValueSet()
-                        third_candidate_value_set = third_candidate_cell.getValueSet()
-
-                        # naked quad forms if the three cells have
-                        # 4 values left amongst them
-                        union_values = (current_value_set | first_candidate_value_set |
-                                        second_candidate_value_set |
-                                        third_candidate_value_set)
-                        if len(union_values) != 4:
-                            continue
-
-                        # we've found a naked quad!
-                        naked_set = [current_cell_name, first_candidate_name,
-                                     second_candidate_name, third_candidate_name]
-                        num_cells_affected = __naked_set_exclusion(
-                            sboard, naked_set, union_values)
-                        if num_cells_affected:
-                            num_naked_quads += 1
-                            progress = f'NAKED QUAD of {naked_set} excluded values from {num_cells_affected} cells'
-                            terminate = sboard.config.match_set_operation(
-                                f'nakedquads', progress, sboard)
-                            if terminate:
-                                return sboard
-                            if sboard.config.explore_to_fixed_point:
-                                num_new_naked_quads += 1
-
-    sboard.config.complete_operation(
-        'nakedquads', f'Found {num_naked_quads} naked quads that affected board.', sboard,
-        num_naked_quads > 0)
-    return sboard
 
-
-def __find_naked_candidate_cells(sboard, current_cell):
+def __pointing_sets(sboard, intersection, set_size):
     """
-    Compares all cells to the current one and makes a list of
-    cells that meet the criteria for naked candidacy.
-    The criteria are that the candidate needs to have between 2 and 4
-    remaining values and the union of the candidate's and current cell's
-    value set must be less than or equal to 4.
+    Finds the pointing sets of set_size cells in a box-line intersection (a position in
+    Topology.intersections): cells of the intersection that are the only cells of the box,
+    or the only cells of the line, that can hold some value.
+    Returns a list of (the positions of the set's cells within the box; the bitmask of the values
+    confined to the set within the box, to remove from the rest of the line; the bitmask of the
+    values confined to the set within the line, to remove from the rest of the box) for every set
+    that would remove some value.
     """
-    current_cell_name = current_cell.getIdentifier()
-    current_value_set = current_cell.getValueSet()
-    # the list of cells associated with the current cell
-    current_associated_cells = sboard.getAssociatedCellIds(current_cell_name)
-
-    # iterate through list of current's associated cells
-    candidate_cells = []
-    for candidate_cell_name in current_associated_cells:
-        candidate_cell = sboard.getCell(candidate_cell_name)
-        candidate_value_set = candidate_cell.getValueSet()
-
-        # Candidate cell can only have 2 to 4 remaining values
-        if len(candidate_value_set) > 1 and len(candidate_value_set) < 5:
-            union = candidate_value_set | current_value_set
-
-            # The candidate and current cell have to have a total of 4 values or less
-            if len(union) <= 4:
-                candidate_cells.append(candidate_cell)
-    return candidate_cells
+    topology = sboard.getTopology(sboard.getDegree())
+    (box, line, _) = topology.intersections[intersection]
+    (box_positions, line_positions) = topology.intersection_positions[intersection]
+    box_indices = topology.unit_indices[box]
+
+    # the values each set confines, by the positions of the set's cells within the box
+    #   (a value only changes the sets it is in, so the sets can be gathered value by value)
+    set_values = {}
+    for value in board.Cell.getPossibleValuesByDegree(sboard.getDegree()):
+        in_box = sboard.getValuePositions(box, value)
+        set_positions = in_box & box_positions
+        if set_positions.bit_count() != set_size:
+            continue
+        in_line = sboard.getValuePositions(line, value)
+        box_confined = not in_box & ~box_positions and in_line & ~line_positions
+        line_confined = not in_line & ~line_positions and in_box & ~box_positions
+        if not (box_confined or line_confined):
+            continue
+        # no point in the set if one of its cells is already certain
+        if any(set_positions >> position & 1 and not mask & (mask - 1)
+               for (position, mask) in enumerate(sboard.getMask(idx) for idx in box_indices)):
+            continue
+        (box_values, line_values) = set_values.get(set_positions, (0, 0))
+        if box_confined:
+            box_values |= 1 << value
+        else:
+            line_values |= 1 << value
+        set_values[set_positions] = (box_values, line_values)
+    return [(set_positions, box_values, line_values)
+            for (set_positions, (box_values, line_values)) in set_values.items()]
 
 
-def __find_pointing_candidate_cells(sboard, current_cell):
+def __pointing_set_exclusion(sboard, intersection, pointing_set, box_values, line_values):
     """
-    Compares all cells to the current one and makes a list of
-    cells that meet the criterion for hidden candidacy.
-    The criterion is that the length of the union of the candidate's
-    and current cell's value sets must be at least 2.
+    After a pointing set is identified in a box-line intersection, this function removes
+    the values confined to the set within the box (given as a bitmask) from the rest of the line,
+    and the values confined to the set within the line from the rest of the box.
+    Returns the number of cells that were affected by the pointing set.
     """
+    topology = sboard.getTopology(sboard.getDegree())
+    (box, line, _) = topology.intersections[intersection]
+    candidate_names = [topology.cell_names[idx] for idx in pointing_set]
 
-    current_cell_name = current_cell.getIdentifier()
-    current_value_set = current_cell.getValueSet()
-    current_associated_cells = sboard.getAssociatedCellIds(current_cell_name)
-    candidate_cells = []
-    # iterate through list of current cells too find possible hidden candidates
-    for candidate_cell_name in current_associated_cells:
-
-        candidate_cell = sboard.getCell(candidate_cell_name)
-        candidate_value_set = candidate_cell.getValueSet()
-        intersection_value_set = current_value_set & candidate_value_set
-
-        if len(intersection_value_set) > 0 and len(candidate_value_set) > 1:
-            candidate_cells.append(candidate_cell)
+    num_operated_cells = 0
+    for (unit, remaining_value_mask) in ((line, box_values), (box, line_values)):
+        if not remaining_value_mask:
+            continue
+        # If any of the unit's other cells have the pointing set's values,
+        # we can exclude them.
+        for idx in topology.unit_indices[unit]:
+            if idx in pointing_set:
+                continue
+            cell = sboard.getCellAt(idx)
+            if cell.excludeMask(remaining_value_mask):
+                num_operated_cells += 1
+                progress = f'POINTING SET {candidate_names}: removed values in {board.Cell.displayMask(remaining_value_mask)} from {cell.getIdentifier()}'
+                sboard.config.debug_operation(
+                    f'pointingset', progress, sboard)
 
-    return candidate_cells
+    return num_operated_cells
 
 
-def __is_pointing_set(sboard, candidates):
+def __find_pointing_sets(sboard, operator, set_size, set_name):
     """
-    Support method that verifies whether a set of cells
-    is indeed a pointing set and excludes the appropriate
-    values from the appropriate cells.
+    Search the box-line intersections of the board for pointing sets of set_size cells
+    and remove the values they confine from the rest of the other unit.
+    Applies the pointing set operator named operator, whose matched sets are called set_name
+    in the log.
+    Sets are matched in the order of a search from each cell through its peers: at each
+    uncertain cell, the sets holding it are taken in the order of the cell's peers that share
+    a value with it (see Board.getAssociatedCellIds), as listed when the search reaches the cell.
     """
-    # variable initialization
-    num_operated_cells = 0
-    current_units = sboard.getCellUnits(candidates[0].getIdentifier())
-    current_value_set = candidates[0].getValueSet()
-    intersection_unit_set = set(current_units)
-    intersection_value_set = set(current_value_set)
-    candidate_names = []
-
-    # this loop stores the information for all candidates in single data structures
-    for cell in candidates:
-        intersection_unit_set = (intersection_unit_set &
-                                 set(sboard.getCellUnits(cell.getIdentifier())))
-        intersection_value_set = intersection_value_set & cell.getValueSet()
-        candidate_names.append(cell.getIdentifier())
-    if len(intersection_unit_set) < 2:
-        # A pointing set has to share two units
-        return 0
-    # progress = f'POINTING SET {candidate_names}: {sorted(intersection_unit_set)} shares {board.Cell.displayValues(intersection_value_set)}'
-    # sboard.config.debug_operation(f'pointingset', progress, sboard)
-
-    # loop through units common to the candidates
-    for unit in intersection_unit_set:
-        unit_cells = sboard.getUnitCells(unit)
-
-        # this variable is used to see if the candidates' common values are also
-        # present in other cells in the unit
-        remaining_value_set = intersection_value_set.copy()
-
-        # For each cell in the unit, we substract their value set
-        # from the candidate's intersection set, if any values
-        # are left over, then these values are only common to
-        # the candidates.
-        for cell in unit_cells:
-            associated_cell = sboard.getCell(cell)
-            if associated_cell not in candidates:
-                remaining_value_set -= associated_cell.getValueSet()
-
-        # If there're any values left, they are only common
-        # to the candidates. Therefore, we can remove these values
-        # from the cells in the other unit common to the candidates.
-        if len(remaining_value_set) == 0:
-            continue
-
-        other_units = intersection_unit_set - set(unit)
-        for other_unit in other_units:
-            other_unit_cells = sboard.getUnitCells(other_unit)
-
-            # If any of these cells have the pointing set's value,
-            # we can exlcude it.
-            for cell_name in other_unit_cells:
-                cell = sboard.getCell(cell_name)
-                if cell in candidates:
-                    continue
+    sboard.config.start_operation(operator, sboard)
+    topology = sboard.getTopology(sboard.getDegree())
 
-                excluded_something = False
-                for value in remaining_value_set:
-                    excluded_something |= cell.exclude(value)
-                if excluded_something:
-                    num_operated_cells += 1
-                    progress = f'POINTING SET {candidate_names}: removed values in {board.Cell.displayValues(remaining_value_set)} from {cell.getIdentifier()}'
-                    sboard.config.debug_operation(
-                        f'pointingset', progress, sboard)
+    num_pointing_sets = 0
+    # repeat until we don't get any new information
+    #   (apply the operator as much as possible)
+    num_new_pointing_sets = 1
+    pass_checkpoint = sboard.getOperatorFixedPoint(operator)
+    while num_new_pointing_sets:
+        num_new_pointing_sets = 0
+        # iterate on the first pass through the cells whose units changed since the board was
+        #   last at this operator's fixed point (every cell if it never was), and afterwards
+        #   only through the cells whose units changed since the previous pass began
+        cells_to_check = sboard.getDirtyCells(pass_checkpoint)
+        pass_checkpoint = sboard.checkpoint()
+        for current_cell_name in cells_to_check:
+            current_index = topology.cell_index[current_cell_name]
+            # no point in operator if cell is already certain
+            if sboard.getCellAt(current_index).isCertain():
+                continue
+            current_value_mask = sboard.getMask(current_index)
+
+            # the peers that can share a set with the current cell (those sharing a value with it),
+            #   by their order among its peers
+            candidate_order = {}
+            for (order, idx) in enumerate(topology.peer_indices[current_index]):
+                mask = sboard.getMask(idx)
+                if current_value_mask & mask and mask & (mask - 1):
+                    candidate_order[idx] = order
+
+            # take the sets holding the current cell in order of their other cells, rereading
+            #   the sets after each exclusion
+            last_order = ()
+            while True:
+                next_set = None
+                for intersection in topology.cell_intersections[current_index]:
+                    box_indices = topology.unit_indices[topology.intersections[intersection][0]]
+                    for (set_positions, box_values, line_values) in __pointing_sets(sboard, intersection, set_size):
+                        pointing_set = [idx for (position, idx) in enumerate(box_indices)
+                                        if set_positions >> position & 1]
+                        if current_index not in pointing_set:
+                            continue
+                        others = [candidate_order.get(idx) for idx in pointing_set if idx != current_index]
+                        if None in others:
+                            continue
+                        order = tuple(sorted(others))
+                        if order > last_order and (next_set is None or order < next_set[0]):
+                            next_set = (order, intersection, pointing_set, box_values, line_values)
+                if next_set is None:
+                    break
+                (last_order, intersection, pointing_set, box_values, line_values) = next_set
+
+                num_cells_affected = __pointing_set_exclusion(
+                    sboard, intersection, pointing_set, box_values, line_values)
+                if num_cells_affected:
+                    num_pointing_sets += 1
+                    progress = f'POINTING {set_name.upper()} of {sorted([topology.cell_names[idx] for idx in pointing_set])} excluded values from {num_cells_affected} cells'
+                    terminate = sboard.config.match_set_operation(
+                        operator, progress, sboard)
+                    if terminate:
+                        return sboard
+                    if sboard.config.explore_to_fixed_point:
+                        num_new_pointing_sets += 1
 
-    return num_operated_cells
+    sboard.config.complete_operation(
+        operator, f'Found {num_pointing_sets} pointing {set_name}s that affected board.', sboard,
+        num_pointing_sets > 0)
+    return sboard
 
 
 def find_pointing_pairs(sboard):
@@ -906,8 +692,7 @@ def find_pointing_pairs(sboard):
         4. A value in a pair in a column in the same box as each other
             can be removed from the rest of the box.
     """
-    sboard.config.start_operation('pointingpairs', sboard)
-    return __find_pointing_candidates(sboard, "pairs")
+    return __find_pointing_sets(sboard, 'pointingpairs', 2, 'pair')
 
 
 def find_pointing_triples(sboard):
@@ -933,117 +718,7 @@ def find_pointing_triples(sboard):
         4. A value in a triple in a column in the same box as each other
             can be removed from the rest of the box.
     """
-    sboard.config.start_operation('pointingtriples', sboard)
-    return __find_pointing_candidates(sboard, "triples")
-
-
-def __find_pointing_candidates(sboard, set_type):
-    """
-    Applies requested pointing pairs or triples operator.
-
-    Args:
-        sboard  : the board to which the pointing candidates operator will be applied
-        set_type   :  Specifies pointing candidates operator type, options are:
-            "pairs" or "triples"
-    Returns:
-        board   : sboard, updated to remove values identified as pointing sets
-            from related cells
-
-    If any one value is present only two or three times in just one unit,
-    then we can remove that number from the intersection of a number unit.
-    There are four types of intersections:
-        1. A pair or triple in a box - if they are aligned on a row, the
-            value can be removed from the rest of the row.
-        2. A pair or triple in a box, if they are aligned on a column, the
-            value can be removed from the rest of the column.
-        3. A pair or triple on a row - if they are all in the same box, the
-            value can be removed from the rest of the box.
-        4. A pair or triple on a column - if they are all in the same box, the
-            value can be removed from the rest of the box.
-    """
-    num_pointing_pairs = 0
-    num_pointing_triples = 0
-
-    # repeat until we don't get any new information
-    #   (apply the operator as much as possible)
-    num_new_pointing_sets = 1
-    while num_new_pointing_sets:
-        num_new_pointing_sets = 0
-        # iterate through all cells on the board
-        for current_cell_name in sboard.getAllCells():
-            current_cell = sboard.getCell(current_cell_name)
-            # no point in operator if cell is already certain
-            if current_cell.isCertain():
-                continue
-
-            # candidate are cells that have at least one
-            # value in common with the current cell
-            candidate_cells = __find_pointing_candidate_cells(
-                sboard, current_cell)
-            candidates = []
-            for first_candidate_cell in candidate_cells:
-                candidates = [current_cell, first_candidate_cell]
-                # check to see if the two cells constitute a pointing pair
-                if set_type == 'pairs':
-                    num_cells_affected = __is_pointing_set(sboard, candidates)
-                    if num_cells_affected:
-                        num_pointing_pairs += 1
-                        progress = f'POINTING PAIR of {sorted([cell.getIdentifier() for cell in candidates])} excluded values from {num_cells_affected} cells'
-                        terminate = sboard.config.match_set_operation(
-                            f'pointingpairs', progress, sboard)
-                        if terminate:
-                            return sboard
-                        if sboard.config.explore_to_fixed_point:
-                            num_new_pointing_sets += 1
-                    # We're doing pairs, so there's no need to continue onwards to triples
-                    continue
-
-                assert set_type == 'triples', f'Only support pointing pairs and pointing triples, not {set_type}'
-                for second_candidate_cell in candidate_cells:
-                    if second_candidate_cell in candidates:
-                        continue
-
-                    current_units = sboard.getCellUnits(current_cell_name)
-                    current_value_set = current_cell.getValueSet()
-                    first_candidate_units = sboard.getCellUnits(
-                        first_candidate_cell.getIdentifier())
-                    first_candidate_value_set = first_candidate_cell.getValueSet()
-                    second_candidate_units = sboard.getCellUnits(
-                        second_candidate_cell.getIdentifier())
-                    second_candidate_value_set = second_candidate_cell.getValueSet()
-
-                    # check if all three cells have at least one value in common
-                    # also check if the all three cell have a common unit
-                    if(len(current_value_set & first_candidate_value_set &
-                            second_candidate_value_set) == 0 or
-                        len(set(current_units) & set(first_candidate_units) &
-                            set(second_candidate_units)) == 0):
-                        continue
-
-                    candidates = [current_cell,
-                                  first_candidate_cell, second_candidate_cell]
-
-                    # check if the three cells consistitute a pointing triple
-                    num_cells_affected = __is_pointing_set(sboard, candidates)
-                    if num_cells_affected:
-                        num_pointing_triples += 1
-                        progress = f'POINTING TRIPLE of {sorted([cell.getIdentifier() for cell in candidates])} excluded values from {num_cells_affected} cells'
-                        terminate = sboard.config.match_set_operation(
-                            f'pointingtriples', progress, sboard)
-                        if terminate:
-                            return sboard
-                        if sboard.config.explore_to_fixed_point:
-                            num_new_pointing_sets += 1
-
-    if set_type == 'pairs':
-        sboard.config.complete_operation(
-            'pointingpairs', f'Found {num_pointing_pairs} pointing pairs that affected board.', sboard,
-            num_pointing_pairs > 0)
-    elif set_type == 'triples':
-        sboard.config.complete_operation(
-            'pointingtriples', f'Found {num_pointing_triples} pointing triples that affected board.', sboard,
-            num_pointing_triples > 0)
-    return sboard
+    return __find_pointing_sets(sboard, 'pointingtriples', 3, 'triple')
 
 
 def find_xwings(sboard):
@@ -1094,10 +769,10 @@ def find_xwings(sboard):
                 if second_value == current_value and second_unit_type == current_unit_type:
                     candidates = current_cells_containing_value + \
                         second_cells_containing_value
-                    first_intersection_unit_list = list((set(sboard.getCellUnits(candidates[0])) &
-                                                         set(sboard.getCellUnits(candidates[2]))))
-                    second_intersection_unit_list = list((set(sboard.getCellUnits(candidates[1])) &
-                                                          set(sboard.getCellUnits(candidates[3]))))
+                    first_intersection_unit_list = sboard.getCommonUnits([candidates[0], candidates[2]],
+                                                                         sboard.getDegree())
+                    second_intersection_unit_list = sboard.getCommonUnits([candidates[1], candidates[3]],
+                                                                          sboard.getDegree())
 
                     # If candidates have a second unit in common that's also  of the same type
                     # then we technically have found an x-wing.
@@ -1125,9 +800,8 @@ def find_xwings(sboard):
                                     cell = sboard.getCell(cell_name)
 
                                     # if the value is presentin a cell, we exclude it
-                                    if exclusion_value in cell.getValueSet():
+                                    if cell.exclude(exclusion_value):
                                         excluded_cells.append(cell_name)
-                                        cell.exclude(exclusion_value)
 
                         if len(excluded_cells) > 0:
                             num_xwings += 1
@@ -1151,16 +825,15 @@ def __find_yzwing_candidates(sboard, current_cell_name, num_values, num_intersec
     """
     candidates = []
     current_cell = sboard.getCell(current_cell_name)
-    current_value_set = current_cell.getValueSet()
-    associated_cells = sboard.getAssociatedCellIds(current_cell_name)
+    current_value_mask = current_cell.getValueMask()
+    associated_indices = sboard.getTopology(
+        sboard.getDegree()).peer_indices[current_cell.getIndex()]
 
-    for associated_cell_name in associated_cells:
-        associated_cell = sboard.getCell(associated_cell_name)
-        associated_cell_value_set = associated_cell.getValueSet()
-        intersection_value_set = current_value_set & associated_cell_value_set
-        if (len(associated_cell_value_set) == num_values and
-                len(intersection_value_set) > num_intersection_values):
-            candidates.append(associated_cell)
+    for associated_index in associated_indices:
+        associated_cell_value_mask = sboard.getMask(associated_index)
+        if (associated_cell_value_mask.bit_count() == num_values and
+                (current_value_mask & associated_cell_value_mask).bit_count() > num_intersection_values):
+            candidates.append(sboard.getCellAt(associated_index))
 
     return candidates
 
@@ -1174,6 +847,8 @@ def find_ywings(sboard):
     with B2 and A5.
     """
     sboard.config.start_operation('ywings', sboard)
+    topology = sboard.getTopology(sboard.getDegree())
+    peer_masks = topology.peer_masks
 
     num_ywings = 0
 
@@ -1188,10 +863,10 @@ def find_ywings(sboard):
             pincer_candidates = []
 
             current_cell = sboard.getCell(current_cell_name)
-            current_value_set = current_cell.getValueSet()
+            current_value_mask = current_cell.getValueMask()
 
             # For ywing, all three cells can have only two values
-            if len(current_value_set) == 2:
+            if current_value_mask.bit_count() == 2:
                 # We look for cells associated with the
                 # hinge that have only two values left
                 pincer_candidates = __find_yzwing_candidates(sboard, current_cell_name,
@@ -1200,43 +875,40 @@ def find_ywings(sboard):
 
                 # We iterate through all cells to find two candidates to be pincers
                 for first_pincer_candidate in pincer_candidates:
-                    first_pincer_value_set = first_pincer_candidate.getValueSet()
+                    first_pincer_value_mask = first_pincer_candidate.getValueMask()
 
                     for second_pincer_candidate in pincer_candidates:
                         if first_pincer_candidate == second_pincer_candidate:
                             continue
 
-                        second_pincer_value_set = second_pincer_candidate.getValueSet()
-
-                        first_pincer_associated_cells = sboard.getAssociatedCellIds(
-                            first_pincer_candidate)
-                        second_pincer_associated_cells = sboard.getAssociatedCellIds(
-                            second_pincer_candidate)
+                        second_pincer_value_mask = second_pincer_candidate.getValueMask()
 
                         # find the values that the two pincers have in common
-                        candidate_intersection_value_set = (first_pincer_value_set &
-                                                            second_pincer_value_set)
+                        candidate_intersection_value_mask = (first_pincer_value_mask &
+                                                             second_pincer_value_mask)
 
                         # find the cells associated with both pincers
-                        associated_cells_intersection = (set(first_pincer_associated_cells) &
-                                                         set(second_pincer_associated_cells))
+                        associated_cells_mask = (peer_masks[first_pincer_candidate.getIndex()] &
+                                                 peer_masks[second_pincer_candidate.getIndex()])
 
                         # if the pincers have at least one associated cell in common
                         # and they have one value in common
-                        if (len(associated_cells_intersection) > 0 and
-                                len(candidate_intersection_value_set) == 1):
+                        if (associated_cells_mask and
+                                candidate_intersection_value_mask.bit_count() == 1):
+                            associated_cells_intersection = topology.namesFromMask(
+                                associated_cells_mask)
 
                             # And the hinge and the second pincer have at least one value in common
                             # the hinge also can't have the same value that the pincer's have in common
-                            if(len(current_value_set & second_pincer_value_set) == 1
-                                    and len(current_value_set & candidate_intersection_value_set) == 0):
+                            if((current_value_mask & second_pincer_value_mask).bit_count() == 1
+                                    and not current_value_mask & candidate_intersection_value_mask):
                                 # we've found a y-wing!
                                 y_wing = [current_cell_name, first_pincer_candidate.getIdentifier(),
                                           second_pincer_candidate.getIdentifier()]
 
                                 # The value common to the two pincer's is the one we can elminate
                                 # From any cell that's common to both of them
-                                exclusion_value = candidate_intersection_value_set.pop()
+                                exclusion_value = candidate_intersection_value_mask.bit_length() - 1
                                 excluded_cells = []
 
                                 # We iterate through the cells associated with both pincers
@@ -1292,33 +964,33 @@ def find_xyzwings(sboard):
             pincer_candidates = []
 
             current_cell = sboard.getCell(current_cell_name)
-            current_value_set = current_cell.getValueSet()
+            current_value_mask = current_cell.getValueMask()
 
             # the hinge can only have three values.
-            if len(current_value_set) == 3:
+            if current_value_mask.bit_count() == 3:
                 # the pincers can only have 2 values each.
                 pincer_candidates = __find_yzwing_candidates(sboard, current_cell_name,
                                                       num_values=2,
                                                       num_intersection_values=0)
             # iterate through the pincer candidates
             for first_pincer_candidate in pincer_candidates:
-                first_pincer_value_set = first_pincer_candidate.getValueSet()
+                first_pincer_value_mask = first_pincer_candidate.getValueMask()
 
                 for second_pincer_candidate in pincer_candidates:
                     if second_pincer_candidate != first_pincer_candidate:
-                        second_pincer_value_set = second_pincer_candidate.getValueSet()
-                        candidate_intersection_set = (first_pincer_value_set &
-                                                      second_pincer_value_set)
+                        second_pincer_value_mask = second_pincer_candidate.getValueMask()
+                        candidate_intersection_mask = (first_pincer_value_mask &
+                                                       second_pincer_value_mask)
 
                         # the puncers have to have only 1 value in common
-                        if len(candidate_intersection_set) == 1:
+                        if candidate_intersection_mask.bit_count() == 1:
 
-                            union_set = (current_value_set | first_pincer_value_set |
-                                         second_pincer_value_set)
+                            union_mask = (current_value_mask | first_pincer_value_mask |
+                                          second_pincer_value_mask)
 
                             # the hinge and the two pincers can only have 3 values
                             # total
-                            if len(union_set) == 3:
+                            if union_mask.bit_count() == 3:
                                 # we've found an xyz-wing!
                                 xyz_wing = [current_cell_name,
                                             first_pincer_candidate.getIdentifier(),
@@ -1328,15 +1000,13 @@ def find_xyzwings(sboard):
                                 # from the cells that the cells forming the wing have
                                 # in common
                                 common_cells = sboard.getCommonCells(xyz_wing)
-                                exclusion_set = current_value_set & candidate_intersection_set
-                                exclusion_value = exclusion_set.pop()
+                                exclusion_value = (current_value_mask & candidate_intersection_mask).bit_length() - 1
                                 excluded_cells = []
 
                                 for cell_name in common_cells:
                                     cell = sboard.getCell(cell_name)
-                                    if cell.hasValue(exclusion_value):
+                                    if cell.exclude(exclusion_value):
                                         excluded_cells.append(cell_name)
-                                        cell.exclude(exclusion_value)
 
                                 if len(excluded_cells) > 0:
                                     num_xyzwings += 1
@@ -122,6 +122,11 @@ games = {
                     'test7-i26e36hp10...goal=C6...name=Pilot Test Board2...select_ops_upfront...question=Can C6 be odd?'],
         'config_alterations': {'costly_ops': ['inclusion', 'pointingpairs', 'nakedpairs', 'xwings']}
     },
+    'pilot_test_a_board_stop_when_answered': {
+        'puzzles': ['test7-i26e36hp10...goal=C6...name=Pilot Test Board...question=Can C6 be a 7?...canbe=7...stopwhenanswered',
+                    'test7-i26e36hp10...goal=C6...name=Pilot Test Board2...select_ops_upfront...question=Can C6 be odd?...canbe=1,3,5,7,9...stopwhenanswered'],
+        'config_alterations': {'costly_ops': ['inclusion', 'pointingpairs', 'nakedpairs', 'xwings']}
+    },
     'test_logical_operators_in_sequence': {
         'puzzles': ['test2-i24e40...name=Test Inclusion...goal=C6...question=Can C6 be 4?...answer=no',
                     'test9-i29e35hp2...name=Test Pointing Pairs...goal=C6...question=Can C6 equal A2 or A3?...answer=yes',
@@ -164,6 +169,13 @@ games = {
             'test16-i26e36np3...goal=F3...name=Training #3...question=Can F3 be 3 or 7?...answer=no',
         ]
     },
+    'training_games_stop_when_answered': {
+        'puzzles': [
+            'easy2...goal=E7...name=Training #1...question=Can E7 be 6?...canbe=6...stopwhenanswered...answer=no',
+            'test11-i36e28hp2...goal=B8...name=Training #2...question=Can B8 be odd?...canbe=1,3,5,7,9...stopwhenanswered...answer=yes',
+            'test16-i26e36np3...goal=F3...name=Training #3...question=Can F3 be 3 or 7?...canbe=3,7...stopwhenanswered...answer=no',
+        ]
+    },
     'training_games1_select_ops_upfront': {
         'puzzles': [
             'easy2...goal=E7...name=Training #1...question=Can E7 be 6?...answer=no...select_ops_upfront',
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sandia National Laboratories
+October 17, 2026
+
+Index of the solutions to the puzzle catalog (puzzles.puzzles), built offline by build_solution_index.py.
+    - records the solution of each puzzle, its number of solutions (capped), and the logical operators solving it used
+    - memory-maps the index file, so every server process shares one read-only copy of it
+"""
+
+import puzzles
+
+from array import array
+import collections
+import hashlib
+import mmap
+import os
+import struct
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+# The index lives next to the server code
+INDEX_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'solutions.idx')
+
+# Count the solutions of a puzzle no further than this
+SOLUTION_COUNT_CAP = 1000
+
+# The index file is (little-endian):
+#   the header: magic, number of records, length of the operator names
+#   the operator names, comma-separated, in the order of the bits of the records' operator masks
+#   the records, sorted by the digest of the puzzle's givens (see givens_digest)
+#   the solutions, one byte (the 0-based value) per cell in row-major order
+_MAGIC = b'SDKSOL01'
+_HEADER = struct.Struct('<8sII')
+# digest, degree, flags, number of solutions, operators used, offset of the solution (0 if there is none)
+_RECORD = struct.Struct('<16sBBHII')
+
+_COUNT_CAPPED = 1
+_SOLVED_LOGICALLY = 2
+
+
+class SolutionRecord(collections.namedtuple(
+        'SolutionRecord', ['degree', 'solution', 'solution_count', 'count_capped', 'solved_logically', 'operators'])):
+    """
+    The cached facts about one puzzle.
+
+    Members:
+        degree (int): the degree of the puzzle
+        solution (array('H') or None): the candidate bitmask of every cell of the first solution, as Board stores it
+        solution_count (int): the number of solutions, up to SOLUTION_COUNT_CAP
+        count_capped (bool): whether there may be more solutions than solution_count
+        solved_logically (bool): whether logical_solve with every operator solves the puzzle
+        operators (tuple[str]): the logical operators that changed the board during that logical_solve
+    """
+
+    __slots__ = ()
+
+    @ property
+    def unique(self):
+        """ Whether the puzzle has exactly one solution. """
+        return self.solution_count == 1 and not self.count_capped
+
+
+def givens_digest(givens):
+    """ Return the key of the puzzle with the givens string (as in puzzles.puzzles) in the index. """
+    return hashlib.blake2b(givens.encode('ascii'), digest_size=16).digest()
+
+
+class SolutionIndex():
+    """
+    A read-only index of SolutionRecords, keyed by the givens of each puzzle.
+
+    Because the key is the givens themselves, a puzzle whose givens have changed since the index was built
+    is simply not found, rather than given a stale solution.
+    """
+
+    def __init__(self, buffer=None):
+        self._buffer = buffer
+        self._operators = ()
+        self._record_count = 0
+        self._records_start = 0
+        # Map from digest to SolutionRecord, for the records already looked up
+        self._records = {}
+        if buffer is None:
+            return
+        (magic, self._record_count, names_length) = _HEADER.unpack_from(buffer, 0)
+        if magic != _MAGIC:
+            raise ValueError(f'Not a solution index (magic {magic})')
+        names = bytes(buffer[_HEADER.size:_HEADER.size + names_length]).decode('ascii')
+        self._operators = tuple(names.split(',')) if names else ()
+        self._records_start = _HEADER.size + names_length
+
+    @ classmethod
+    def open(cls, path=INDEX_FILE):
+        """ Return the index in the file at path, memory-mapped, or an empty index if there is no usable file. """
+        try:
+            with open(path, 'rb') as index_file:
+                buffer = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+            index = cls(buffer)
+        except (OSError, ValueError, struct.error) as e:
+            logger.warning("No solution index loaded from %s (%s); run build_solution_index.py to build it.", path, e)
+            return cls()
+        logger.info("Loaded the solutions of %s puzzles from %s", len(index), path)
+        return index
+
+    @ staticmethod
+    def write(path, operators, entries):
+        """ Write an index of entries to the file at path.
+
+        Args:
+            path (str): the file to write, which is replaced all at once
+            operators (list[str]): the names of the operators the entries may list
+            entries (list[tuple]): (givens, degree, solution, solution_count, count_capped, solved_logically,
+                operators used) for each puzzle, where solution is a sequence of the 0-based value of every cell,
+                or None if the puzzle has no solution
+        """
+        names = ','.join(operators).encode('ascii')
+        entries = sorted(entries, key=lambda entry: givens_digest(entry[0]))
+        records = bytearray()
+        solutions = bytearray()
+        solutions_start = _HEADER.size + len(names) + _RECORD.size * len(entries)
+        for (givens, degree, solution, solution_count, count_capped, solved_logically, used) in entries:
+            flags = (_COUNT_CAPPED if count_capped else 0) | (_SOLVED_LOGICALLY if solved_logically else 0)
+            used_mask = 0
+            for op in used:
+                used_mask |= 1 << operators.index(op)
+            offset = 0
+            if solution is not None:
+                offset = solutions_start + len(solutions)
+                solutions.extend(solution)
+            records.extend(_RECORD.pack(givens_digest(givens), degree, flags, solution_count, used_mask, offset))
+        temporary_path = f'{path}.tmp'
+        with open(temporary_path, 'wb') as index_file:
+            index_file.write(_HEADER.pack(_MAGIC, len(entries), len(names)))
+            index_file.write(names)
+            index_file.write(records)
+            index_file.write(solutions)
+        os.replace(temporary_path, path)
+
+    def __len__(self):
+        return self._record_count
+
+    def _findRecord(self, digest):
+        """ Return the position of the record with digest, by binary search, or None if there is none. """
+        low = 0
+        high = self._record_count
+        while low < high:
+            middle = (low + high) // 2
+            start = self._records_start + middle * _RECORD.size
+            key = self._buffer[start:start + 16]
+            if key == digest:
+                return start
+            if key < digest:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def lookup(self, givens):
+        """ Return the SolutionRecord of the puzzle with the givens string, or None if it is not indexed. """
+        digest = givens_digest(givens)
+        try:
+            return self._records[digest]
+        except KeyError:
+            pass
+        start = self._findRecord(digest)
+        if start is None:
+            return None
+        (_, degree, flags, solution_count, used_mask, offset) = _RECORD.unpack_from(self._buffer, start)
+        solution = None
+        if offset:
+            cells = (degree * degree) ** 2
+            solution = array('H', [1 << value for value in self._buffer[offset:offset + cells]])
+        used = tuple(op for (bit, op) in enumerate(self._operators) if used_mask & (1 << bit))
+        record = SolutionRecord(degree, solution, solution_count, bool(flags & _COUNT_CAPPED),
+                                bool(flags & _SOLVED_LOGICALLY), used)
+        self._records[digest] = record
+        return record
+
+    def lookupPuzzle(self, name):
+        """ Return the SolutionRecord of the catalog puzzle name (optionally with embedded config), or None. """
+        if not name:
+            return None
+        givens = puzzles.puzzles.get(name.split('...')[0])
+        if not isinstance(givens, str):
+            return None
+        return self.lookup(givens)
+
+
+# The index of the catalog shared by this process (see catalog_index)
+_catalog_index = None
+
+
+def load_catalog_index(path=INDEX_FILE):
+    """ Map the catalog index at path, replacing any index already loaded, and return it.
+
+    The server calls this at startup; otherwise the index is loaded when it is first needed.
+    """
+    global _catalog_index
+    _catalog_index = SolutionIndex.open(path)
+    return _catalog_index
+
+
+def catalog_index():
+    """ Return the index of the catalog, loading it if needed. """
+    if _catalog_index is None:
+        return load_catalog_index()
+    return _catalog_index
@@ -9,11 +9,15 @@ Sudoku Board solvers.
     - heuristic cell selectors
 """
 
+import collections
+import heapq
+import itertools
 import random
 import operators
 import config_data
 import board_update_descriptions
 import board
+import exact_cover
 import translate
 
 import logging
@@ -35,16 +39,30 @@ def calculate_status(sboard, msg):
     """
     # If we found a contradiction (bad guess earlier in search), return 0
     #    as no more cells can be assigned
-    if(sboard.invalidCells()):
-        logger.debug("Found logical contradiction: invalid cells on board %s",
-            str(sboard.getStateStr(True, False)))
+    if(sboard.hasInvalidCells()):
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Found logical contradiction: invalid cells on board %s",
+                str(sboard.getStateStr(True, False)))
         return 0
     nValues = sboard.countUncertainValues()
-    logger.debug("Uncertainty state after %s\n%s\n%s uncertain values remaining",
-        str(msg), str(sboard.getStateStr(True)), str(nValues))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Uncertainty state after %s\n%s\n%s uncertain values remaining",
+            str(msg), str(sboard.getStateStr(True)), str(nValues))
     return nValues
 
 
+def is_question_answered(sboard):
+    """ Return True iff the configured goal question (see Policy.goal_question) is settled on sboard:
+        the goal cell's candidates are all among the values asked about (yes) or none are (no).
+    """
+    question = sboard.config.goal_question
+    if question is None:
+        return False
+    (goal, mask) = question
+    candidates = sboard.getCell(goal).getValueMask()
+    return candidates & mask == 0 or candidates & ~mask == 0
+
+
 def get_operator(op_name):
     """ Call the given operator.
 
@@ -86,17 +104,44 @@ def get_action(action_name):
     return function
 
 
+# How the operator applications requested by the operator loops were carried out:
+#   invocations: every application requested
+#   skipped: applications to a board already at the operator's fixed point, which were logged without searching
+#   resumed: searches restricted to the units changed since the board was last at the operator's fixed point
+# Every application that was skipped or resumed is a full-board search saved.
+operator_invocations = collections.Counter()
+
+
 BREAK = int(0xdead)
 NORMAL = int(0xcafe)
 def apply_one_operator(op, sboard):
     """ Apply one operator.
+
+    The operator searches the board only if it has changed since the board was last at
+    the operator's fixed point, and then (see operators.resumable_operators) only the units
+    that changed; either way it is logged and costed as if it had searched the whole board.
+
         Returns:
             boolean Changed if the operator changed the board,
             MAGIC BREAK if the operator loop should break/restart and NORMAL if it should continue.
     """
+    operator_invocations['invocations'] += 1
     prevValues = sboard.countUncertainValues()
-    prevBoard = board.Board(sboard)
-    sboard = get_operator(op)(sboard)
+    if sboard.isOperatorSettled(op):
+        # Nothing has changed since the board was at op's fixed point, so op would not
+        # change the board now; log (and cost) the attempt without searching again
+        operator_invocations['skipped'] += 1
+        sboard.config.start_operation(op, sboard)
+        sboard.config.complete_operation(
+            op, 'Board unchanged since the last attempt', sboard, False)
+    else:
+        if op in operators.resumable_operators and sboard.getOperatorFixedPoint(op) is not None:
+            operator_invocations['resumed'] += 1
+        checkpoint = sboard.checkpoint()
+        sboard = get_operator(op)(sboard)
+        if sboard.config.explore_to_fixed_point or not sboard.hasChangedSince(checkpoint):
+            sboard.setOperatorSettled(op)
+    # (a contradiction counts as a change, see calculate_status)
     newValues = calculate_status(sboard, op)
     changed = newValues < prevValues
     if changed and sboard.config.restart_op_search_on_match:
@@ -110,22 +155,26 @@ def apply_logical_operator(op, sboard):
     prevValues = sboard.countUncertainValues()
     (sboard, control) = apply_one_operator(op, sboard)
     sboard = apply_free_operators(sboard)
-    if sboard.config.retry_logical_op_after_free_ops and control != BREAK and sboard.countUncertainValues() < prevValues:
-        ## Continue to iterate on the single logical operator, including free operators
+    if (sboard.config.retry_logical_op_after_free_ops and control != BREAK
+            and sboard.countUncertainValues() < prevValues and not is_question_answered(sboard)):
+        ## Continue to iterate on the single logical operator, including free operators,
+        ## unless that has answered the goal question
         return apply_logical_operator(op, sboard)
     return (sboard, control)
 
 
-def loop_operators(sboard, operations_list, function_to_apply):
+def loop_operators(sboard, operations_list, function_to_apply, until=None):
     """  Loop over operations list, applying function_to_apply,
          given initial sboard, following configured control flow,
-         until no values change.
+         until no values change (or until(sboard) is True, if until is given).
     """
     initialUncertainValues = sboard.countUncertainValues()
     while(initialUncertainValues > 0):
+        if until and until(sboard):
+            break
         for op in operations_list:
             (sboard, control) = function_to_apply(op, sboard)
-            if control == BREAK:
+            if control == BREAK or (until and until(sboard)):
                 break
         ## If none of the operators did anything, exit the loop
         if initialUncertainValues == sboard.countUncertainValues():
@@ -145,6 +194,156 @@ def apply_free_operators(sboard, force=False):
                           apply_one_operator)
 
 
+class LogicalSolveEntry():
+    """
+    What a logical_solve did to a board: the candidates it ended with and everything it
+    logged and charged on the way, so that it can be replayed on another board in the same state.
+
+    Members:
+        initial (array): the candidates the solve started from (see Board.getSnapshot)
+        result (array): the candidates the solve reached
+        propagated (int): the cells propagated when the solve finished (see Board.getPropagatedMask)
+        settled (tuple): the operators the board was at the fixed point of when the solve finished
+            (see Board.getSettledOperators)
+        updates (tuple): the updates logged by the solve (see SudokuLogger.getUpdatesSince)
+        called_counts, use_counts (dict): operator -> increase in the logger's operator counts
+        cost_delta (int): the increase in the board's cost, or None if the cost was not charged
+    """
+
+    __slots__ = ('initial', 'result', 'propagated', 'settled', 'updates',
+                 'called_counts', 'use_counts', 'cost_delta')
+
+    def __init__(self, initial, result, propagated, settled, updates, called_counts, use_counts, cost_delta):
+        self.initial = initial
+        self.result = result
+        self.propagated = propagated
+        self.settled = settled
+        self.updates = updates
+        self.called_counts = called_counts
+        self.use_counts = use_counts
+        self.cost_delta = cost_delta
+
+    def replay(self, sboard):
+        """ Bring sboard (in the initial state) to the result, logging and charging exactly what the solve did. """
+        sboard.adoptSnapshot(self.result, self.propagated)
+        for op in self.settled:
+            sboard.setOperatorSettled(op)
+        sboard.config.log.replayUpdates(self.updates, self.called_counts, self.use_counts)
+        if self.cost_delta is not None:
+            parameters = sboard.config.parameters
+            parameters["cost"] = parameters.get("cost", 0) + self.cost_delta
+
+
+class LogicalSolveCache():
+    """
+    A bounded, process-wide map from (board state, propagated cells, settled operators,
+    ordered logical operators, policy, logging state) to the LogicalSolveEntry recording
+    what a logical_solve did from there, so that the same fixed point requested again
+    (e.g., by many players of the same puzzle) is replayed instead of searched for.  The least recently used entries are evicted
+    beyond max_entries.  Boards whose policy has memoize_logical_solve False bypass it.
+
+    Members:
+        max_entries (int): the most entries to keep
+        _entries (OrderedDict): key (see makeKey) -> LogicalSolveEntry, least recently used first
+        lookups, hits, stores, evictions (int): statistics
+    """
+
+    def __init__(self, max_entries=512):
+        assert max_entries > 0, f'A logical solve cache needs room for at least one entry, not {max_entries}'
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()
+        self.lookups = 0
+        self.hits = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @ staticmethod
+    def makeKey(sboard, logical_ops):
+        """ Return the key for solving sboard, in its current state, with logical_ops. """
+        config = sboard.config
+        # Besides the candidates, the propagated cells decide what exclusion does, and the
+        #   operators the board is settled at the fixed point of are logged as skipped rather
+        #   than searched; where an earlier fixed point was, though, only changes how much is
+        #   searched, not what is found (see Board.getDirtyCells), so it is left out
+        return (sboard.stateHash(), sboard.getPropagatedMask(), sboard.getSettledOperators(),
+                tuple(logical_ops), config.policy, config.log.snapshotKey())
+
+    def lookup(self, key, sboard):
+        """ Return the LogicalSolveEntry for key if it started from the state of sboard, or None. """
+        self.lookups += 1
+        entry = self._entries.get(key)
+        if entry is None or not sboard.hasSnapshot(entry.initial):
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def store(self, key, entry):
+        """ Remember entry for key, evicting the least recently used entry if we are full. """
+        self.stores += 1
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """ Forget every entry (but not the statistics). """
+        self._entries.clear()
+
+    def getStatistics(self):
+        """ Return a dictionary of the cache's size and hit statistics. """
+        return {"entries": len(self._entries),
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions}
+
+
+# The cache shared by every logical_solve in this process
+logical_solve_cache = LogicalSolveCache()
+
+
+def loop_logical_operators(sboard, logical_ops):
+    """ Apply logical_ops to sboard to a fixed point (see loop_operators), or until the goal
+        question is answered (see is_question_answered), replaying the result from
+        logical_solve_cache when this state has been solved the same way before.
+    """
+    until = is_question_answered if sboard.config.goal_question else None
+    if not sboard.config.memoize_logical_solve:
+        return loop_operators(sboard, logical_ops, apply_logical_operator, until)
+    cache = logical_solve_cache
+    key = cache.makeKey(sboard, logical_ops)
+    entry = cache.lookup(key, sboard)
+    if entry is not None:
+        entry.replay(sboard)
+        return sboard
+
+    log = sboard.config.log
+    initial = sboard.getSnapshot()
+    update_count = log.countUpdates()
+    called_counts = dict(log.operators_called_count)
+    use_counts = dict(log.operators_use_count)
+    cost = sboard.config.parameters.get("cost")
+
+    sboard = loop_operators(sboard, logical_ops, apply_logical_operator, until)
+
+    final_cost = sboard.config.parameters.get("cost")
+    cache.store(key, LogicalSolveEntry(
+        initial,
+        sboard.getSnapshot(),
+        sboard.getPropagatedMask(),
+        sboard.getSettledOperators(),
+        log.getUpdatesSince(update_count),
+        {op: count - called_counts[op] for (op, count) in log.operators_called_count.items()
+         if count != called_counts[op]},
+        {op: count - use_counts[op] for (op, count) in log.operators_use_count.items()
+         if count != use_counts[op]},
+        None if final_cost == cost else final_cost - (cost or 0)))
+    return sboard
+
+
 # -----------------------------------------------------------------------------
 # LOGICAL PUZZLE OPERATOR SELECTORS
 # -----------------------------------------------------------------------------
@@ -187,12 +386,12 @@ def logical_solve(sboard, logical_ops):
         OR None if sboard reaches a contradiction.
 
     Currently iterates between propagating exclusions and assigning
-    inclusions until no new constraints are identified.
+    inclusions until no new constraints are identified, or, if the puzzle
+    configures a goal question (see Policy.goal_question), until the goal
+    cell's candidates answer it.
     """
     # Iterate until we don't change the board or no uncertain values remain
-    sboard = loop_operators(sboard,
-                            logical_ops,
-                            apply_logical_operator)
+    sboard = loop_logical_operators(sboard, logical_ops)
 
     req_ops = list(logical_ops)
     req_ops.extend(sboard.config.free_operations)
@@ -208,6 +407,28 @@ def logical_solve_action(sboard, logical_ops):
     child_board.addAction({'action': 'applyops', 'operators': list(logical_ops)})
     return [child_board]
 
+
+def solve_action(sboard, limit):
+    """
+    Solve sboard completely with exact_cover, which searches from its candidate values.
+
+    Args:
+        sboard : the board to solve
+        limit : the most solutions to return
+    Returns:
+        collection of board : a solved copy of sboard for each of the (first limit) solutions,
+            which is empty if sboard has no solution
+    """
+    solutions = exact_cover.find_solutions(sboard, limit)
+    logger.info("Found %s solutions (of at most %s) to %s", len(solutions), limit, sboard.getPuzzleName())
+    expansion = []
+    for solution in solutions:
+        b = board.Board(sboard)
+        b.adoptSnapshot(solution)
+        b.addAction({'action': 'solve', 'limit': limit})
+        expansion.append(b)
+    return expansion
+
 # -----------------------------------------------------------------------------
 # SEARCH METHODS
 # -----------------------------------------------------------------------------
@@ -427,6 +648,121 @@ def select(item_list, heuristic, criterion, selector):
     return selector(best_list)
 
 
+class BoardFrontier():
+    """
+    The active GameTreeNodes of a game search, with a heap per board selection heuristic,
+    so that selecting the best node takes O(log n) instead of scoring every node on every decision.
+
+    Each node is scored at most once per heuristic (a node's board does not change while it is active),
+    and ties are broken at random by a key drawn when the node enters the heap.  The frontier still
+    behaves as the list of active nodes it replaces (len, iteration, indexing, append, extend, remove),
+    so selectors that look at every node keep working; nodes removed that way leave the heaps lazily.
+
+    Members:
+        _nodes (dict): active node -> its sequence number, in the order the nodes were added
+        _heaps (dict): (heuristic, criterion) -> heap of (key, tie-break, sequence number, node),
+            where the key is the score for min and its negation for max
+        _scores (dict): heuristic -> {active node -> score}
+    """
+
+    # The criteria a heap can serve, and the sign that turns them into a min-heap key
+    _signs = {min: 1, max: -1}
+
+    def __init__(self, nodes=()):
+        self._nodes = {}
+        self._heaps = {}
+        self._scores = {}
+        self._sequence = itertools.count()
+        self.extend(nodes)
+
+    @ classmethod
+    def supports(cls, criterion):
+        """ Return whether popBest can select by criterion. """
+        return criterion in cls._signs
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __iter__(self):
+        return iter(list(self._nodes))
+
+    def __getitem__(self, idx):
+        return list(self._nodes)[idx]
+
+    def __contains__(self, node):
+        return node in self._nodes
+
+    def _score(self, heuristic, node):
+        """ Return the score of node by heuristic, computing it only the first time. """
+        scores = self._scores.setdefault(heuristic, {})
+        try:
+            return scores[node]
+        except KeyError:
+            score = heuristic(node)
+            scores[node] = score
+            return score
+
+    def append(self, node):
+        """ Add node to the active nodes. """
+        self.extend([node])
+
+    def extend(self, nodes):
+        """ Add nodes to the active nodes. """
+        for node in nodes:
+            sequence = next(self._sequence)
+            self._nodes[node] = sequence
+            for ((heuristic, criterion), heap) in self._heaps.items():
+                key = self._signs[criterion] * self._score(heuristic, node)
+                heapq.heappush(heap, (key, random.random(), sequence, node))
+
+    def remove(self, node):
+        """ Remove node from the active nodes, raising ValueError if it is not one of them. """
+        if node not in self._nodes:
+            raise ValueError(f'{node} is not an active node')
+        self._discard(node)
+
+    def _discard(self, node):
+        del self._nodes[node]
+        for scores in self._scores.values():
+            scores.pop(node, None)
+        # Drop the entries of removed nodes once they outnumber the active nodes
+        for (selection, heap) in self._heaps.items():
+            if len(heap) > 2 * len(self._nodes) + 64:
+                heap = [entry for entry in heap if self._nodes.get(entry[3]) == entry[2]]
+                heapq.heapify(heap)
+                self._heaps[selection] = heap
+
+    def popBest(self, heuristic, criterion):
+        """ Remove and return the active node with the best score by heuristic, as chosen by criterion
+            (min or max), picking at random among the nodes with that score.
+        """
+        assert self._nodes, "Can't select board from empty list."
+        sign = self._signs[criterion]
+        heap = self._heaps.get((heuristic, criterion))
+        if heap is None:
+            heap = [(sign * self._score(heuristic, node), random.random(), sequence, node)
+                    for (node, sequence) in self._nodes.items()]
+            heapq.heapify(heap)
+            self._heaps[(heuristic, criterion)] = heap
+        while True:
+            (_, _, sequence, node) = heapq.heappop(heap)
+            if self._nodes.get(node) == sequence:
+                self._discard(node)
+                return node
+
+
+def select_best_board(node_list, heuristic, criterion):
+    """ Return the node of node_list with the best score by heuristic, as chosen by criterion,
+        picking at random among the nodes with that score, and remove it from node_list.
+        A BoardFrontier selects from its heap; any other list is scanned (see select).
+    """
+    if isinstance(node_list, BoardFrontier) and BoardFrontier.supports(criterion):
+        return node_list.popBest(heuristic, criterion)
+    board = select(node_list, heuristic, criterion, random.choice)
+    node_list.remove(board)
+    return board
+
+
 # -----------------------------------------------------------------------------
 # SEARCH PUZZLE CELL / BOARD / ACTION SELECTORS
 # -----------------------------------------------------------------------------
@@ -447,32 +783,29 @@ def select_cell_by_user(sboard):
     return select(collect_cells(sboard), uniform_heuristic, min, users_choice_cell)
 
 
+def select_pivot_action(sboard):
+    """ Return the pivot action, so that search proceeds without asking the user. """
+    return 'pivot'
+
+
 def select_random_board_with_fewest_uncertain_values(node_list):
     """ Return the Board that has the fewest uncertain values, removing it from node_list. """
-    board = select(node_list, candidate_board_uncertain_values_heuristic, min, random.choice)
-    node_list.remove(board)
-    return board
+    return select_best_board(node_list, candidate_board_uncertain_values_heuristic, min)
 
 
 def select_random_board_with_most_uncertain_values(node_list):
     """ Return the Board that has the most uncertain values, removing it from node_list. """
-    board = select(node_list, candidate_board_uncertain_values_heuristic, max, random.choice)
-    node_list.remove(board)
-    return board
+    return select_best_board(node_list, candidate_board_uncertain_values_heuristic, max)
 
 
 def select_random_board_with_fewest_uncertain_cells(node_list):
     """ Return the Board that has the fewest uncertain cells, removing it from node_list. """
-    board = select(node_list, candidate_board_uncertain_cells_heuristic, min, random.choice)
-    node_list.remove(board)
-    return board
+    return select_best_board(node_list, candidate_board_uncertain_cells_heuristic, min)
 
 
 def select_random_board_with_most_uncertain_cells(node_list):
     """ Return the Board that has the most uncertain cells, removing it from node_list. """
-    board = select(node_list, candidate_board_uncertain_cells_heuristic, max, random.choice)
-    node_list.remove(board)
-    return board
+    return select_best_board(node_list, candidate_board_uncertain_cells_heuristic, max)
 
 
 def select_board_by_user(node_list):
@@ -501,7 +834,7 @@ def uniform_heuristic(item):
 
 def candidate_board_uncertain_cells_heuristic(node):
     """ Taking in a GameTreeNode, return the number of uncertain cells. """
-    return len(node.board.getUncertainCells())
+    return node.board.countUncertainCells()
 
 
 def candidate_board_uncertain_values_heuristic(node):
@@ -10,6 +10,7 @@ Logging and scoring system for Sudoku solver
 import board_update_descriptions
 import board
 
+import os
 import os.path
 import csv
 import json
@@ -25,6 +26,90 @@ SCORE_TRICKY = 9300
 SCORE_FIENDISH = 14000
 SCORE_DIABOLICAL = 25000
 
+# How much board state logOperator records with each update:
+#   off: no updates are recorded (the operator counters are still kept)
+#   counters: the operator, phase, count flag and total uncertainty only
+#   sampled: a full snapshot every snapshot_rate updates, counters otherwise
+#   full: a full snapshot of the board with every update
+SNAPSHOT_LEVELS = ('off', 'counters', 'sampled', 'full')
+
+# Deployment-wide defaults, which a puzzle can override in its name
+# (e.g., 'medium1...snapshots=sampled...snapshotrate=20'); see setSnapshotLevel.
+default_snapshot_level = os.environ.get('SUDOKU_LOG_SNAPSHOTS', 'full')
+default_snapshot_rate = int(os.environ.get('SUDOKU_LOG_SNAPSHOT_RATE', '10'))
+
+
+def set_default_snapshot_level(level, rate=None):
+    """ Set the snapshot level (and sampling rate) for loggers created from now on. """
+    global default_snapshot_level, default_snapshot_rate
+    assert level in SNAPSHOT_LEVELS, f'Snapshot level must be one of {SNAPSHOT_LEVELS}, not {level}'
+    default_snapshot_level = level
+    if rate is not None:
+        assert int(rate) > 0, f'Snapshot rate must be positive, not {rate}'
+        default_snapshot_rate = int(rate)
+
+
+def render_board_update(operator, phase, sboard, count_operator):
+    """ Return the full logged state of sboard for an update. """
+    state = {}
+    state["operator"] = str(operator)
+    state["phase"] = str(phase)
+    state["board"] = sboard.getStateStr(True, False)
+    state["increment_operator_count"] = count_operator
+    state["total_uncertainty"] = sboard.countUncertainValues()
+    state["cellbased_associated_uncertainty"] = {}
+    state["max_uncertain_cell"] = None
+    for cell in sboard.getUncertainCells():
+        uncertain_count = sboard.countAssociatedUncertainValuesGivenUncertainCell(cell)
+        state["cellbased_associated_uncertainty"][cell.getIdentifier()] = uncertain_count
+        if ((not state["max_uncertain_cell"])
+            or uncertain_count > state["max_uncertain_cell"]["count"]):
+            state["max_uncertain_cell"] = {"id": cell.getIdentifier(), "values": cell.getValues(), "count": uncertain_count}
+    return state
+
+
+class LazyUpdate():
+    """ A logged update whose full state is rendered only when the log is read.
+
+    Holds the board's candidate storage as a copy-on-write snapshot
+    (see Board.getSnapshot), which costs nothing until the board changes again.
+    """
+
+    __slots__ = ('operator', 'phase', 'count_operator', 'values', 'degree', 'state')
+
+    def __init__(self, operator, phase, sboard, count_operator):
+        self.operator = operator
+        self.phase = phase
+        self.count_operator = count_operator
+        self.values = sboard.getSnapshot()
+        self.degree = sboard.getDegree()
+        self.state = None
+
+    def render(self):
+        """ Return (and keep) the full logged state, dropping the snapshot. """
+        if self.state is None:
+            self.state = render_board_update(self.operator, self.phase,
+                                             board.Board.fromSnapshot(self.values, self.degree),
+                                             self.count_operator)
+            self.values = None
+        return self.state
+
+
+class LogNode():
+    """ An immutable run of logged board updates, linked to the run logged before it.
+
+    Boards copied from one another share the nodes of their common history,
+    so copying a logger never copies the updates already logged.
+    """
+
+    __slots__ = ('parent', 'entries', 'length')
+
+    def __init__(self, parent, entries):
+        self.parent = parent
+        self.entries = tuple(entries)
+        # Total number of updates from the root of the history through this node
+        self.length = len(self.entries) + (parent.length if parent else 0)
+
 
 class SudokuLogger():
 
@@ -35,7 +120,13 @@ class SudokuLogger():
         self.solution_state = str(None)
         self.difficulty_score = 0
 
-        self.board_updates = []
+        # The logged updates are the shared history (a chain of LogNodes inherited
+        # from the boards this one was copied from) followed by our own new updates.
+        # See board_updates for the materialized list.
+        self._history = None
+        self._updates = []
+        self.snapshot_level = default_snapshot_level
+        self.snapshot_rate = default_snapshot_rate
         # operators_use_count provides a dict of each operator that was used and
         # the number of times they were applied.
         self.operators_use_count = dict()
@@ -53,21 +144,17 @@ class SudokuLogger():
                 board: a Board to use to print the state string for the log
                 count_operator: a boolean that describes whether the operation should be counted
         """
-        state = {}
-        state["operator"] = str(operator)
-        state["phase"] = str(phase)
-        state["board"] = board.getStateStr(True, False)
-        state["increment_operator_count"] = count_operator
-        state["total_uncertainty"] = board.countUncertainValues()
-        state["cellbased_associated_uncertainty"] = {}
-        state["max_uncertain_cell"] = None
-        for cell in board.getUncertainCells():
-            uncertain_count = board.countAssociatedUncertainValuesGivenUncertainCell(cell)
-            state["cellbased_associated_uncertainty"][cell.getIdentifier()] = uncertain_count
-            if ((not state["max_uncertain_cell"])
-                or uncertain_count > state["max_uncertain_cell"]["count"]):
-                state["max_uncertain_cell"] = {"id": cell.getIdentifier(), "values": cell.getValues(), "count": uncertain_count}
-        self.board_updates.append(state)
+        level = self.snapshot_level
+        if level == 'sampled':
+            level = 'full' if self.countUpdates() % self.snapshot_rate == 0 else 'counters'
+        if level == 'full':
+            # Rendering is deferred until the log is read (see board_updates)
+            self._updates.append(LazyUpdate(operator, phase, board, count_operator))
+        elif level == 'counters':
+            self._updates.append({"operator": str(operator),
+                                  "phase": str(phase),
+                                  "increment_operator_count": count_operator,
+                                  "total_uncertainty": board.countUncertainValues()})
 
         if phase == "call":
             # Count every called operator
@@ -76,7 +163,80 @@ class SudokuLogger():
             # Only count the operator if we're told to (essentially, at the set level)
             self.operators_use_count[operator] += 1
 
-        logger.debug("operator %s (phase %s) Message %s Board %s", str(operator), str(phase), str(msg_str), str(board.getStateStr(True, False)))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("operator %s (phase %s) Message %s Board %s", str(operator), str(phase), str(msg_str), str(board.getStateStr(True, False)))
+
+    def setSnapshotLevel(self, level, rate=None):
+        """ Set how much board state this logger records with each update (see SNAPSHOT_LEVELS). """
+        assert level in SNAPSHOT_LEVELS, f'Snapshot level must be one of {SNAPSHOT_LEVELS}, not {level}'
+        self.snapshot_level = level
+        if rate is not None:
+            assert int(rate) > 0, f'Snapshot rate must be positive, not {rate}'
+            self.snapshot_rate = int(rate)
+
+    @ property
+    def board_updates(self):
+        """ The list of all updates logged for this board and the boards it was copied from, oldest first. """
+        runs = [self._updates]
+        node = self._history
+        while node:
+            runs.append(node.entries)
+            node = node.parent
+        return [state.render() if isinstance(state, LazyUpdate) else state
+                for run in reversed(runs) for state in run]
+
+    def countUpdates(self):
+        """ Return the number of logged updates without materializing them. """
+        return (self._history.length if self._history else 0) + len(self._updates)
+
+    def snapshotKey(self):
+        """ Return what, besides the operators and board states, decides the updates the next logOperator calls record. """
+        if self.snapshot_level == 'sampled':
+            return (self.snapshot_level, self.snapshot_rate, self.countUpdates() % self.snapshot_rate)
+        return (self.snapshot_level,)
+
+    def getUpdatesSince(self, count):
+        """ Return the updates logged since countUpdates() was count, unrendered and oldest first. """
+        wanted = self.countUpdates() - count
+        runs = []
+        run = self._updates
+        node = self._history
+        while wanted > len(run):
+            runs.append(run)
+            wanted -= len(run)
+            run = node.entries
+            node = node.parent
+        if wanted:
+            runs.append(run[len(run) - wanted:])
+        return tuple(state for run in reversed(runs) for state in run)
+
+    def replayUpdates(self, updates, called_counts, use_counts):
+        """ Log updates (see getUpdatesSince) again, with the operator counts they incurred.
+
+        The updates are shared rather than copied; they are never changed once logged
+        (a LazyUpdate only ever renders to the same state).
+        """
+        self._updates.extend(updates)
+        for (operator, count) in called_counts.items():
+            self.operators_called_count[operator] += count
+        for (operator, count) in use_counts.items():
+            self.operators_use_count[operator] += count
+
+    def copy(self):
+        """ Return a copy of this logger for a new board.
+
+        Our own updates are first sealed into a LogNode on top of our history;
+        the copy and this logger then both continue from that node.
+        """
+        if self._updates:
+            self._history = LogNode(self._history, self._updates)
+            self._updates = []
+        clone = SudokuLogger.__new__(SudokuLogger)
+        clone.__dict__.update(self.__dict__)
+        clone._updates = []
+        clone.operators_use_count = dict(self.operators_use_count)
+        clone.operators_called_count = dict(self.operators_called_count)
+        return clone
 
     def setSolution(self, sboard):
         self.solution = sboard.getStateStr(False, False, "")
@@ -120,6 +280,7 @@ class SudokuLogger():
 
     def get_full_json_repr(self):
         """ Return a log dictionary representing the state of this SudokuLogger object (all the information we want saved).
+            The shared update history is only materialized here.
         """
         game = self.get_simple_json_repr()
         for key in self.operators_use_count.keys():
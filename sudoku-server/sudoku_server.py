@@ -11,6 +11,7 @@ Lightweight sudoku server for sudoku online.
 
 import translate
 import board
+import solution_index
 
 from flask import Flask, request, jsonify
 from flask_cors import CORS
@@ -23,6 +24,9 @@ logging.basicConfig(level=logging.INFO)
 app = Flask(__name__)
 CORS(app)
 
+# Map the catalog's solutions once, up front, rather than on the first request
+solution_index.load_catalog_index()
+
 @app.route('/sudoku/request/initialBoard', methods=['GET', 'POST'])
 def get_initial_board():
     """ Return an inital board.
@@ -18,6 +18,10 @@ from flask import jsonify
 import logging
 logger = logging.getLogger(__name__)
 
+# The actions a client may take; internal actions are not offered to clients
+client_actions = {name for (name, description) in board_update_descriptions.actions_description.items()
+                  if not description.get('internal', False)}
+
 
 def do_single_test(dbg_message, success_func, req_func):
     """ Ensure that results are as expected per success_func, which takes in the json results expected. """
@@ -77,8 +81,7 @@ def do_tests():
                    lambda: requests.get("http://localhost:5000/sudoku/request/list_logical_operators"))
 
     do_single_test(f"list cell actions",
-                   lambda d_list: (len(d_list) == len(
-                       board_update_descriptions.actions_description.keys())),
+                   lambda d_list: (len(d_list) == len(client_actions)),
                    lambda: requests.get("http://localhost:5000/sudoku/request/list_cell_actions"))
 
     hard4_board = do_single_test(f"getting hard4 board for future tests",
@@ -179,7 +182,7 @@ def do_tests():
                           and (d_boards[0]["puzzleName"] == boardname)
                           and ("select_ops_upfront" in d_boards[0] and d_boards[0]["select_ops_upfront"] == True)
                           and ("availableActions" in d_boards[0])
-                          and (set(d_boards[0]["availableActions"]) == set(board_update_descriptions.actions_description.keys()))
+                          and (set(d_boards[0]["availableActions"]) == client_actions)
                           and ("assignments" in d_boards[0])
                           and (d_boards[0]["assignments"] != [3, 0, 6, 8, 4, 2, 5, 7, 1], [1, 4, 5, 0, 7, 6, 8, 3, 2], [8, 7, 2, 1, 3, 5, 4, 0, 6], [7, 6, 1, 4, 0, 8, 3, 2, 5], [4, 2, 8, 3, 5, 1, 7, 6, 0], [0, 5, 3, 2, 6, 7, 1, 4, 8], [6, 8, 0, 7, 1, 3, 2, 5, 4], [5, 1, 7, 6, 2, 4, 0, 8, 3], [2, 3, 4, 5, 8, 0, 6, 1, 7])),
         lambda: requests.post(
@@ -194,7 +197,7 @@ def do_tests():
                           and ("puzzleName" in d_boards[0])
                           and (d_boards[0]["puzzleName"] == boardname)
                           and ("availableActions" in d_boards[0])
-                          and (set(d_boards[0]["availableActions"]) == set(board_update_descriptions.actions_description.keys()))
+                          and (set(d_boards[0]["availableActions"]) == client_actions)
                           and ("assignments" in d_boards[0])
                           and (d_boards[0]["assignments"] == [3, 0, 6, 8, 4, 2, 5, 7, 1], [1, 4, 5, 0, 7, 6, 8, 3, 2], [8, 7, 2, 1, 3, 5, 4, 0, 6], [7, 6, 1, 4, 0, 8, 3, 2, 5], [4, 2, 8, 3, 5, 1, 7, 6, 0], [0, 5, 3, 2, 6, 7, 1, 4, 8], [6, 8, 0, 7, 1, 3, 2, 5, 4], [5, 1, 7, 6, 2, 4, 0, 8, 3], [2, 3, 4, 5, 8, 0, 6, 1, 7])),
         lambda: requests.post(
@@ -211,7 +214,7 @@ def do_tests():
                           and ("puzzleName" in d_boards[1])
                           and (d_boards[1]["puzzleName"] == boardname)
                           and ("availableActions" in d_boards[0])
-                          and (set(d_boards[1]["availableActions"]) == set(board_update_descriptions.actions_description.keys()))
+                          and (set(d_boards[1]["availableActions"]) == client_actions)
                           and ("assignments" in d_boards[1])
                           and (d_boards[1]["assignments"] == [3, 0, 6, 8, 4, 2, 5, 7, 1], [1, 4, 5, 0, 7, 6, 8, 3, 2], [8, 7, 2, 1, 3, 5, 4, 0, 6], [7, 6, 1, 4, 0, 8, 3, 2, 5], [4, 2, 8, 3, 5, 1, 7, 6, 0], [0, 5, 3, 2, 6, 7, 1, 4, 8], [6, 8, 0, 7, 1, 3, 2, 5, 4], [5, 1, 7, 6, 2, 4, 0, 8, 3], [2, 3, 4, 5, 8, 0, 6, 1, 7])),
         lambda: requests.post(
@@ -18,6 +18,7 @@ import game
 import operators
 import puzzles
 import solvers
+import sudoku_logger
 import translate
 
 import argparse
@@ -32,6 +33,8 @@ def test_sudoku(args):
     # TODO MAL move set_verbosity to config_data
     if args.verbosity:
         logging.basicConfig(level=logging.DEBUG)
+    if args.snapshots:
+        sudoku_logger.set_default_snapshot_level(args.snapshots, args.snapshotrate)
 
     my_ops = []
     if args.opselector == "all_logical_operators_ordered":
@@ -60,8 +63,16 @@ def test_sudoku(args):
 
         cellselector = getattr(solvers, "select_" + args.cellselector)
         boardselector = getattr(solvers, "select_" + args.boardselector)
-        search_tree = game.GameTreeNode(sboard, my_ops, cellselector)
+        # Without an action selector, the game asks the user for each action
+        actionselector = getattr(solvers, "select_" + args.actionselector) if args.actionselector != "action_by_user" else None
+        transpositions = game.TranspositionTable(args.transpositions) if args.transpositions else None
+        game_state = game.ActiveGameTreeState(transpositions)
+        search_tree = game.GameTreeNode(sboard, my_ops, cellselector, boardselector, actionselector,
+                                        game_state=game_state)
         result = search_tree.play()
+        logger.info("Played %d nodes of %s.", game_state.nodes_played, sboard.getPuzzleName())
+        if transpositions:
+            logger.info("Transposition table for %s: %s", sboard.getPuzzleName(), transpositions.getStatistics())
 
         if result:
             result.config.log.setSolution(result)
@@ -70,7 +81,7 @@ def test_sudoku(args):
             result.config.log.printLogJSON()
             result.config.log.printCSV()
         else:
-            logger.info("Final state of %s: INSOLUBLE", str(name))
+            logger.info("Final state of %s: INSOLUBLE", sboard.getPuzzleName())
 
 
 if __name__ == "__main__":
@@ -81,6 +92,11 @@ if __name__ == "__main__":
     parser.add_argument("--games", metavar="NAME", type=str, nargs="*",
                         help="games to run through the solver; include configuration in game name as desired.")
     parser.add_argument("--verbosity", "-v", action="count", default=0)
+    parser.add_argument("--snapshots", nargs="?",
+                        choices=sudoku_logger.SNAPSHOT_LEVELS,
+                        help="how much board state to log with each operator (default full)")
+    parser.add_argument("--snapshotrate", type=int,
+                        help="log a full snapshot every SNAPSHOTRATE updates when snapshots are sampled")
     # parser.add_argument("--outfile", nargs="?", type=argparse.FileType("w"), default=sys.stdout)
     parser.add_argument("--cellselector", nargs="?",
                         choices=["random_cell_with_fewest_uncertain_values",
@@ -96,6 +112,13 @@ if __name__ == "__main__":
                                  "board_by_user"],
                         default="board_by_user",
                         help="function to select pivot board")
+    parser.add_argument("--actionselector", nargs="?",
+                        choices=["pivot_action",
+                                 "action_by_user"],
+                        default="action_by_user",
+                        help="function to select the action to take when no logical operator makes progress")
+    parser.add_argument("--transpositions", type=int, default=65536,
+                        help="most board states to remember so that each is explored once; 0 explores every node")
     parser.add_argument("--opselector", nargs="?",
                         choices=["all_logical_operators_ordered"],
                         default="all_logical_operators_ordered",
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Sandia National Laboratories
+October 17, 2026
+
+Checks of the board state machinery, run with pytest from this directory.
+    - rollback restores everything a board tracks about its candidates
+"""
+
+import board
+import solvers
+import translate
+
+import logging
+logging.disable(logging.CRITICAL)
+
+# The operators to solve with, enough to solve most of the catalog
+LOGICAL_OPS = ['inclusion', 'pointingpairs', 'nakedpairs', 'hiddenpairs',
+               'pointingtriples', 'nakedtriples', 'hiddentriples', 'xwings', 'ywings']
+
+
+def __initial_board(name):
+    return board.Board(translate.get_initial_board({'name': name}))
+
+
+def __tracked_state(sboard):
+    """ Return everything the board tracks about its candidates, for comparison. """
+    topology = sboard.getTopology(sboard.getDegree())
+    values = board.Cell.getPossibleValuesByDegree(sboard.getDegree())
+    return (tuple(sboard.getMask(idx) for idx in range(len(topology.cell_names))),
+            sboard.countUncertainValues(), sboard.countCertainCells(),
+            sboard.countOverConstrainedCells(), sboard.hasInvalidCells(),
+            tuple(sboard.getValuePositions(unit, value) for unit in topology.units for value in values),
+            sboard.stateHash(), sboard.getPropagatedMask(), sboard.getSettledOperators())
+
+
+def test_rollback_restores_state():
+    for name in ['test2-i24e40', 'hard4', 'naked_single_test']:
+        sboard = __initial_board(name)
+        checkpoint = sboard.checkpoint()
+        before = __tracked_state(sboard)
+
+        # change candidates, propagation marks and settled operators
+        cell = next(cell for cell in map(sboard.getCell, sboard.getAllCells()) if not cell.isCertain())
+        cell.assign(cell.getValues()[-1])
+        sboard = solvers.logical_solve(sboard, LOGICAL_OPS)
+        assert sboard.hasChangedSince(checkpoint)
+        assert __tracked_state(sboard) != before
+
+        sboard.rollback(checkpoint)
+        assert not sboard.hasChangedSince(checkpoint)
+        assert __tracked_state(sboard) == before
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Sandia National Laboratories
+October 17, 2026
+
+Checks of the configuration carried by boards, run with pytest from this directory.
+    - settings given in a puzzle name survive the board's round trip through the client
+"""
+
+import board
+import translate
+
+import logging
+logging.disable(logging.CRITICAL)
+
+
+def test_snapshot_level_survives_client_round_trip():
+    for (level, rate) in [('off', None), ('sampled', 20)]:
+        name = f'medium1...snapshots={level}' + (f'...snapshotrate={rate}' if rate else '')
+        sent = translate.get_initial_board({'name': name})
+        assert sent.config.log.snapshot_level == level
+
+        # boards come back from the client as JSON, without the puzzle name
+        returned = board.Board(sent.getSimpleJson())
+        assert returned.config.log.snapshot_level == level
+        if rate:
+            assert returned.config.log.snapshot_rate == rate
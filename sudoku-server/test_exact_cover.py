@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Sandia National Laboratories
+October 17, 2026
+
+Checks of the exact cover solver, run with pytest from this directory.
+    - exact_cover agrees with logical_solve where the operators solve a puzzle
+"""
+
+import board
+import exact_cover
+import puzzles
+import solvers
+import translate
+
+import logging
+logging.disable(logging.CRITICAL)
+
+# The operators to solve with, enough to solve most of the catalog
+LOGICAL_OPS = ['inclusion', 'pointingpairs', 'nakedpairs', 'hiddenpairs',
+               'pointingtriples', 'nakedtriples', 'hiddentriples', 'xwings', 'ywings']
+
+
+def test_exact_cover_agrees_with_logical_solve():
+    solved_count = 0
+    for name in puzzles.puzzles:
+        sboard = board.Board(translate.get_initial_board({'name': name}))
+        solutions = exact_cover.find_solutions(sboard, 2)
+        solved = solvers.logical_solve(board.Board(sboard), LOGICAL_OPS)
+        if solved.hasInvalidCells():
+            # the operators found a contradiction, so there is no solution
+            assert not solutions, name
+        elif solved.isSolved():
+            solved_count += 1
+            assert len(solutions) == 1, name
+            assert tuple(solved.getMask(idx) for idx in range(len(solutions[0]))) == tuple(solutions[0]), name
+        else:
+            # whatever the operators leave, every solution is still among the candidates
+            for solution in solutions:
+                assert all(solution[idx] & solved.getMask(idx) for idx in range(len(solution))), name
+    assert solved_count > 0
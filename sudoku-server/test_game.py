@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Sandia National Laboratories
+October 17, 2026
+
+Checks of game-tree exploration, run with pytest from this directory.
+    - a board state reached again is collapsed onto its first exploration, even without a cost
+"""
+
+import board
+import game
+import solvers
+import translate
+
+import logging
+logging.disable(logging.CRITICAL)
+
+
+def __play_unattended(sboard, transpositions):
+    return game.GameTreeNode(sboard, None,
+                             solvers.select_random_cell_with_fewest_uncertain_values,
+                             solvers.select_random_board_with_fewest_uncertain_cells,
+                             solvers.select_pivot_action,
+                             game_state=game.ActiveGameTreeState(transpositions))
+
+
+def test_transpositions_collapse_boards_without_cost():
+    # boards the client sends without a puzzle name carry no cost
+    json = translate.get_initial_board({'name': 'hard4'}).getSimpleJson()
+    json.pop('name', None)
+    json.pop('cost', None)
+    transpositions = game.TranspositionTable()
+
+    result = __play_unattended(board.Board(json), transpositions).play()
+    assert result is not None and result.isSolved()
+    assert transpositions.collapsed == 0
+
+    __play_unattended(board.Board(json), transpositions).step()
+    assert transpositions.hits == 1
+    assert transpositions.collapsed == 1
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Sandia National Laboratories
+October 17, 2026
+
+Checks of the logical_solve cache, run with pytest from this directory.
+    - logical_solve replayed from the cache matches a fresh solve
+"""
+
+import board
+import puzzles
+import solvers
+import translate
+
+import logging
+logging.disable(logging.CRITICAL)
+
+# The operators to solve with, enough to solve most of the catalog
+LOGICAL_OPS = ['inclusion', 'pointingpairs', 'nakedpairs', 'hiddenpairs',
+               'pointingtriples', 'nakedtriples', 'hiddentriples', 'xwings', 'ywings']
+
+
+def __initial_board(name):
+    return board.Board(translate.get_initial_board({'name': name}))
+
+
+def __solve_record(sboard, logical_ops):
+    """ Return the state, cost and log of a logical_solve of sboard, for comparison. """
+    solved = solvers.logical_solve(sboard, logical_ops)
+    log = solved.config.log
+    return (tuple(solved.getMask(idx) for idx in range(len(solved.getAllCells()))),
+            solved.stateHash(), solved.getPropagatedMask(), solved.getSettledOperators(),
+            solved.config.parameters.get('cost'),
+            repr(log.board_updates), dict(log.operators_called_count), dict(log.operators_use_count))
+
+
+def test_cache_replay_matches_fresh_solve():
+    solvers.logical_solve_cache.clear()
+    for name in puzzles.puzzles:
+        fresh = __initial_board(name)
+        fresh.config.set_policy(memoize_logical_solve=False)
+        expected = __solve_record(fresh, LOGICAL_OPS)
+        hits = solvers.logical_solve_cache.hits
+        assert __solve_record(__initial_board(name), LOGICAL_OPS) == expected, name
+        assert __solve_record(__initial_board(name), LOGICAL_OPS) == expected, name
+        assert solvers.logical_solve_cache.hits > hits, name
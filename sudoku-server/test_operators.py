@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Sandia National Laboratories
+October 17, 2026
+
+Checks that the logical operators keep the results they had before they were rewritten,
+run with pytest from this directory.  Each record pins, for one puzzle, the use counts of
+the operators of interest, the cost charged, the uncertain values left and a digest of the
+final board, as logged by the operators before the rewrite.
+    - exclusion simplifying the initial boards
+    - inclusion (hidden singles), interleaved with exclusion
+    - naked pairs, triples and quads, each applied alone
+    - hidden pairs, triples and quads, each applied alone
+    - pointing pairs and triples, each applied alone and among every operator
+"""
+
+import board
+import solvers
+import translate
+
+import hashlib
+
+import logging
+logging.disable(logging.CRITICAL)
+
+
+def __operator_record(name, logical_ops, counted_ops):
+    """ Return the use counts of counted_ops, the cost, the uncertain values and a digest of the board
+    after applying logical_ops to the initial board of the puzzle name. """
+    sboard = board.Board(translate.get_initial_board({'name': name}))
+    if logical_ops:
+        sboard = solvers.logical_solve(sboard, logical_ops)
+    uses = sboard.config.log.operators_use_count
+    state = sboard.getStateStr(True, False)
+    return tuple(uses[op] for op in counted_ops) + (sboard.config.parameters.get('cost'),
+                                                     sboard.countUncertainValues(),
+                                                     hashlib.sha1(state.encode()).hexdigest()[:12])
+
+
+def __check_records(logical_ops, counted_ops, expected):
+    for (name, record) in expected.items():
+        assert __operator_record(name, logical_ops, counted_ops) == record, name
+
+
+# Exclusion uses, cost, uncertain values and board digest of the initial boards
+EXCLUSION_RECORDS = {
+    'naked_single_test': (4, 0, 137, '6351934f9f54'),
+    'naked_pair_test': (1, 0, 108, '929587d5b7d7'),
+    'naked_pair_test_2': (1, 0, 94, 'ca166fe0908a'),
+    'hidden_pair_test': (1, 0, 160, '01544fd19f47'),
+    'hidden_pair_test_2': (1, 0, 100, '5412d3796268'),
+    'naked_triple_test': (1, 0, 134, 'e32c8141aaef'),
+    'naked_triple_test_2': (1, 0, 106, '4e41f7119725'),
+    'hidden_triple_test': (1, 0, 146, 'c72417f1f495'),
+    'naked_quad_test': (1, 0, 73, 'bbe28ac4a01c'),
+    'pointing_pair_test': (1, 0, 158, 'a9c5ff1c45eb'),
+    'pointing_pair_test_2': (1, 0, 192, '0d7fb8b7ca9a'),
+    'pointing_triple_test': (1, 0, 158, 'eca826422985'),
+    'xwing_test': (1, 0, 108, '77843c899ad8'),
+    'ywing_test': (1, 0, 127, 'cdc54fad61ea'),
+    'easy1': (49, 0, 0, 'f35f65c5c1af'),
+    'easy2': (3, 0, 169, '97ba1566d718'),
+    'easy3': (1, 0, 177, 'd80352d13d44'),
+    'easy4': (46, 0, 0, 'd5e60b85de21'),
+    'medium1': (7, 0, 128, 'cc9efc861734'),
+    'hard4': (7, 0, 142, '91bc4f9cd08c'),
+    'fiendish1': (1, 0, 356, '4082769c43e1'),
+    'test2-i24e40': (1, 0, 293, 'e8af8ed6f451'),
+    'insoluble_by_propagation': (49, 0, 0, 'a6cb10f48c4f'),
+    'insoluble_by_initial_state_conflict': (16, 0, 92, 'ee7de1a1b4cf'),
+}
+
+
+def test_exclusion_matches_cell_walk():
+    __check_records([], ['exclusion'], EXCLUSION_RECORDS)
+
+
+# Exclusion uses, inclusion uses, cost, uncertain values and board digest after inclusion
+INCLUSION_RECORDS = {
+    'naked_single_test': (5, 42, 200, 0, '41c6e1850d1d'),
+    'naked_pair_test': (1, 0, 0, 108, '929587d5b7d7'),
+    'naked_pair_test_2': (1, 0, 0, 94, 'ca166fe0908a'),
+    'hidden_pair_test': (1, 0, 0, 160, '01544fd19f47'),
+    'hidden_pair_test_2': (1, 0, 0, 100, '5412d3796268'),
+    'naked_triple_test': (1, 0, 0, 134, 'e32c8141aaef'),
+    'naked_triple_test_2': (1, 0, 0, 106, '4e41f7119725'),
+    'hidden_triple_test': (1, 0, 0, 146, 'c72417f1f495'),
+    'naked_quad_test': (1, 0, 0, 73, 'bbe28ac4a01c'),
+    'pointing_pair_test': (1, 0, 0, 158, 'a9c5ff1c45eb'),
+    'pointing_pair_test_2': (1, 0, 0, 192, '0d7fb8b7ca9a'),
+    'pointing_triple_test': (1, 0, 0, 158, 'eca826422985'),
+    'xwing_test': (1, 0, 0, 108, '77843c899ad8'),
+    'ywing_test': (1, 0, 0, 127, 'cdc54fad61ea'),
+    'easy1': (49, 0, 0, 0, 'f35f65c5c1af'),
+    'easy2': (13, 40, 200, 0, '7d62b81974ea'),
+    'easy3': (2, 52, 200, 0, '7a67f63d949b'),
+    'easy4': (46, 0, 0, 0, 'd5e60b85de21'),
+    'medium1': (7, 43, 100, 0, 'effd7cfd7486'),
+    'hard4': (8, 21, 100, 60, 'a2924bded234'),
+    'fiendish1': (1, 0, 0, 356, '4082769c43e1'),
+    'test2-i24e40': (42, 23, 400, 0, 'd77fa810e22d'),
+    'insoluble_by_propagation': (49, 0, 0, 0, 'a6cb10f48c4f'),
+    'insoluble_by_initial_state_conflict': (16, 33, 100, 0, '899b8884e79f'),
+}
+
+
+def test_inclusion_matches_value_lists():
+    __check_records(['inclusion'], ['exclusion', 'inclusion'], INCLUSION_RECORDS)
+
+
+# For each naked set operator, its uses, cost, uncertain values and board digest after applying it alone
+NAKED_SET_RECORDS = {
+    'nakedpairs': {
+        'naked_pair_test': (5, 500, 0, '91192e3a9451'),
+        'naked_pair_test_2': (3, 500, 0, 'f17c61da8c5e'),
+        'naked_triple_test': (2, 500, 128, '65f2a0830495'),
+        'naked_triple_test_2': (1, 500, 104, '38fffa19ec00'),
+        'naked_quad_test': (0, 0, 73, 'bbe28ac4a01c'),
+        'hidden_pair_test': (0, 0, 160, '01544fd19f47'),
+        'xwing_test': (0, 0, 108, '77843c899ad8'),
+        'medium1': (3, 500, 0, 'effd7cfd7486'),
+        'hard4': (2, 500, 121, '0334e89959b3'),
+        'fiendish1': (0, 0, 356, '4082769c43e1'),
+        'test2-i24e40': (1, 500, 285, '40e6ff386287'),
+        'test3-i29e35': (0, 0, 309, '3896fa8365d9'),
+        'test24-i10e41nt2xw2': (0, 0, 205, '8723f956bb14'),
+    },
+    'nakedtriples': {
+        'naked_pair_test': (0, 0, 108, '929587d5b7d7'),
+        'naked_pair_test_2': (6, 1400, 0, 'f17c61da8c5e'),
+        'naked_triple_test': (10, 2800, 0, '3c16060d35c9'),
+        'naked_triple_test_2': (4, 2800, 0, '92c014e0d61d'),
+        'naked_quad_test': (0, 0, 73, 'bbe28ac4a01c'),
+        'hidden_pair_test': (0, 0, 160, '01544fd19f47'),
+        'xwing_test': (1, 1400, 103, '220baa990646'),
+        'medium1': (7, 1400, 0, 'effd7cfd7486'),
+        'hard4': (8, 4200, 61, 'd4771988697e'),
+        'fiendish1': (0, 0, 356, '4082769c43e1'),
+        'test2-i24e40': (9, 7000, 0, 'd77fa810e22d'),
+        'test3-i29e35': (7, 4200, 176, '5f1d2c50a9e9'),
+        'test24-i10e41nt2xw2': (0, 0, 205, '8723f956bb14'),
+    },
+    'nakedquads': {
+        'naked_pair_test': (0, 0, 108, '929587d5b7d7'),
+        'naked_pair_test_2': (4, 8000, 76, '01e98b50c3f7'),
+        'naked_triple_test': (0, 0, 134, 'e32c8141aaef'),
+        'naked_triple_test_2': (1, 4000, 98, '16f78bed47a5'),
+        'naked_quad_test': (4, 4000, 0, '206ce18cdd12'),
+        'hidden_pair_test': (1, 4000, 0, '4020d7cb5558'),
+        'xwing_test': (1, 4000, 103, '220baa990646'),
+        'medium1': (9, 4000, 0, 'effd7cfd7486'),
+        'hard4': (7, 8000, 71, '6327379179b0'),
+        'fiendish1': (0, 0, 356, '4082769c43e1'),
+        'test2-i24e40': (4, 8000, 244, 'f04acadf093e'),
+        'test3-i29e35': (4, 8000, 238, 'a5742fab6e1c'),
+        'test24-i10e41nt2xw2': (0, 0, 205, '8723f956bb14'),
+    },
+}
+
+
+def test_naked_sets_match_cell_search():
+    for (operator, expected) in NAKED_SET_RECORDS.items():
+        __check_records([operator], [operator], expected)
+
+
+# For each hidden set operator, its uses, cost, uncertain values and board digest after applying it alone.
+# Hidden sets are k values confined to k cells of a unit, each value to at least two of them;
+# these records were taken when the operators moved to that definition, and differ from the
+# cell-based search they replaced.
+HIDDEN_SET_RECORDS = {
+    'hiddenpairs': {
+        'hidden_pair_test': (1, 1200, 151, 'f703b419228d'),
+        'hidden_pair_test_2': (3, 1200, 89, '39adbe6ae448'),
+        'hidden_triple_test': (0, 0, 146, 'c72417f1f495'),
+        'naked_pair_test': (3, 1200, 102, '270dfa6c916b'),
+        'naked_quad_test': (0, 0, 73, 'bbe28ac4a01c'),
+        'easy2': (0, 0, 169, '97ba1566d718'),
+        'medium1': (1, 1200, 124, 'aebb5189df41'),
+        'hard4': (0, 0, 142, '91bc4f9cd08c'),
+        'fiendish1': (0, 0, 356, '4082769c43e1'),
+        'test2-i24e40': (2, 1200, 279, '13a62cfd0e71'),
+        'test7-i26e36hp10': (2, 1200, 284, '6c8429ecfa67'),
+        'test19-i21e41np8hp3': (2, 1200, 287, '2a4e667faaf1'),
+    },
+    'hiddentriples': {
+        'hidden_pair_test': (1, 1600, 0, '4020d7cb5558'),
+        'hidden_pair_test_2': (3, 1600, 82, 'f3f6248540ea'),
+        'hidden_triple_test': (3, 1600, 130, 'ca0a99101105'),
+        'naked_pair_test': (1, 1600, 104, '379ae1911c13'),
+        'naked_quad_test': (0, 0, 73, 'bbe28ac4a01c'),
+        'easy2': (1, 1600, 166, 'bd6239365f7d'),
+        'medium1': (0, 0, 128, 'cc9efc861734'),
+        'hard4': (0, 0, 142, '91bc4f9cd08c'),
+        'fiendish1': (0, 0, 356, '4082769c43e1'),
+        'test2-i24e40': (3, 1600, 278, '31fb4f0ee9aa'),
+        'test7-i26e36hp10': (0, 0, 299, '485f81adbcb0'),
+        'test19-i21e41np8hp3': (2, 1600, 275, 'da8365db9554'),
+    },
+    'hiddenquads': {
+        'hidden_pair_test': (2, 5000, 0, '4020d7cb5558'),
+        'hidden_pair_test_2': (0, 0, 100, '5412d3796268'),
+        'hidden_triple_test': (1, 5000, 144, '3fec17f82b20'),
+        'naked_pair_test': (0, 0, 108, '929587d5b7d7'),
+        'naked_quad_test': (1, 5000, 66, 'bd431f468da6'),
+        'easy2': (0, 0, 169, '97ba1566d718'),
+        'medium1': (0, 0, 128, 'cc9efc861734'),
+        'hard4': (0, 0, 142, '91bc4f9cd08c'),
+        'fiendish1': (0, 0, 356, '4082769c43e1'),
+        'test2-i24e40': (0, 0, 293, 'e8af8ed6f451'),
+        'test7-i26e36hp10': (0, 0, 299, '485f81adbcb0'),
+        'test19-i21e41np8hp3': (0, 0, 303, '3e272f14e738'),
+    },
+}
+
+
+def test_hidden_sets():
+    for (operator, expected) in HIDDEN_SET_RECORDS.items():
+        __check_records([operator], [operator], expected)
+
+
+def test_hidden_triple_without_a_cell_of_all_three_values():
+    # in column A, the values 0, 1 and 2 are only in A1 = {0,1,3}, A2 = {1,2,4} and A3 = {0,2,5}
+    sboard = board.Board('.' * 81)
+    kept = {'A1': 0b1011, 'A2': 0b10110, 'A3': 0b100101}
+    for name in [f'A{row}' for row in range(1, 10)]:
+        sboard.getCell(name).excludeMask(~kept[name] if name in kept else 0b111)
+
+    sboard = solvers.logical_solve(sboard, ['hiddentriples'])
+    assert sboard.config.log.operators_use_count['hiddentriples'] == 1
+    assert [sboard.getCell(f'A{row}').getValues() for row in range(1, 4)] == [[0, 1], [1, 2], [0, 2]]
+
+
+# For each pointing set operator, its uses, cost, uncertain values and board digest after applying it alone
+POINTING_SET_RECORDS = {
+    'pointingpairs': {
+        'pointing_pair_test': (4, 250, 142, '2265f59f7c35'),
+        'pointing_pair_test_2': (10, 250, 160, '36986c4211e8'),
+        'pointing_triple_test': (8, 250, 143, '7c4dcbf0e143'),
+        'box_line_reduction': (6, 250, 128, '7a5f1265dda1'),
+        'box_line_reduction_2': (5, 500, 121, '471cb1333dad'),
+        'medium1': (4, 250, 0, 'effd7cfd7486'),
+        'hard4': (2, 250, 140, '36584e66c450'),
+        'fiendish2': (7, 250, 229, 'e9c2da70c7d3'),
+        'test13-i34e30np1': (4, 250, 300, 'b9c468ed05be'),
+        'test21-i16e47np1hp2': (2, 250, 297, '2a62265c6cb5'),
+        'test24-i10e41nt2xw2': (6, 250, 158, '53ce4aca8425'),
+        'test26-i8e41pp1nt4xw2xyzw1': (8, 250, 171, 'c8db9e1c7fc1'),
+    },
+    'pointingtriples': {
+        'pointing_pair_test': (0, 0, 158, 'a9c5ff1c45eb'),
+        'pointing_pair_test_2': (3, 1300, 185, 'ead60961297d'),
+        'pointing_triple_test': (1, 1300, 157, 'c39b1b820dcd'),
+        'box_line_reduction': (0, 0, 148, '2f7bd9c77312'),
+        'box_line_reduction_2': (4, 1300, 125, '4da681cff8aa'),
+        'medium1': (3, 1300, 122, '7ef18022f0fb'),
+        'hard4': (0, 0, 142, '91bc4f9cd08c'),
+        'fiendish2': (2, 1300, 240, '2d139f7ba09a'),
+        'test13-i34e30np1': (0, 0, 308, 'd00cbca628eb'),
+        'test21-i16e47np1hp2': (3, 1300, 297, '0b214b6f6445'),
+        'test24-i10e41nt2xw2': (1, 1300, 203, '408a02183ccb'),
+        'test26-i8e41pp1nt4xw2xyzw1': (4, 1300, 182, 'a5d4c60c69de'),
+    },
+}
+
+# Every costly operator, in the order to apply them
+EVERY_OPERATOR = ['inclusion', 'pointingpairs', 'nakedpairs', 'hiddenpairs', 'pointingtriples', 'nakedtriples',
+                  'hiddentriples', 'xwings', 'ywings', 'xyzwings', 'nakedquads', 'hiddenquads']
+
+# Pointing pair uses, pointing triple uses, cost, uncertain values and board digest after every operator
+POINTING_AMONG_EVERY_OPERATOR_RECORDS = {
+    'test13-i34e30np1': (5, 0, 750, 0, 'e3938cc854ef'),
+    'test24-i10e41nt2xw2': (6, 0, 450, 0, '64151bc19772'),
+    'fiendish2': (9, 0, 850, 0, '0d68277d454c'),
+    'hard4': (3, 0, 450, 0, 'ba8aee2f9b1a'),
+    'test26-i8e41pp1nt4xw2xyzw1': (7, 0, 550, 0, '796b9dc9a7af'),
+}
+
+
+def test_pointing_sets_match_cell_search():
+    for (operator, expected) in POINTING_SET_RECORDS.items():
+        __check_records([operator], [operator], expected)
+    __check_records(EVERY_OPERATOR, ['pointingpairs', 'pointingtriples'], POINTING_AMONG_EVERY_OPERATOR_RECORDS)
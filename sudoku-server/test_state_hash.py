@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Sandia National Laboratories
+October 17, 2026
+
+Checks of the board state hash, run with pytest from this directory.
+    - the state hash depends on the candidates only, not on how they were reached
+"""
+
+import board
+import translate
+
+import logging
+logging.disable(logging.CRITICAL)
+
+
+def test_state_hash_is_path_independent():
+    sboard = board.Board(translate.get_initial_board({'name': 'hard4'}))
+    exclusions = [(cell.getIdentifier(), cell.getValues()[0]) for cell in map(sboard.getCell, sboard.getAllCells())
+                  if cell.countValues() > 2]
+    forward = board.Board(sboard)
+    for (name, value) in exclusions:
+        forward.getCell(name).exclude(value)
+    backward = board.Board(sboard)
+    for (name, value) in reversed(exclusions):
+        backward.getCell(name).exclude(value)
+
+    assert forward.stateHash() != sboard.stateHash()
+    assert forward.stateHash() == backward.stateHash()
+    # the same as a board built directly from the final candidates
+    rebuilt = board.Board.fromSnapshot(forward.getSnapshot(), forward.getDegree())
+    assert rebuilt.stateHash() == forward.stateHash()
+
+    # and back to the initial hash once every exclusion is undone
+    forward.rollback(sboard.checkpoint())
+    assert forward.stateHash() == sboard.stateHash()
@@ -120,7 +120,7 @@ def get_boards_for_game(name):
     if "default_config" in game["config_alterations"]:
         default_config = game["config_alterations"]["default_config"]
         if "costly_ops" in default_config:
-            config_data.defaultConfig.costly_operations = default_config["costly_ops"]
+            config_data.defaultConfig.set_policy(costly_operations=default_config["costly_ops"])
     logger.info("load game name: %s", str(game_names))
 
     game_boards = []
@@ -182,6 +182,9 @@ def __collect_args(action, action_dict):
     """
     if action not in board_update_descriptions.actions_description:
         raise SudokuServerException(f"Cannot exercise action {action}")
+    # Internal actions are only for the server's own tools, which call them through solvers
+    if board_update_descriptions.actions_description[action].get('internal', False):
+        raise SudokuServerException(f"Cannot exercise internal action {action}")
     try:
         arg_names = board_update_descriptions.actions_description[action]["arguments"]
     except KeyError: